@@ -0,0 +1,145 @@
+"""
+Buffered affiliate click counting.
+
+Clicks on /api/go/<product_id>/ are counted in a per-process buffer and
+written to AffiliateClickDaily as aggregated (product, day) deltas, so a
+burst of clicks on a popular product costs one UPDATE per flush instead of
+one per click. Flushes run from the request_finished signal, after the
+redirect has been sent, once the buffer is older than
+AFFILIATE_CLICK_FLUSH_INTERVAL seconds or holds more than
+AFFILIATE_CLICK_FLUSH_THRESHOLD clicks. Pending clicks of a process that
+dies before flushing are lost, bounded by those two settings.
+"""
+
+import atexit
+import logging
+import time
+from collections import Counter
+from datetime import date
+from threading import Lock
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ClickKey = Tuple[int, str, date]
+
+
+class ClickBuffer:
+    """
+    Thread-safe in-memory click counter with batched database flushes.
+    """
+
+    def __init__(self, flush_interval: float = None, flush_threshold: int = None):
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else getattr(settings, "AFFILIATE_CLICK_FLUSH_INTERVAL", 30)
+        )
+        self.flush_threshold = (
+            flush_threshold
+            if flush_threshold is not None
+            else getattr(settings, "AFFILIATE_CLICK_FLUSH_THRESHOLD", 500)
+        )
+        self._lock = Lock()
+        self._pending: Counter = Counter()
+        self._pending_total = 0
+        self._oldest = None
+
+    def record(self, product_id: int, platform: str) -> None:
+        """Count one click for today; O(1) and never touches the database."""
+        key = (product_id, platform, timezone.now().date())
+        with self._lock:
+            self._pending[key] += 1
+            self._pending_total += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def flush_due(self) -> bool:
+        """Check whether the buffer should be written out."""
+        oldest = self._oldest
+        if oldest is None:
+            return False
+        return (
+            self._pending_total >= self.flush_threshold
+            or time.monotonic() - oldest >= self.flush_interval
+        )
+
+    def pending(self) -> Dict[ClickKey, int]:
+        """Return a copy of the not-yet-flushed counts."""
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write aggregated deltas to AffiliateClickDaily.
+
+        Returns:
+            Number of clicks written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._pending_total = 0
+            self._oldest = None
+
+        if not pending:
+            return 0
+
+        try:
+            write_click_deltas(pending)
+        except DatabaseError:
+            logger.exception("Failed to flush affiliate clicks, re-queueing")
+            with self._lock:
+                self._pending.update(pending)
+                self._pending_total += sum(pending.values())
+                if self._oldest is None:
+                    self._oldest = time.monotonic()
+            return 0
+
+        return sum(pending.values())
+
+
+def write_click_deltas(deltas: Dict[ClickKey, int]) -> None:
+    """
+    Apply click deltas in one transaction: one INSERT for missing rollup rows,
+    then one increment per (product, day) key.
+    """
+    from .models import AffiliateClickDaily
+
+    with transaction.atomic():
+        AffiliateClickDaily.objects.bulk_create(
+            [
+                AffiliateClickDaily(product_id=product_id, platform=platform, day=day)
+                for product_id, platform, day in deltas
+            ],
+            ignore_conflicts=True,
+        )
+        for (product_id, _platform, day), count in deltas.items():
+            AffiliateClickDaily.objects.filter(product_id=product_id, day=day).update(
+                clicks=F("clicks") + count
+            )
+
+
+click_buffer = ClickBuffer()
+
+
+def flush_clicks_if_due(**kwargs) -> None:
+    """request_finished receiver: flush once the redirect has been sent."""
+    if click_buffer.flush_due():
+        click_buffer.flush()
+
+
+request_finished.connect(flush_clicks_if_due, dispatch_uid="wiki.flush_affiliate_clicks")
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    try:
+        click_buffer.flush()
+    except Exception:
+        logger.exception("Failed to flush affiliate clicks on exit")
@@ -0,0 +1,138 @@
+"""
+Near-duplicate tip detection with MinHash and locality-sensitive hashing.
+
+A tip's text (title and description) is cut into overlapping shingles of
+SHINGLE_SIZE words. Its MinHash signature takes, for each of
+MINHASH_PERMUTATIONS seeded hash functions, the smallest hash over the
+shingles. Two signatures agree in a fraction of positions that estimates
+the Jaccard similarity of the two shingle sets. Signatures are stored on
+Tip.minhash as packed little-endian uint32s.
+
+For lookups, the signature is split into MINHASH_BANDS bands. Each band is
+hashed into a 64-bit bucket key, and the keys are stored as TipLSHBucket
+rows. Tips sharing any bucket are candidates. With 16 bands of 8 rows, a
+pair at Jaccard s shares a bucket with probability 1 - (1 - s^8)^16: about
+0.98 at s = 0.8, and 0.01 at s = 0.4. A lookup is one indexed key__in query
+for candidates, bounded by DUPLICATE_MAX_CANDIDATES. The candidates are then
+checked against DUPLICATE_TIP_THRESHOLD by signature agreement. The expected
+cost is constant, whatever the corpus size.
+
+The hash functions come from a fixed seed, so signatures stay comparable
+across processes and deploys. Changing the seed, the permutation count or
+the shingle size requires `find_duplicate_tips --rebuild`.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Tip, TipLSHBucket
+
+SHINGLE_SIZE = 3
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 16
+_ROWS_PER_BAND = MINHASH_PERMUTATIONS // MINHASH_BANDS
+
+# Multiply-shift hash functions: h(x) = ((a * x + b) mod 2^64) >> 32, a odd
+_rng = np.random.default_rng(0x6D696E68)
+_A = _rng.integers(1, 2**63, MINHASH_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.integers(0, 2**63, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+WORD_RE = re.compile(r"\w+")
+
+
+def tip_text(title, description):
+    return f"{title} {description}"
+
+
+def shingles(text):
+    """Hashes of the overlapping SHINGLE_SIZE-word shingles of text."""
+    words = WORD_RE.findall(text.lower())
+    count = max(1, len(words) - SHINGLE_SIZE + 1)
+    return np.unique(
+        np.array(
+            [zlib.crc32(" ".join(words[i : i + SHINGLE_SIZE]).encode()) for i in range(count)],
+            dtype=np.uint64,
+        )
+    )
+
+
+def signature(text):
+    """MinHash signature of text as MINHASH_PERMUTATIONS uint32 values."""
+    hashed = _A[:, None] * shingles(text)[None, :] + _B[:, None]  # wraps mod 2^64
+    return (hashed >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+
+def pack(sig):
+    return sig.astype("<u4").tobytes()
+
+
+def unpack(data):
+    return np.frombuffer(bytes(data), dtype="<u4")
+
+
+def similarity(sig, other):
+    """Estimated Jaccard similarity: the fraction of agreeing positions."""
+    return float(np.mean(sig == other))
+
+
+def bucket_keys(sig):
+    """One signed 64-bit LSH bucket key per band; the band index is hashed in."""
+    keys = []
+    for band in range(MINHASH_BANDS):
+        rows = sig[band * _ROWS_PER_BAND : (band + 1) * _ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            bytes([band]) + pack(rows), digest_size=8
+        ).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def find_duplicate(sig, exclude_id=None):
+    """
+    The indexed tip most similar to sig, if it reaches
+    DUPLICATE_TIP_THRESHOLD, else None.
+
+    Candidates share at least one bucket. The ones sharing the most buckets
+    are checked first. At most DUPLICATE_MAX_CANDIDATES are checked.
+    """
+    candidates = (
+        TipLSHBucket.objects.filter(key__in=bucket_keys(sig))
+        .exclude(tip_id=exclude_id)
+        .values("tip_id")
+        .annotate(shared=Count("id"))
+        .order_by("-shared", "tip_id")
+        .values_list("tip_id", flat=True)[: settings.DUPLICATE_MAX_CANDIDATES]
+    )
+    best, best_score = None, settings.DUPLICATE_TIP_THRESHOLD
+    for tip in Tip.objects.filter(id__in=list(candidates)).only(
+        "id", "title", "slug", "minhash"
+    ):
+        score = similarity(sig, unpack(tip.minhash))
+        if score >= best_score:
+            best, best_score = tip, score
+    return best
+
+
+def index_tips(tips):
+    """
+    Store signatures and bucket rows for tips (Tip instances), replacing any
+    they had. Returns the number of tips indexed.
+    """
+    tips = list(tips)
+    for tip in tips:
+        sig = signature(tip_text(tip.title, tip.description))
+        tip.minhash = pack(sig)
+        tip.lsh_keys = bucket_keys(sig)
+    with transaction.atomic():
+        Tip.objects.bulk_update(tips, ["minhash"])
+        TipLSHBucket.objects.filter(tip__in=tips).delete()
+        TipLSHBucket.objects.bulk_create(
+            TipLSHBucket(tip=tip, key=key) for tip in tips for key in tip.lsh_keys
+        )
+    return len(tips)
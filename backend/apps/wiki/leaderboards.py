@@ -0,0 +1,231 @@
+"""
+Materialized top-N tip leaderboards.
+
+Each Leaderboard row ranks the best LEADERBOARD_SIZE tips for one metric,
+site-wide or within a category, as [tip_id, score] pairs, best first. A
+read slices that list and fetches the tips by id. It never sorts a category.
+
+Metrics:
+- success_rate: Tip.success_rate
+- votes: Tip.vote_count
+- trending: votes cast in the last TRENDING_DAYS
+
+Ties go to the newer tip (higher id).
+
+tip_vote calls record_vote(), which moves the voted tip within the
+site-wide boards and its category's boards; create_tip calls record_tip(),
+which places a new tip the same way. Only the boards whose entries change
+are locked and written, so votes on tips that stay off the boards do not
+queue on the same few rows. Only the tips on a board are stored. So when a
+tip drops off the bottom of a full board, the tip that replaces it is
+unknown, and that one board is recomputed instead. Deleting tips calls
+remove_tips(), which takes them off every board listing them in the same
+way. Votes also age out of the trending window without any write, so
+trending boards are recomputed when read more than
+LEADERBOARD_TRENDING_MAX_AGE seconds after their last rebuild. The
+rebuild_leaderboards command recomputes everything.
+"""
+
+import bisect
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Category, Leaderboard, Tip, Vote
+
+METRICS = [metric for metric, _ in Leaderboard.METRICS]
+
+# Metric -> Tip field it ranks by, for the metrics stored on the tip
+TIP_SCORES = {"success_rate": "success_rate", "votes": "vote_count"}
+
+
+def _rank(entry):
+    """Sort key putting the best [tip_id, score] entry first."""
+    return (-entry[1], -entry[0])
+
+
+def _trending_since():
+    return timezone.now() - timedelta(days=settings.TRENDING_DAYS)
+
+
+def compute_entries(metric, category_id=None):
+    """Top [tip_id, score] entries for one board, straight from the database."""
+    size = settings.LEADERBOARD_SIZE
+    if metric == "trending":
+        votes = Vote.objects.filter(created_at__gte=_trending_since())
+        if category_id is not None:
+            votes = votes.filter(tip__category_id=category_id)
+        rows = (
+            votes.values("tip_id")
+            .annotate(score=Count("id"))
+            .order_by("-score", "-tip_id")
+            .values_list("tip_id", "score")
+        )
+    else:
+        field = TIP_SCORES[metric]
+        tips = Tip.objects.all()
+        if category_id is not None:
+            tips = tips.filter(category_id=category_id)
+        rows = tips.order_by(f"-{field}", "-id").values_list("id", field)
+    return [[tip_id, score] for tip_id, score in rows[:size]]
+
+
+def rebuild(metrics=None):
+    """
+    Recompute boards from scratch: site-wide and for every category.
+
+    Args:
+        metrics: Metrics to rebuild, or None for all of them
+
+    Returns:
+        Number of boards written
+    """
+    metrics = METRICS if metrics is None else metrics
+    category_ids = [None, *Category.objects.values_list("id", flat=True)]
+    now = timezone.now()
+    boards = [
+        Leaderboard(
+            metric=metric,
+            category_id=category_id,
+            entries=compute_entries(metric, category_id),
+            rebuilt_at=now,
+        )
+        for metric in metrics
+        for category_id in category_ids
+    ]
+    with transaction.atomic():
+        Leaderboard.objects.filter(metric__in=metrics).delete()
+        Leaderboard.objects.bulk_create(boards)
+    return len(boards)
+
+
+def _rebuild_board(metric, category_id):
+    board, _ = Leaderboard.objects.update_or_create(
+        metric=metric,
+        category_id=category_id,
+        defaults={
+            "entries": compute_entries(metric, category_id),
+            "rebuilt_at": timezone.now(),
+        },
+    )
+    return board
+
+
+def top_tip_ids(metric, category_id=None, limit=None):
+    """
+    Best tip ids on a board, best first. The board is built on first read,
+    and trending boards are rebuilt once stale.
+    """
+    board = Leaderboard.objects.filter(metric=metric, category_id=category_id).first()
+    max_age = timedelta(seconds=settings.LEADERBOARD_TRENDING_MAX_AGE)
+    if board is None or (
+        metric == "trending" and board.rebuilt_at < timezone.now() - max_age
+    ):
+        board = _rebuild_board(metric, category_id)
+    return [tip_id for tip_id, _ in board.entries[:limit]]
+
+
+def place(entries, tip_id, score, size):
+    """
+    Move tip_id to where score ranks it among the entries.
+
+    Returns:
+        The new entries, or None when the board was full and the tip fell
+        from it to below the last entry. The replacement for the freed
+        slot is then unknown, and the board has to be recomputed.
+    """
+    kept = [entry for entry in entries if entry[0] != tip_id]
+    entry = [tip_id, score]
+    if len(entries) >= size and kept and _rank(entry) > _rank(kept[-1]):
+        return kept if len(kept) == len(entries) else None
+    bisect.insort(kept, entry, key=_rank)
+    return kept[:size]
+
+
+def record_vote(tip):
+    """
+    Re-rank tip on the site-wide boards and its category's boards after a
+    vote. Boards that were never built are left to be built on first read.
+    """
+    _rerank(tip, {
+        "success_rate": tip.success_rate,
+        "votes": tip.vote_count,
+        "trending": Vote.objects.filter(tip=tip, created_at__gte=_trending_since()).count(),
+    })
+
+
+def record_tip(tip):
+    """
+    Place a new tip on the site-wide boards and its category's boards, so
+    boards with free slots list it as compute_entries() would. Trending
+    boards only list tips with votes, so they are left alone.
+    """
+    _rerank(tip, {metric: getattr(tip, field) for metric, field in TIP_SCORES.items()})
+
+
+def _rerank(tip, scores):
+    size = settings.LEADERBOARD_SIZE
+    now = timezone.now()
+
+    boards = Leaderboard.objects.filter(
+        Q(category_id=tip.category_id) | Q(category__isnull=True),
+        metric__in=scores,
+    ).only("id", "metric", "entries")
+    # Decide without locks; the boards that change are re-read under lock
+    changing = [
+        board.id
+        for board in boards
+        if place(board.entries, tip.id, scores[board.metric], size) != board.entries
+    ]
+    if not changing:
+        return
+
+    with transaction.atomic():
+        updated = []
+        for board in Leaderboard.objects.select_for_update().filter(id__in=changing):
+            entries = place(board.entries, tip.id, scores[board.metric], size)
+            if entries == board.entries:
+                continue
+            if entries is None:
+                entries = compute_entries(board.metric, board.category_id)
+                board.rebuilt_at = now
+            board.entries = entries
+            board.updated_at = now
+            updated.append(board)
+        Leaderboard.objects.bulk_update(updated, ["entries", "rebuilt_at", "updated_at"])
+
+
+def remove_tips(tip_ids):
+    """
+    Take deleted tips off every board listing them. A full board that loses
+    a tip is recomputed, since the tip moving up into the freed slot is
+    unknown. Call after the tips are deleted, in the same transaction.
+
+    Returns:
+        Number of boards written
+    """
+    tip_ids = set(tip_ids)
+    listing = [
+        board.id
+        for board in Leaderboard.objects.only("id", "entries")
+        if any(tip_id in tip_ids for tip_id, _ in board.entries)
+    ]
+    if not listing:
+        return 0
+
+    size = settings.LEADERBOARD_SIZE
+    now = timezone.now()
+    with transaction.atomic():
+        boards = list(Leaderboard.objects.select_for_update().filter(id__in=listing))
+        for board in boards:
+            entries = [entry for entry in board.entries if entry[0] not in tip_ids]
+            if len(board.entries) >= size and len(entries) < len(board.entries):
+                entries = compute_entries(board.metric, board.category_id)
+                board.rebuilt_at = now
+            board.entries = entries
+            board.updated_at = now
+        Leaderboard.objects.bulk_update(boards, ["entries", "rebuilt_at", "updated_at"])
+    return len(boards)
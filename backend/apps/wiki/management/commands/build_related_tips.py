@@ -0,0 +1,142 @@
+"""
+Django management command to build the related-tips index.
+
+Vectorizes every tip's title and description with TF-IDF and stores each
+tip's nearest neighbours by cosine similarity on Tip.related. Tip detail
+responses read that field as "related". Similarities are computed in blocks
+of rows sized to --max-block-mb, so memory stays bounded however many tips
+there are (see apps/wiki/related.py).
+
+With --incremental, only tips that were never indexed are scored against
+the corpus. Existing tips also take them as neighbours where they rank.
+When every tip is already indexed, it returns after one query, without
+loading or vectorizing the corpus, so it is cheap to run on every deploy.
+
+Usage:
+    python manage.py build_related_tips
+    python manage.py build_related_tips --incremental
+    python manage.py build_related_tips --top-k 8 --max-block-mb 128
+"""
+
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.wiki import related
+from apps.wiki.models import Tip
+from apps.wiki.response_cache import bump_versions
+
+
+class Command(BaseCommand):
+    help = "Precompute related tips from TF-IDF similarity of titles and descriptions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only score tips that have not been indexed yet",
+        )
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=settings.RELATED_TIPS_COUNT,
+            dest="top_k",
+            help=f"Related tips kept per tip (default: {settings.RELATED_TIPS_COUNT})",
+        )
+        parser.add_argument(
+            "--min-score",
+            type=float,
+            default=settings.RELATED_TIPS_MIN_SCORE,
+            dest="min_score",
+            help="Lowest cosine similarity that counts as related "
+            f"(default: {settings.RELATED_TIPS_MIN_SCORE})",
+        )
+        parser.add_argument(
+            "--max-block-mb",
+            type=int,
+            default=64,
+            dest="max_block_mb",
+            help="Memory for one block of similarity scores (default: 64)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            dest="batch_size",
+            help="Tips updated per query (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        top_k, min_score = options["top_k"], options["min_score"]
+
+        if options["incremental"] and not Tip.objects.filter(related__isnull=True).exists():
+            self.stdout.write("All tips are indexed")
+            return
+
+        tips = list(
+            Tip.objects.order_by("id").values_list("id", "title", "description", "related")
+        )
+        if not tips:
+            self.stdout.write("No tips to index")
+            return
+
+        ids = np.array([tip_id for tip_id, _, _, _ in tips], dtype=np.int64)
+        current = [entries for _, _, _, entries in tips]
+        indptr, indices, data, n_terms = related.vectorize(
+            [related.document(title, description) for _, title, description, _ in tips]
+        )
+        csr = (indptr, indices, data)
+        csc = related.transpose(indptr, indices, data, n_terms)
+
+        if options["incremental"]:
+            rows = [row for row, entries in enumerate(current) if entries is None]
+        else:
+            rows = list(range(len(tips)))
+        # A block holds a float64 score row per tip in it, and about five
+        # 8-byte values per expanded (term, posting) product
+        budget = options["max_block_mb"] * 2**20
+        max_rows = max(1, budget // (8 * len(tips)))
+        max_pairs = max(1, budget // 40)
+
+        # Score above which a new tip enters an existing tip's list; new
+        # tips get their full lists below, so they never take additions
+        thresholds = np.full(len(tips), np.inf)
+        if options["incremental"]:
+            for row, entries in enumerate(current):
+                if entries is not None:
+                    full = len(entries) >= top_k
+                    thresholds[row] = entries[-1][1] if full and entries else min_score
+
+        updates = {}
+        additions = defaultdict(list)
+        for block, scores in related.score_blocks(csr, csc, rows, max_rows, max_pairs):
+            for i, row in enumerate(block):
+                neighbours, values = related.best(scores[i], top_k, min_score)
+                updates[row] = _pairs(ids[neighbours], values)
+            for i, row in zip(*np.nonzero(scores > thresholds)):
+                additions[row].extend(_pairs([ids[block[i]]], [scores[i, row]]))
+        for row, pairs in additions.items():
+            updates[row] = related.merge(current[row], pairs, top_k)
+
+        Tip.objects.bulk_update(
+            [Tip(id=int(ids[row]), related=entries) for row, entries in updates.items()],
+            ["related"],
+            batch_size=options["batch_size"],
+        )
+        if updates:
+            bump_versions("tips")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {len(rows)} of {len(tips)} tips ({n_terms} terms), "
+                f"updated {len(updates)} related lists "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+        )
+
+
+def _pairs(tip_ids, scores):
+    return [[int(tip_id), round(float(score), 4)] for tip_id, score in zip(tip_ids, scores)]
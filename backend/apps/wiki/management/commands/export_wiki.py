@@ -0,0 +1,85 @@
+"""
+Django management command to export wiki content for backup or analysis.
+
+Categories, tips, votes and moderation flags are streamed from the database
+with .iterator() and written one row at a time, one file per table, so
+memory use stays flat regardless of dataset size. Load the output with
+import_wiki.
+
+Usage:
+    python manage.py export_wiki backups/2026-01-01
+    python manage.py export_wiki backups/2026-01-01 --format csv --gzip
+    python manage.py export_wiki backups/tips-only --tables categories tips
+"""
+
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from apps.wiki.transfer import (
+    FORMATS,
+    TABLES,
+    TABLES_BY_NAME,
+    data_path,
+    open_text,
+    write_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream categories, tips, votes and flags to JSONL or CSV files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="Directory to write the export files to")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default="jsonl",
+            dest="format",
+            help="Output format (default: jsonl)",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            dest="gzip",
+            help="Compress each file with gzip",
+        )
+        parser.add_argument(
+            "--tables",
+            nargs="+",
+            choices=list(TABLES_BY_NAME),
+            dest="tables",
+            help="Tables to export (default: all)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            dest="chunk_size",
+            help="Rows fetched from the database per round trip (default: 2000)",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        selected = set(options["tables"] or TABLES_BY_NAME)
+        started = time.perf_counter()
+
+        for table in TABLES:
+            if table.name not in selected:
+                continue
+            path = data_path(output_dir, table, options["format"], options["gzip"])
+            rows = (
+                table.model.objects.order_by("pk")
+                .values_list(*table.fields)
+                .iterator(chunk_size=options["chunk_size"])
+            )
+            with open_text(path, "w") as stream:
+                count = write_rows(stream, options["format"], table.fields, rows)
+            self.stdout.write(f"  {table.name}: {count} rows -> {path}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Export complete in {time.perf_counter() - started:.2f}s"
+            )
+        )
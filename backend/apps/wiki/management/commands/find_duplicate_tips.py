@@ -0,0 +1,145 @@
+"""
+Django management command to backfill MinHash signatures and report
+near-duplicate tips.
+
+Tips without a signature (all tips with --rebuild) are indexed first, so
+that create_tip can check new submissions against them. The LSH buckets
+are then scanned for duplicate clusters. In each bucket, every tip is
+checked against the bucket's first tip by signature similarity. Matches at
+or above --threshold are joined into clusters, and the largest clusters are
+printed. Nothing is deleted; review the report and reject tips through
+moderation.
+
+Clustering reads every signature and the whole bucket table. Deploys run
+--backfill-only, which only indexes new tips, so its cost follows the number
+of unindexed tips rather than the corpus size.
+
+Usage:
+    python manage.py find_duplicate_tips
+    python manage.py find_duplicate_tips --backfill-only
+    python manage.py find_duplicate_tips --rebuild
+    python manage.py find_duplicate_tips --threshold 0.9 --limit 50
+"""
+
+import time
+from itertools import groupby
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.wiki import dedup
+from apps.wiki.models import Tip, TipLSHBucket
+
+
+class Command(BaseCommand):
+    help = "Backfill tip MinHash signatures and report near-duplicate clusters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute signatures for every tip, not only unindexed ones",
+        )
+        parser.add_argument(
+            "--backfill-only",
+            action="store_true",
+            dest="backfill_only",
+            help="Index tips without a signature and skip the duplicate report",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=settings.DUPLICATE_TIP_THRESHOLD,
+            dest="threshold",
+            help="Estimated similarity that counts as a duplicate "
+            f"(default: {settings.DUPLICATE_TIP_THRESHOLD})",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            dest="limit",
+            help="Clusters to print, largest first (default: 20)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            dest="batch_size",
+            help="Tips indexed per transaction (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        tips = Tip.objects.only("id", "title", "description").order_by("id")
+        if not options["rebuild"]:
+            tips = tips.filter(minhash__isnull=True)
+        indexed = 0
+        batch = []
+        for tip in tips.iterator(chunk_size=options["batch_size"]):
+            batch.append(tip)
+            if len(batch) >= options["batch_size"]:
+                indexed += dedup.index_tips(batch)
+                batch = []
+        if batch:
+            indexed += dedup.index_tips(batch)
+        self.stdout.write(f"Indexed {indexed} tips")
+        if options["backfill_only"]:
+            return
+
+        clusters = self._clusters(options["threshold"])
+        titles = dict(
+            Tip.objects.filter(id__in=[i for c in clusters[: options["limit"]] for i in c])
+            .values_list("id", "title")
+        )
+        for cluster in clusters[: options["limit"]]:
+            self.stdout.write(f"Cluster of {len(cluster)}:")
+            for tip_id in cluster:
+                self.stdout.write(f"  #{tip_id} {titles[tip_id]}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(clusters)} duplicate clusters covering "
+                f"{sum(len(c) for c in clusters)} tips "
+                f"({time.perf_counter() - started:.2f}s)"
+            )
+        )
+
+    def _clusters(self, threshold):
+        """Clusters of tip ids (lowest id first), largest first."""
+        rows = list(Tip.objects.filter(minhash__isnull=False).values_list("id", "minhash"))
+        if not rows:
+            return []
+        ids = [tip_id for tip_id, _ in rows]
+        row_of = {tip_id: row for row, tip_id in enumerate(ids)}
+        signatures = np.vstack([dedup.unpack(blob) for _, blob in rows])
+
+        # Candidate pairs: each bucket member against the bucket's first tip
+        pairs = set()
+        buckets = TipLSHBucket.objects.order_by("key", "tip_id").values_list("key", "tip_id")
+        for _, members in groupby(buckets.iterator(chunk_size=5000), key=lambda row: row[0]):
+            first, *rest = [row_of[tip_id] for _, tip_id in members]
+            pairs.update((first, other) for other in rest)
+        if not pairs:
+            return []
+
+        left, right = np.array(sorted(pairs)).T
+        scores = (signatures[left] == signatures[right]).mean(axis=1)
+
+        parent = list(range(len(ids)))
+
+        def root(row):
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        for a, b in zip(left[scores >= threshold], right[scores >= threshold]):
+            parent[root(a)] = root(b)
+
+        groups = {}
+        for row in range(len(ids)):
+            groups.setdefault(root(row), []).append(ids[row])
+        clusters = [sorted(group) for group in groups.values() if len(group) > 1]
+        return sorted(clusters, key=lambda cluster: (-len(cluster), cluster[0]))
@@ -0,0 +1,475 @@
+"""
+Django management command to generate a large synthetic dataset for
+capacity planning and benchmarks.
+
+Tips, votes and moderation flags are drawn with vectorized NumPy random
+draws using the vote distribution rules from marketing/vote_seed_generator.py.
+Rows are streamed to the database chunk by chunk (COPY on PostgreSQL,
+batched executemany elsewhere) and tip aggregates are recomputed with
+set-based UPDATEs at the end.
+
+Output is reproducible: every chunk of GENERATION_CHUNK tips draws from its
+own generator seeded with (seed, chunk index), so the same --seed, --tips and
+--anchor-date always produce the same rows regardless of --batch-size.
+Generated tips are appended; run it against a dedicated database.
+
+Usage:
+    python manage.py generate_dataset --tips 1000000
+    python manage.py generate_dataset --tips 50000 --seed 7
+    python manage.py generate_dataset --tips 50000 --votes-per-tip-dist high=0.5,moderate=0.5
+    python manage.py generate_dataset --tips 50000 --flag-rate 0.05 --batch-size 10000
+"""
+
+import csv
+import io
+import time
+from datetime import datetime
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import slugify
+from apps.wiki import leaderboards
+from apps.wiki.models import Category, ModerationFlag, Tip, Vote
+from apps.wiki.response_cache import bump_versions
+from apps.wiki.sitemaps import invalidate_tip_sitemap_range
+from apps.wiki.utils import AIModerator, render_description_html
+
+# Vote count tiers from marketing/vote_seed_generator.py: share of tips and
+# the inclusive vote count range drawn for each tier.
+VOTE_DISTRIBUTION = {
+    "high": 0.25,
+    "moderate": 0.40,
+    "low": 0.25,
+    "none": 0.10,
+}
+VOTE_COUNT_RANGES = {
+    "high": (10, 25),
+    "moderate": (5, 9),
+    "low": (2, 4),
+    "none": (0, 1),
+}
+VOTE_MAX_DAYS_AGO = 90
+
+# Tips are created before the voting window opens
+TIP_AGE_DAYS = (VOTE_MAX_DAYS_AGO + 1, 365)
+
+FLAG_TYPES = ["keyword", "ai", "manual"]
+FLAG_TYPE_WEIGHTS = [0.5, 0.3, 0.2]
+FLAG_STATUSES = ["pending", "approved", "rejected", "escalated"]
+FLAG_STATUS_WEIGHTS = [0.6, 0.2, 0.15, 0.05]
+FLAG_CATEGORIES = [c for c in AIModerator.DEFAULT_CATEGORIES if c != "safe content"]
+
+DEFAULT_ANCHOR_DATE = "2026-01-01"
+GENERATION_CHUNK = 10_000
+FILLER_WORDS_PER_TIP = 8
+
+SECONDS_PER_DAY = 86_400
+
+
+def parse_distribution(value):
+    """Parse "high=0.25,moderate=0.40,..." into tier probabilities."""
+    distribution = dict.fromkeys(VOTE_COUNT_RANGES, 0.0)
+    try:
+        for part in value.split(","):
+            tier, share = part.split("=")
+            tier = tier.strip()
+            if tier not in VOTE_COUNT_RANGES:
+                raise CommandError(
+                    f"Unknown vote tier {tier!r}; expected one of "
+                    f"{', '.join(VOTE_COUNT_RANGES)}"
+                )
+            distribution[tier] = float(share)
+    except ValueError:
+        raise CommandError(f"Invalid --votes-per-tip-dist value: {value!r}")
+
+    if any(share < 0 for share in distribution.values()):
+        raise CommandError("Vote tier shares must be non-negative")
+    if not np.isclose(sum(distribution.values()), 1.0):
+        raise CommandError("Vote tier shares must sum to 1")
+    return distribution
+
+
+class Command(BaseCommand):
+    help = "Generate a reproducible synthetic dataset of tips, votes and flags"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tips",
+            type=int,
+            default=1000,
+            dest="tips",
+            help="Number of tips to generate (default: 1000)",
+        )
+        parser.add_argument(
+            "--votes-per-tip-dist",
+            default=",".join(f"{k}={v}" for k, v in VOTE_DISTRIBUTION.items()),
+            dest="votes_per_tip_dist",
+            help="Share of tips per vote tier, e.g. high=0.25,moderate=0.4,low=0.25,none=0.1",
+        )
+        parser.add_argument(
+            "--flag-rate",
+            type=float,
+            default=0.02,
+            dest="flag_rate",
+            help="Fraction of tips that receive a moderation flag (default: 0.02)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            dest="seed",
+            help="Random seed; identical seeds produce identical rows (default: 42)",
+        )
+        parser.add_argument(
+            "--anchor-date",
+            default=DEFAULT_ANCHOR_DATE,
+            dest="anchor_date",
+            help=f"UTC date that timestamps count back from (default: {DEFAULT_ANCHOR_DATE})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            dest="batch_size",
+            help="Rows per INSERT batch on databases without COPY (default: 5000)",
+        )
+
+    def handle(self, *args, **options):
+        from apps.wiki.fixtures.tips_data import CATEGORIES, TIPS_DATA
+
+        total_tips = options["tips"]
+        if total_tips < 1:
+            raise CommandError("--tips must be at least 1")
+        if not 0 <= options["flag_rate"] <= 1:
+            raise CommandError("--flag-rate must be between 0 and 1")
+        try:
+            anchor = datetime.strptime(options["anchor_date"], "%Y-%m-%d")
+        except ValueError:
+            raise CommandError("--anchor-date must be formatted YYYY-MM-DD")
+
+        self.distribution = parse_distribution(options["votes_per_tip_dist"])
+        self.flag_rate = options["flag_rate"]
+        self.seed = options["seed"]
+        self.batch_size = options["batch_size"]
+        self.use_copy = connection.vendor == "postgresql"
+        self.anchor = np.datetime64(anchor, "s")
+        self.anchor_value = self._format_datetimes(np.array([self.anchor]))[0]
+
+        categories_map = self._ensure_categories(CATEGORIES)
+        self.templates = [
+            (
+                tip["title"],
+                slugify(tip["title"]),
+                tip["description"],
+                categories_map[tip["category"]],
+            )
+            for tip in TIPS_DATA
+            if tip["category"] in categories_map
+        ]
+        words = {
+            word.strip(".,!?()").lower()
+            for tip in TIPS_DATA
+            for word in tip["description"].split()
+        }
+        self.vocabulary = np.array(sorted(words - {""}))
+
+        started = time.perf_counter()
+        totals = {"tips": 0, "votes": 0, "flags": 0}
+        first_id = last_id = None
+
+        self.stdout.write(
+            f"Generating {total_tips} tips (seed={self.seed}, "
+            f"{'COPY' if self.use_copy else 'batched INSERT'})..."
+        )
+
+        for chunk_index, offset in enumerate(range(0, total_tips, GENERATION_CHUNK)):
+            size = min(GENERATION_CHUNK, total_tips - offset)
+            with transaction.atomic():
+                tip_ids, counts = self._write_chunk(chunk_index, offset, size)
+            first_id = tip_ids[0] if first_id is None else first_id
+            last_id = tip_ids[-1]
+            totals["tips"] += size
+            totals["votes"] += counts["votes"]
+            totals["flags"] += counts["flags"]
+            self.stdout.write(
+                f"  {totals['tips']}/{total_tips} tips, {totals['votes']} votes, "
+                f"{totals['flags']} flags ({time.perf_counter() - started:.1f}s)"
+            )
+
+        generated = time.perf_counter() - started
+        self.stdout.write("Recomputing tip aggregates...")
+        self._recompute_aggregates(first_id, last_id)
+        Category.objects.filter(id__in=categories_map.values()).update(
+            updated_at=timezone.now()
+        )
+        invalidate_tip_sitemap_range(first_id, last_id)
+        bump_versions("tips", "categories")
+        leaderboards.rebuild()
+        elapsed = time.perf_counter() - started
+
+        rows = sum(totals.values())
+        self.stdout.write("=" * 70)
+        self.stdout.write(self.style.SUCCESS("DATASET GENERATION COMPLETE"))
+        self.stdout.write("=" * 70)
+        self.stdout.write(f"Tips: {totals['tips']} (ids {first_id}-{last_id})")
+        self.stdout.write(f"Votes: {totals['votes']}")
+        self.stdout.write(f"Flags: {totals['flags']}")
+        self.stdout.write(f"Insert time: {generated:.2f}s ({rows / generated:,.0f} rows/s)")
+        self.stdout.write(f"Elapsed: {elapsed:.2f}s")
+        self.stdout.write("=" * 70)
+
+    def _ensure_categories(self, names):
+        Category.objects.bulk_create(
+            [
+                Category(
+                    name=name,
+                    slug=slugify(name),
+                    description=f"Tips and advice related to {name.lower()}",
+                )
+                for name in names
+            ],
+            ignore_conflicts=True,
+        )
+        return dict(Category.objects.filter(name__in=names).values_list("name", "id"))
+
+    def _write_chunk(self, chunk_index, offset, size):
+        """Draw and insert one chunk of tips with their votes and flags."""
+        rng = np.random.default_rng([self.seed, chunk_index])
+
+        # Tips
+        template_idx = rng.integers(0, len(self.templates), size)
+        filler = self.vocabulary[
+            rng.integers(0, len(self.vocabulary), (size, FILLER_WORDS_PER_TIP))
+        ]
+        tip_age = rng.integers(
+            TIP_AGE_DAYS[0] * SECONDS_PER_DAY, TIP_AGE_DAYS[1] * SECONDS_PER_DAY, size
+        )
+        tip_created = self.anchor - tip_age.astype("timedelta64[s]")
+
+        tip_rows = []
+        for i, t_idx, words, created in zip(
+            range(offset, offset + size),
+            template_idx,
+            filler,
+            self._format_datetimes(tip_created),
+        ):
+            title, slug, description, category_id = self.templates[t_idx]
+            description = f"{description} {' '.join(words).capitalize()}."
+            html, version = render_description_html(description)
+            tip_rows.append(
+                (
+                    f"{title} #{i + 1}",
+                    f"{slug}-{i + 1}",
+                    description,
+                    html,
+                    version,
+                    category_id,
+                    0.0,
+                    0.0,
+                    0.0,
+                    0,
+                    created,
+                    self.anchor_value,
+                )
+            )
+        tip_ids = self._insert_returning_ids(
+            Tip,
+            [
+                "title",
+                "slug",
+                "description",
+                "description_html",
+                "description_html_version",
+                "category",
+                "effectiveness_avg",
+                "difficulty_avg",
+                "success_rate",
+                "vote_count",
+                "created_at",
+                "updated_at",
+            ],
+            tip_rows,
+        )
+
+        # Votes: tier per tip, then a count drawn from that tier's range
+        tiers = list(VOTE_COUNT_RANGES)
+        tier_idx = rng.choice(
+            len(tiers), size, p=[self.distribution[t] for t in tiers]
+        )
+        low = np.array([VOTE_COUNT_RANGES[t][0] for t in tiers])[tier_idx]
+        high = np.array([VOTE_COUNT_RANGES[t][1] for t in tiers])[tier_idx]
+        vote_counts = rng.integers(low, high + 1)
+        total_votes = int(vote_counts.sum())
+
+        effectiveness = rng.integers(1, 6, total_votes)
+        difficulty = rng.integers(1, 6, total_votes)
+        # Higher effectiveness often means higher difficulty, and vice versa
+        easy_but_effective = (effectiveness >= 4) & (difficulty < 3)
+        hard_but_weak = (effectiveness <= 2) & (difficulty >= 4)
+        difficulty[easy_but_effective] = rng.integers(3, 5, easy_but_effective.sum())
+        difficulty[hard_but_weak] = rng.integers(2, 4, hard_but_weak.sum())
+
+        vote_age = rng.integers(
+            SECONDS_PER_DAY, (VOTE_MAX_DAYS_AGO + 1) * SECONDS_PER_DAY, total_votes
+        )
+        ip_hashes = np.char.add("ip_", rng.integers(100000, 1000000, total_votes).astype(str))
+        vote_rows = zip(
+            np.repeat(tip_ids, vote_counts).tolist(),
+            effectiveness.tolist(),
+            difficulty.tolist(),
+            ip_hashes.tolist(),
+            self._format_datetimes(self.anchor - vote_age.astype("timedelta64[s]")),
+        )
+        self._insert(
+            Vote, ["tip", "effectiveness", "difficulty", "ip_hash", "created_at"], vote_rows
+        )
+
+        # Flags: a fixed fraction of tips, raised some time after creation
+        flagged = np.flatnonzero(rng.random(size) < self.flag_rate)
+        n_flags = len(flagged)
+        flag_type = rng.choice(len(FLAG_TYPES), n_flags, p=FLAG_TYPE_WEIGHTS)
+        status = rng.choice(len(FLAG_STATUSES), n_flags, p=FLAG_STATUS_WEIGHTS)
+        category = rng.integers(0, len(FLAG_CATEGORIES), n_flags)
+        confidence = rng.uniform(0.5, 1.0, n_flags)
+        flag_created = tip_created[flagged] + rng.integers(
+            0, TIP_AGE_DAYS[0] * SECONDS_PER_DAY, n_flags
+        ).astype("timedelta64[s]")
+        reviewed = flag_created + rng.integers(
+            3600, 7 * SECONDS_PER_DAY, n_flags
+        ).astype("timedelta64[s]")
+        flag_ip_hashes = rng.integers(100000, 1000000, n_flags)
+
+        flag_rows = []
+        for j, tip_pos in enumerate(flagged):
+            kind = FLAG_TYPES[flag_type[j]]
+            flag_status = FLAG_STATUSES[status[j]]
+            flag_rows.append(
+                (
+                    tip_ids[tip_pos],
+                    kind,
+                    "user_report" if kind == "manual" else FLAG_CATEGORIES[category[j]],
+                    1.0 if kind == "manual" else round(float(confidence[j]), 4),
+                    flag_status,
+                    "[]",
+                    f"Synthetic {kind} flag",
+                    f"ip_{flag_ip_hashes[j]}",
+                    None
+                    if flag_status == "pending"
+                    else self._format_datetimes(reviewed[j : j + 1])[0],
+                    self._format_datetimes(flag_created[j : j + 1])[0],
+                )
+            )
+        self._insert(
+            ModerationFlag,
+            [
+                "tip",
+                "flag_type",
+                "category",
+                "confidence",
+                "status",
+                "matched_terms",
+                "reason",
+                "ip_hash",
+                "reviewed_at",
+                "created_at",
+            ],
+            flag_rows,
+        )
+
+        return tip_ids, {"votes": total_votes, "flags": n_flags}
+
+    def _format_datetimes(self, values):
+        """Format UTC datetime64 values the way the backend stores them."""
+        formatted = np.char.replace(np.datetime_as_string(values, unit="s"), "T", " ")
+        if self.use_copy:
+            formatted = np.char.add(formatted, "+00:00")
+        return formatted.tolist()
+
+    def _insert_returning_ids(self, model, fields, rows):
+        """Insert rows in order and read back their primary keys."""
+        last_id = (
+            model.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        )
+        self._insert(model, fields, rows)
+        ids = list(
+            model.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[: len(rows)]
+        )
+        if len(ids) != len(rows):
+            raise CommandError(
+                f"Expected {len(rows)} new {model._meta.verbose_name_plural} rows, "
+                f"found {len(ids)}; is another process writing to this database?"
+            )
+        return ids
+
+    def _insert(self, model, fields, rows):
+        """
+        Stream rows into model's table.
+
+        Raw INSERT/COPY rather than bulk_create: created_at is auto_now_add,
+        which bulk_create would overwrite with the current time.
+        """
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(
+            connection.ops.quote_name(model._meta.get_field(name).column)
+            for name in fields
+        )
+
+        with connection.cursor() as cursor:
+            if self.use_copy:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+                if hasattr(cursor.cursor, "copy"):
+                    # psycopg 3
+                    with cursor.cursor.copy(sql) as copy:
+                        copy.write(buffer.getvalue())
+                else:
+                    cursor.cursor.copy_expert(sql, buffer)
+                return
+
+            sql = (
+                f"INSERT INTO {table} ({columns}) "
+                f"VALUES ({', '.join(['%s'] * len(fields))})"
+            )
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    cursor.executemany(sql, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+
+    def _recompute_aggregates(self, first_id, last_id):
+        """Recompute vote counts, averages and success rate with set-based UPDATEs."""
+        votes = Vote.objects.filter(tip=OuterRef("pk")).values("tip")
+        zero = Value(0.0, output_field=FloatField())
+        step = GENERATION_CHUNK
+        for start in range(first_id, last_id + 1, step):
+            with transaction.atomic():
+                tips = Tip.objects.filter(id__range=(start, min(start + step - 1, last_id)))
+                tips.update(
+                    effectiveness_avg=Coalesce(
+                        Subquery(votes.annotate(avg=Avg("effectiveness")).values("avg")),
+                        zero,
+                    ),
+                    difficulty_avg=Coalesce(
+                        Subquery(votes.annotate(avg=Avg("difficulty")).values("avg")),
+                        zero,
+                    ),
+                    vote_count=Coalesce(
+                        Subquery(votes.annotate(count=Count("id")).values("count")),
+                        Value(0),
+                    ),
+                )
+                # Same formula as Tip.calculate_success_rate()
+                tips.update(
+                    success_rate=F("effectiveness_avg") / (F("difficulty_avg") + 1) * 100
+                )
@@ -0,0 +1,116 @@
+"""
+Django management command to import affiliate products from the JSON fixture.
+
+AffiliateProduct rows are the single source of truth for affiliate links;
+affiliate_products.json is the checked-in seed. Products are matched on
+(network, product_key), so re-running the import updates rows in place.
+
+Usage:
+    python manage.py import_affiliate_products
+    python manage.py import_affiliate_products --fixture path/to/products.json
+    python manage.py import_affiliate_products --deactivate-missing
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.wiki.models import AffiliateKeyword, AffiliateProduct
+from apps.wiki.response_cache import bump_versions
+from apps.wiki.utils import (
+    DEFAULT_AFFILIATE_FIXTURE,
+    normalize_keywords,
+    reset_affiliate_generator,
+)
+
+UPDATE_FIELDS = ["name", "product_id", "category", "affiliate_url", "keywords", "is_active"]
+
+
+class Command(BaseCommand):
+    help = "Import affiliate products and keywords from affiliate_products.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fixture",
+            default=str(DEFAULT_AFFILIATE_FIXTURE),
+            help="Path to the affiliate products JSON fixture",
+        )
+        parser.add_argument(
+            "--deactivate-missing",
+            action="store_true",
+            dest="deactivate_missing",
+            help="Deactivate imported products that are no longer in the fixture",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["fixture"], "r", encoding="utf-8") as f:
+                mappings = json.load(f).get("affiliate_mappings", {})
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            raise CommandError(f"Could not read affiliate fixture: {e}")
+
+        existing = {
+            (product.network, product.product_key): product
+            for product in AffiliateProduct.objects.exclude(product_key="")
+        }
+
+        to_create = []
+        to_update = []
+        seen = set()
+        for network, products in mappings.items():
+            for product_key, data in products.items():
+                values = {
+                    "name": data.get("name", ""),
+                    "product_id": data.get("asin") or data.get("product_id", ""),
+                    "category": data.get("category", ""),
+                    "affiliate_url": data.get("url", ""),
+                    "keywords": normalize_keywords(data.get("keyword", [])),
+                    "is_active": True,
+                }
+                seen.add((network, product_key))
+
+                product = existing.get((network, product_key))
+                if product is None:
+                    to_create.append(
+                        AffiliateProduct(network=network, product_key=product_key, **values)
+                    )
+                elif any(getattr(product, k) != v for k, v in values.items()):
+                    for field, value in values.items():
+                        setattr(product, field, value)
+                    to_update.append(product)
+
+        to_deactivate = []
+        if options["deactivate_missing"]:
+            to_deactivate = [
+                product
+                for key, product in existing.items()
+                if key not in seen and product.is_active
+            ]
+            for product in to_deactivate:
+                product.is_active = False
+
+        with transaction.atomic():
+            created = AffiliateProduct.objects.bulk_create(to_create)
+            AffiliateProduct.objects.bulk_update(to_update + to_deactivate, UPDATE_FIELDS)
+
+            # Rebuild the normalized keyword rows for every touched product
+            changed = created + to_update
+            AffiliateKeyword.objects.filter(product__in=to_update).delete()
+            AffiliateKeyword.objects.bulk_create(
+                [
+                    AffiliateKeyword(product=product, keyword=keyword)
+                    for product in changed
+                    for keyword in product.keywords
+                ],
+                batch_size=500,
+            )
+
+        reset_affiliate_generator()
+        bump_versions("products")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Affiliate products: {len(created)} created, {len(to_update)} updated, "
+                f"{len(to_deactivate)} deactivated"
+            )
+        )
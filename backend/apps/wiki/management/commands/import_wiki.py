@@ -0,0 +1,273 @@
+"""
+Django management command to import wiki content written by export_wiki.
+
+Each table file is streamed in chunks and inserted with bulk_create, one
+transaction per chunk. Rows get new primary keys in the target database;
+foreign keys are remapped through old -> new id maps kept in <table>.idmap
+files. Categories are matched on slug, so importing into a seeded database
+reuses them.
+
+The export directory is only read, so backups can be read-only or shared.
+The id maps go to --idmap-dir. By default that is a directory under
+IMPORT_WIKI_STATE_DIR, named after the export directory and the target
+database, so importing one backup into two databases keeps two journals.
+
+The id map doubles as the import's journal. A chunk's pairs are appended
+and fsynced inside its transaction, before the commit, so every committed
+row is in the map. To resume an interrupted import, re-run it with
+--resume: rows whose old id is already mapped are skipped. If the process
+died after writing a chunk's pairs but before the commit, the rows behind
+those pairs were rolled back. A resume finds them missing at the end of
+the map, drops them and imports the rows again.
+
+Usage:
+    python manage.py import_wiki backups/2026-01-01
+    python manage.py import_wiki backups/2026-01-01 --chunk-size 5000
+    python manage.py import_wiki backups/2026-01-01 --tables tips votes flags --resume
+    python manage.py import_wiki backups/2026-01-01 --idmap-dir /var/tmp/import-state
+"""
+
+import hashlib
+import os
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.wiki import leaderboards
+from apps.wiki.models import Category
+from apps.wiki.response_cache import bump_versions
+from apps.wiki.sitemaps import invalidate_tip_sitemap_range
+from apps.wiki.transfer import (
+    TABLES,
+    TABLES_BY_NAME,
+    decode_value,
+    find_data_file,
+    open_text,
+    preserve_timestamps,
+    read_rows,
+)
+
+# Tables whose ids other tables refer to, and so need an id map
+REFERENCED_TABLES = {ref for table in TABLES for ref in table.foreign_keys.values()}
+
+
+class Command(BaseCommand):
+    help = "Stream categories, tips, votes and flags from export_wiki files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("input_dir", help="Directory written by export_wiki")
+        parser.add_argument(
+            "--tables",
+            nargs="+",
+            choices=list(TABLES_BY_NAME),
+            dest="tables",
+            help="Tables to import (default: all)",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            dest="resume",
+            help="Skip rows already recorded in the id maps of an interrupted import",
+        )
+        parser.add_argument(
+            "--idmap-dir",
+            dest="idmap_dir",
+            help="Directory for the id map journals "
+            "(default: a per-export, per-database directory under IMPORT_WIKI_STATE_DIR)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            dest="chunk_size",
+            help="Rows read and inserted per transaction (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError(
+                "import_wiki needs a database that returns ids from bulk inserts"
+            )
+
+        self.input_dir = Path(options["input_dir"])
+        self.idmap_dir = (
+            Path(options["idmap_dir"]) if options["idmap_dir"] else self._default_idmap_dir()
+        )
+        self.idmap_dir.mkdir(parents=True, exist_ok=True)
+        self.stdout.write(f"Id maps: {self.idmap_dir}")
+        self.chunk_size = options["chunk_size"]
+        selected = set(options["tables"] or TABLES_BY_NAME)
+        tables = [table for table in TABLES if table.name in selected]
+
+        sources = {}
+        for table in tables:
+            path, fmt = find_data_file(self.input_dir, table)
+            if path is None:
+                raise CommandError(f"No export file for {table.name} in {self.input_dir}")
+            sources[table.name] = (path, fmt)
+
+        started = time.perf_counter()
+        self.id_maps = {}
+        for table in tables:
+            for ref in table.foreign_keys.values():
+                if ref not in self.id_maps:
+                    self.id_maps[ref] = self._load_id_map(ref)
+            if options["resume"] and self._id_map_path(table.name).exists():
+                done = self._recover_id_map(table)
+            else:
+                self._id_map_path(table.name).write_text("")
+                done = {}
+            if table.name in REFERENCED_TABLES:
+                self.id_maps[table.name] = done
+
+            path, fmt = sources[table.name]
+            imported, skipped = self._import_table(table, path, fmt, set(done))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"  {table.name}: {imported} imported, {skipped} skipped, "
+                    f"{len(done)} already imported"
+                )
+            )
+
+        # Imported votes and aggregates bypass tip_vote's incremental updates
+        boards = leaderboards.rebuild()
+        self.stdout.write(f"  Rebuilt {boards} leaderboards")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Import complete in {time.perf_counter() - started:.2f}s")
+        )
+
+    def _import_table(self, table, path, fmt, done):
+        """Import the rows of one table whose old ids are not in done."""
+        meta = table.model._meta
+        fields = [(name, meta.get_field(name)) for name in table.fields if name != "id"]
+        imported = skipped = 0
+        position = 0
+
+        with open_text(path) as stream:
+            rows = (raw for raw in read_rows(stream, fmt) if int(raw["id"]) not in done)
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+
+                objs, old_ids = [], []
+                for raw in chunk:
+                    values = self._remap(table, fields, raw, fmt)
+                    if values is None:
+                        skipped += 1
+                        continue
+                    objs.append(table.model(**values))
+                    old_ids.append(int(raw["id"]))
+
+                with transaction.atomic(), preserve_timestamps(table.model):
+                    new_ids = self._insert(table, objs)
+                    # Journal the chunk before it commits; see the module docstring
+                    self._record_ids(table.name, zip(old_ids, new_ids))
+                if table.name == "tips" and new_ids:
+                    self._touch_tips(objs, new_ids)
+
+                imported += len(objs)
+                position += len(chunk)
+                self.stdout.write(f"  {table.name}: {position} new rows read")
+
+        return imported, skipped
+
+    def _remap(self, table, fields, raw, fmt):
+        """Decode a raw row and map its foreign keys; None if a target is missing."""
+        values = {}
+        for name, field in fields:
+            value = decode_value(field, raw.get(name), fmt)
+            if value is None and name not in raw and field.has_default():
+                # Column added after the export was written
+                value = field.get_default()
+            ref = table.foreign_keys.get(name)
+            if ref and value is not None:
+                value = self.id_maps[ref].get(value)
+                if value is None:
+                    return None
+            values[name] = value
+        return values
+
+    def _insert(self, table, objs):
+        """Insert one chunk and return the new primary keys in row order."""
+        if table.name == "categories":
+            # Slugs are unique: existing categories are reused, not duplicated
+            Category.objects.bulk_create(objs, ignore_conflicts=True)
+            ids_by_slug = dict(
+                Category.objects.filter(slug__in=[c.slug for c in objs]).values_list(
+                    "slug", "id"
+                )
+            )
+            return [ids_by_slug[c.slug] for c in objs]
+        return [obj.pk for obj in table.model.objects.bulk_create(objs)]
+
+    def _touch_tips(self, tips, new_ids):
+        # bulk_create skips Tip.save(), which normally does both of these
+        Category.objects.filter(id__in={tip.category_id for tip in tips}).update(
+            updated_at=timezone.now()
+        )
+        invalidate_tip_sitemap_range(min(new_ids), max(new_ids))
+        bump_versions("tips", "categories")
+
+    def _default_idmap_dir(self):
+        source = self.input_dir.resolve()
+        database = connection.settings_dict
+        key = f"{source}|{database['ENGINE']}|{database['HOST']}|{database['NAME']}"
+        digest = hashlib.sha256(key.encode()).hexdigest()[:12]
+        return Path(settings.IMPORT_WIKI_STATE_DIR) / f"{source.name}-{digest}"
+
+    def _id_map_path(self, name):
+        return self.idmap_dir / f"{name}.idmap"
+
+    def _read_id_pairs(self, name):
+        with open(self._id_map_path(name), encoding="utf-8") as f:
+            return [tuple(map(int, line.split(","))) for line in f if line.strip()]
+
+    def _load_id_map(self, name):
+        if not self._id_map_path(name).exists():
+            raise CommandError(
+                f"No id map for {name}; import it first or include it in --tables"
+            )
+        return dict(self._read_id_pairs(name))
+
+    def _recover_id_map(self, table):
+        """
+        Load a table's id map for --resume. Pairs at the end of the map
+        whose rows are missing from the database were journaled by a chunk
+        that never committed; they are dropped from the map and the file.
+        """
+        pairs = self._read_id_pairs(table.name)
+        kept = len(pairs)
+        while kept:
+            start = max(0, kept - self.chunk_size)
+            existing = set(
+                table.model.objects.filter(
+                    id__in=[new for _, new in pairs[start:kept]]
+                ).values_list("id", flat=True)
+            )
+            while kept > start and pairs[kept - 1][1] not in existing:
+                kept -= 1
+            if kept > start:
+                break
+        if kept < len(pairs):
+            self.stdout.write(
+                f"  {table.name}: dropped {len(pairs) - kept} id map entries "
+                "of an uncommitted chunk"
+            )
+            with open(self._id_map_path(table.name), "w", encoding="utf-8") as f:
+                f.writelines(f"{old},{new}\n" for old, new in pairs[:kept])
+        return dict(pairs[:kept])
+
+    def _record_ids(self, name, pairs):
+        pairs = list(pairs)
+        if name in REFERENCED_TABLES:
+            self.id_maps[name].update(pairs)
+        with open(self._id_map_path(name), "a", encoding="utf-8") as f:
+            f.writelines(f"{old},{new}\n" for old, new in pairs)
+            f.flush()
+            os.fsync(f.fileno())
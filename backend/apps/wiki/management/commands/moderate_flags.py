@@ -0,0 +1,83 @@
+"""
+Django management command to approve or reject moderation flags in bulk.
+
+Flags are selected by id or by the same status/type/category filters as the
+moderation queue. The whole batch is updated with one UPDATE and logged with
+one bulk insert, in a single transaction (see apps/wiki/moderation.py).
+
+Usage:
+    python manage.py moderate_flags reject --ids 12 13 14
+    python manage.py moderate_flags approve --status pending --category spam --reject-tips
+    python manage.py moderate_flags approve --type keyword --reviewer alice --dry-run
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from apps.wiki.moderation import ACTIONS, BulkModerationError, bulk_review_flags
+
+
+class Command(BaseCommand):
+    help = "Approve or reject moderation flags in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=list(ACTIONS), help="Review action")
+        parser.add_argument(
+            "--ids",
+            nargs="+",
+            type=int,
+            dest="ids",
+            help="Flag ids to review",
+        )
+        parser.add_argument("--status", dest="status", help="Only flags with this status")
+        parser.add_argument("--type", dest="flag_type", help="Only flags of this type")
+        parser.add_argument("--category", dest="category", help="Only flags in this category")
+        parser.add_argument(
+            "--reviewer",
+            dest="reviewer",
+            help="Username recorded as the reviewer",
+        )
+        parser.add_argument(
+            "--reject-tips",
+            action="store_true",
+            dest="reject_tips",
+            help="Also remove the tips of approved flags",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            dest="dry_run",
+            help="Report what would change without changing anything",
+        )
+
+    def handle(self, *args, **options):
+        reviewer = None
+        if options["reviewer"]:
+            User = get_user_model()
+            try:
+                reviewer = User.objects.get_by_natural_key(options["reviewer"])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown reviewer: {options['reviewer']}")
+
+        filters = {
+            "status": options["status"],
+            "type": options["flag_type"],
+            "category": options["category"],
+        }
+        try:
+            result = bulk_review_flags(
+                options["action"],
+                reviewer=reviewer,
+                ids=options["ids"],
+                filters={key: value for key, value in filters.items() if value},
+                reject_tips=options["reject_tips"],
+                dry_run=options["dry_run"],
+            )
+        except BulkModerationError as exc:
+            raise CommandError(str(exc))
+
+        prefix = "[dry run] " if options["dry_run"] else ""
+        status = ACTIONS[options["action"]][0]
+        message = f"{prefix}{status.capitalize()} {result['updated']} flags"
+        if options["reject_tips"]:
+            message += f", rejected {result['tips_rejected']} tips"
+        self.stdout.write(self.style.SUCCESS(message))
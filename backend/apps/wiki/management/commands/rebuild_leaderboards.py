@@ -0,0 +1,31 @@
+"""
+Django management command to recompute the materialized tip leaderboards.
+
+tip_vote keeps the leaderboards current incrementally, and boards are built
+on first read. Run this as a fallback: after editing tips or votes outside
+the API, or if a board is suspected to have drifted.
+
+Usage:
+    python manage.py rebuild_leaderboards
+    python manage.py rebuild_leaderboards --metric trending
+"""
+
+from django.core.management.base import BaseCommand
+from apps.wiki import leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recompute the site-wide and per-category tip leaderboards"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--metric",
+            action="append",
+            choices=leaderboards.METRICS,
+            dest="metrics",
+            help="Metric to rebuild; repeat for several (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        boards = leaderboards.rebuild(options["metrics"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {boards} leaderboards"))
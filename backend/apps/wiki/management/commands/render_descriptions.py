@@ -0,0 +1,73 @@
+"""
+Django management command to re-render affiliate-linked tip descriptions.
+
+Tips store a pre-rendered description_html together with the affiliate
+version it was rendered with. Run this command after affiliate_products.json
+or AffiliateProduct rows change; only tips rendered with an older version are
+touched unless --force is given.
+
+Usage:
+    python manage.py render_descriptions
+    python manage.py render_descriptions --force --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.wiki.models import Tip
+from apps.wiki.response_cache import bump_versions
+from apps.wiki.utils import get_affiliate_generator, reset_affiliate_generator
+
+
+class Command(BaseCommand):
+    help = "Re-render description_html for tips with stale affiliate links"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render every tip, not only those with a stale version",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            dest="batch_size",
+            help="Number of tips fetched and updated per batch (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        # Always start from the current mappings, not a cached generator
+        reset_affiliate_generator()
+        version = get_affiliate_generator().version
+        batch_size = options["batch_size"]
+
+        tips = Tip.objects.only("id", "description").order_by("id")
+        if not options["force"]:
+            tips = tips.exclude(description_html_version=version)
+
+        rendered = 0
+        batch = []
+        for tip in tips.iterator(chunk_size=batch_size):
+            tip.render_description()
+            batch.append(tip)
+            if len(batch) >= batch_size:
+                rendered += self._flush(batch)
+                batch = []
+        rendered += self._flush(batch)
+        if rendered:
+            bump_versions("tips")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {rendered} tip descriptions (affiliate version {version})"
+            )
+        )
+
+    def _flush(self, batch):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            Tip.objects.bulk_update(
+                batch, ["description_html", "description_html_version"]
+            )
+        return len(batch)
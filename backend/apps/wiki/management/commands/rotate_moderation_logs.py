@@ -0,0 +1,141 @@
+"""
+Django management command to rotate ModerationLog partitions.
+
+On PostgreSQL, ModerationLog is partitioned by month (see
+apps/wiki/partitions.py). This command creates the partitions for the next
+--months-ahead months. It also drops whole partitions older than
+--retention-months, or detaches them into archive tables with --archive.
+Either way expired months go in constant time, with no large DELETE. On
+other databases the log is a single table and expired rows are deleted in
+batches.
+
+Run it at least monthly (it runs on every release); rows that arrive before
+their month's partition exists land in the default partition and are moved
+when the partition is created.
+
+Usage:
+    python manage.py rotate_moderation_logs
+    python manage.py rotate_moderation_logs --retention-months 6 --months-ahead 2
+    python manage.py rotate_moderation_logs --archive
+    python manage.py rotate_moderation_logs --dry-run
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from apps.wiki import partitions
+from apps.wiki.models import ModerationLog
+
+
+class Command(BaseCommand):
+    help = "Create upcoming ModerationLog partitions and drop or archive expired ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.MODERATION_LOG_RETENTION_MONTHS,
+            dest="retention_months",
+            help="Months of logs to keep, including the current month "
+            f"(default: {settings.MODERATION_LOG_RETENTION_MONTHS})",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.MODERATION_LOG_PARTITIONS_AHEAD,
+            dest="months_ahead",
+            help="Future months to create partitions for "
+            f"(default: {settings.MODERATION_LOG_PARTITIONS_AHEAD})",
+        )
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            dest="archive",
+            help="Detach expired partitions into archive tables instead of dropping them",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            dest="dry_run",
+            help="Report what would change without changing anything",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            dest="batch_size",
+            help="Rows per DELETE on databases without partitions (default: 5000)",
+        )
+
+    def handle(self, *args, **options):
+        if options["retention_months"] < 1:
+            raise CommandError("--retention-months must be at least 1")
+
+        current = partitions.month_start(timezone.now())
+        cutoff = partitions.add_months(current, 1 - options["retention_months"])
+        self.dry_run = options["dry_run"]
+        prefix = "[dry run] " if self.dry_run else ""
+
+        if partitions.is_partitioned():
+            self._rotate_partitions(current, cutoff, options, prefix)
+        else:
+            if options["archive"]:
+                raise CommandError("--archive needs the partitioned PostgreSQL log table")
+            self._delete_expired(cutoff, options["batch_size"], prefix)
+
+    def _rotate_partitions(self, current, cutoff, options, prefix):
+        existing = partitions.monthly_partitions()
+
+        upcoming = [
+            partitions.add_months(current, offset)
+            for offset in range(options["months_ahead"] + 1)
+        ]
+        for month in upcoming:
+            if month not in existing:
+                if not self.dry_run:
+                    with transaction.atomic():
+                        partitions.create_partition(month)
+                self.stdout.write(f"{prefix}Created {partitions.partition_name(month)}")
+
+        for month in sorted(m for m in existing if m < cutoff):
+            name = existing[month]
+            if options["archive"]:
+                if not self.dry_run:
+                    with transaction.atomic():
+                        partitions.archive_partition(month)
+                archive = f"{partitions.ARCHIVE_PREFIX}{month:%Y_%m}"
+                self.stdout.write(f"{prefix}Archived {name} as {archive}")
+            else:
+                if not self.dry_run:
+                    with transaction.atomic():
+                        partitions.drop_partition(month)
+                self.stdout.write(f"{prefix}Dropped {name}")
+
+        if not self.dry_run:
+            deleted = partitions.delete_default_before(cutoff)
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} expired rows from the default partition")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{prefix}Keeping moderation logs from {cutoff:%Y-%m}")
+        )
+
+    def _delete_expired(self, cutoff, batch_size, prefix):
+        expired = ModerationLog.objects.filter(created_at__lt=cutoff)
+        if self.dry_run:
+            self.stdout.write(f"{prefix}Would delete {expired.count()} expired logs")
+            return
+
+        deleted = 0
+        while True:
+            ids = list(expired.order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted += ModerationLog.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} logs older than {cutoff:%Y-%m} (single-table mode)"
+            )
+        )
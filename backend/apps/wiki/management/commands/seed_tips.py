@@ -2,17 +2,27 @@
 Django management command to seed the database with curated hygiene tips.
 
 This command imports tips from the curated data file and creates
-categories and tips in the database.
+categories and tips in the database. Existing (title, description) pairs are
+loaded in one query and new rows are written with bulk_create inside a
+single transaction.
 
 Usage:
     python manage.py seed_tips
     python manage.py seed_tips --clear-existing
+    python manage.py seed_tips --dry-run
+    python manage.py seed_tips --batch-size 1000
 """
 
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
 from django.utils.text import slugify
 from apps.wiki.models import Category, Tip
+from apps.wiki.response_cache import bump_versions
+from apps.wiki.sitemaps import invalidate_tip_sitemap_range
 
 
 class Command(BaseCommand):
@@ -25,107 +35,170 @@ class Command(BaseCommand):
             dest="clear_existing",
             help="Clear existing categories and tips before seeding",
         )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            dest="dry_run",
+            help="Report what would be created and how long planning took, without writing",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            dest="batch_size",
+            help="Rows per INSERT statement (default: 500)",
+        )
 
     def handle(self, *args, **options):
         # Import tips data
         from apps.wiki.fixtures.tips_data import TIPS_DATA, CATEGORIES
 
         clear_existing = options.get("clear_existing", False)
+        dry_run = options.get("dry_run", False)
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
 
-        if clear_existing:
-            self.stdout.write(self.style.WARNING("Clearing existing data..."))
-            Tip.objects.all().delete()
-            Category.objects.all().delete()
-            self.stdout.write(self.style.SUCCESS("Existing data cleared."))
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Dry run: no changes will be written.\n"))
 
         self.stdout.write("Starting to seed database with hygiene tips...\n")
 
-        # Create categories
-        categories_created = 0
-        categories_map = {}
-
-        self.stdout.write("Creating categories...")
-        for category_name in CATEGORIES:
-            slug = slugify(category_name)
-            category, created = Category.objects.get_or_create(
-                name=category_name,
-                defaults={
-                    "slug": slug,
-                    "description": f"Tips and advice related to {category_name.lower()}",
-                },
-            )
-            categories_map[category_name] = category
-            if created:
-                categories_created += 1
-                self.stdout.write(f"  ✓ Created category: {category_name}")
-            else:
-                self.stdout.write(f"  - Category already exists: {category_name}")
-
-        self.stdout.write(
-            f"\nCategories: {categories_created} created, {len(CATEGORIES) - categories_created} already exist\n"
-        )
+        with transaction.atomic():
+            if clear_existing and not dry_run:
+                self.stdout.write(self.style.WARNING("Clearing existing data..."))
+                Tip.objects.all().delete()
+                Category.objects.all().delete()
+                self.stdout.write(self.style.SUCCESS("Existing data cleared."))
 
-        # Create tips
-        tips_created = 0
-        tips_skipped = 0
-
-        self.stdout.write("Creating tips...")
-        for tip_data in TIPS_DATA:
-            category_name = tip_data["category"]
-            title = tip_data["title"]
-            description = tip_data["description"]
-
-            # Get or skip if category doesn't exist
-            if category_name not in categories_map:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'  ✗ Skipping tip "{title}" - category "{category_name}" not found'
-                    )
+            # Categories: one query for what exists, one INSERT for the rest
+            # A dry run with --clear-existing plans against an empty database
+            simulate_empty = clear_existing and dry_run
+
+            categories_map = {} if simulate_empty else dict(
+                Category.objects.filter(name__in=CATEGORIES).values_list("name", "id")
+            )
+            new_categories = [
+                Category(
+                    name=name,
+                    slug=slugify(name),
+                    description=f"Tips and advice related to {name.lower()}",
+                )
+                for name in CATEGORIES
+                if name not in categories_map
+            ]
+            if new_categories and not dry_run:
+                Category.objects.bulk_create(
+                    new_categories, batch_size=batch_size, ignore_conflicts=True
                 )
-                tips_skipped += 1
-                continue
-
-            category = categories_map[category_name]
-
-            # Check if tip already exists
-            existing_tip = Tip.objects.filter(
-                title=title, description=description
-            ).first()
-
-            if existing_tip:
-                self.stdout.write(f"  - Tip already exists: {title[:50]}...")
-                tips_skipped += 1
-                continue
-
-            # Create tip
-            tip = Tip.objects.create(
-                title=title,
-                description=description,
-                category=category,
-                slug=slugify(title),
-                effectiveness_avg=0.0,
-                difficulty_avg=0.0,
-                success_rate=0.0,
+                # A category whose slug is already taken under another name
+                # was skipped by ignore_conflicts; it maps to that row
+                ids_by_slug = dict(
+                    Category.objects.filter(
+                        slug__in=[category.slug for category in new_categories]
+                    ).values_list("slug", "id")
+                )
+                missing = [c.name for c in new_categories if c.slug not in ids_by_slug]
+                if missing:
+                    raise CommandError(f"Categories not created: {', '.join(missing)}")
+                categories_map.update(
+                    (category.name, ids_by_slug[category.slug]) for category in new_categories
+                )
+
+            self.stdout.write(
+                f"Categories: {len(new_categories)} to create, "
+                f"{len(CATEGORIES) - len(new_categories)} already exist\n"
             )
-            tips_created += 1
-            self.stdout.write(f"  ✓ Created tip: {title[:50]}...")
 
-        self.stdout.write(f"\nTips: {tips_created} created, {tips_skipped} skipped\n")
+            # Tips: preload existing (title, description) keys in one query
+            existing_keys = set() if simulate_empty else set(
+                Tip.objects.filter(
+                    title__in={tip_data["title"] for tip_data in TIPS_DATA}
+                ).values_list("title", "description")
+            )
+
+            new_tips = []
+            tips_skipped = 0
+            for tip_data in TIPS_DATA:
+                category_name = tip_data["category"]
+                title = tip_data["title"]
+                key = (title, tip_data["description"])
+
+                if category_name not in CATEGORIES:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'  ✗ Skipping tip "{title}" - category "{category_name}" not found'
+                        )
+                    )
+                    tips_skipped += 1
+                    continue
+
+                if key in existing_keys:
+                    tips_skipped += 1
+                    continue
+                existing_keys.add(key)
+
+                tip = Tip(
+                    title=title,
+                    description=tip_data["description"],
+                    category_id=categories_map.get(category_name),
+                    slug=tip_data.get("slug") or slugify(title),
+                    effectiveness_avg=0.0,
+                    difficulty_avg=0.0,
+                    success_rate=0.0,
+                )
+                # bulk_create bypasses Tip.save(), so render here
+                tip.render_description()
+                new_tips.append(tip)
+
+            planned = time.perf_counter() - started
+
+            if dry_run:
+                self._report_dry_run(new_categories, new_tips, tips_skipped, planned)
+                return
+
+            max_id_before = Tip.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+            Tip.objects.bulk_create(new_tips, batch_size=batch_size)
+            max_id_after = Tip.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+            if new_tips:
+                Category.objects.filter(
+                    id__in={tip.category_id for tip in new_tips}
+                ).update(updated_at=timezone.now())
+
+        invalidate_tip_sitemap_range(max_id_before + 1, max_id_after)
+        bump_versions("tips", "categories")
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"\nTips: {len(new_tips)} created, {tips_skipped} skipped\n")
+
+        # Summary and per-category breakdown from a single aggregate query
+        breakdown = list(
+            Category.objects.annotate(tip_count=Count("tips"))
+            .order_by("name")
+            .values_list("name", "tip_count")
+        )
 
-        # Summary
         self.stdout.write("=" * 70)
         self.stdout.write(self.style.SUCCESS("DATABASE SEEDING COMPLETE"))
         self.stdout.write("=" * 70)
-        self.stdout.write(f"Total categories: {Category.objects.count()}")
-        self.stdout.write(f"Total tips: {Tip.objects.count()}")
-        self.stdout.write(f"New categories created: {categories_created}")
-        self.stdout.write(f"New tips created: {tips_created}")
+        self.stdout.write(f"Total categories: {len(breakdown)}")
+        self.stdout.write(f"Total tips: {sum(count for _, count in breakdown)}")
+        self.stdout.write(f"New categories created: {len(new_categories)}")
+        self.stdout.write(f"New tips created: {len(new_tips)}")
+        self.stdout.write(f"Elapsed: {elapsed:.3f}s")
         self.stdout.write("=" * 70)
 
-        # Display category breakdown
         self.stdout.write("\nCategory breakdown:")
-        for category in Category.objects.all():
-            tip_count = category.tips.count()
-            self.stdout.write(f"  • {category.name}: {tip_count} tips")
+        for name, tip_count in breakdown:
+            self.stdout.write(f"  • {name}: {tip_count} tips")
 
         self.stdout.write("\n" + self.style.SUCCESS("Done!"))
+
+    def _report_dry_run(self, new_categories, new_tips, tips_skipped, planned):
+        self.stdout.write("=" * 70)
+        self.stdout.write(self.style.WARNING("DRY RUN COMPLETE"))
+        self.stdout.write("=" * 70)
+        self.stdout.write(f"Categories to create: {len(new_categories)}")
+        self.stdout.write(f"Tips to create: {len(new_tips)}")
+        self.stdout.write(f"Tips skipped: {tips_skipped}")
+        self.stdout.write(f"Planning time: {planned:.3f}s")
+        self.stdout.write("=" * 70)
@@ -6,9 +6,18 @@ from typing import Optional, Dict, Any
 
 from django.conf import settings
 from django.http import HttpRequest, HttpResponse, JsonResponse
-from django.core.cache import cache
+from django.core.cache import cache, caches
 from django.utils import timezone
 
+from .routers import (
+    end_routing_context,
+    replica_aliases,
+    start_routing_context,
+    wrote_to_primary,
+)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
 
 def get_client_ip(request: HttpRequest) -> str:
     """
@@ -185,18 +194,22 @@ class ContentModerationMiddleware:
         """
         hashed_ip = cls.get_user_ip_hash(request)
         cache_key = f"ratelimit_{action}_{hashed_ip}"
+        ratelimit_cache = caches["ratelimit"]
 
-        current_count = cache.get(cache_key, 0)
+        current_count = ratelimit_cache.get(cache_key, 0)
 
         if current_count >= limit:
             return False
 
-        # Increment counter
-        new_count = (
-            cache.incr(cache_key)
-            if cache.get(cache_key) is not None
-            else cache.set(cache_key, 1, cls._get_period_seconds(period))
-        )
+        # add() only starts a new window; incr() is atomic on the shared
+        # backends, so concurrent workers never lose a hit
+        timeout = cls._get_period_seconds(period)
+        ratelimit_cache.add(cache_key, 0, timeout)
+        try:
+            new_count = ratelimit_cache.incr(cache_key)
+        except ValueError:  # window expired between add() and incr()
+            ratelimit_cache.set(cache_key, 1, timeout)
+            new_count = 1
         return new_count <= limit
 
     @staticmethod
@@ -212,9 +225,41 @@ class ContentModerationMiddleware:
         return period_map.get(period, 3600)
 
 
+class PrimaryPinningMiddleware:
+    """
+    Pin a client's database reads to the primary for a short window after
+    it writes, so e.g. a voter always sees their own vote.
+
+    Clients are identified by hashed IP, like votes, and the pin is kept in
+    the cache for DATABASE_PIN_SECONDS. Requests with unsafe methods read from
+    the primary for their whole duration. A no-op without read replicas.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, "DATABASE_PIN_SECONDS", 5)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not replica_aliases():
+            return self.get_response(request)
+
+        cache_key = f"db_pin_{hash_ip_address(get_client_ip(request))}"
+        pinned = request.method not in SAFE_METHODS or bool(cache.get(cache_key))
+
+        tokens = start_routing_context(pinned)
+        try:
+            response = self.get_response(request)
+            if wrote_to_primary():
+                cache.set(cache_key, 1, self.pin_seconds)
+        finally:
+            end_routing_context(tokens)
+        return response
+
+
 # Export utility functions for use in views and serializers
 __all__ = [
     "ContentModerationMiddleware",
+    "PrimaryPinningMiddleware",
     "get_client_ip",
     "hash_ip_address",
     "load_blacklist_terms",
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0003_alter_category_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tip',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tip',
+            name='description_html_version',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
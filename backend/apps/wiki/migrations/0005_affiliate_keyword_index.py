@@ -0,0 +1,94 @@
+# Generated by Django 6.0.1 on 2026-10-19 05:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+GIN_INDEX_NAME = "wiki_affiliateproduct_keywords_gin"
+
+
+def create_keywords_gin_index(apps, schema_editor):
+    """GIN index for keywords @> '["..."]' lookups; PostgreSQL only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIN_INDEX_NAME} "
+        "ON wiki_affiliateproduct USING gin (keywords jsonb_path_ops)"
+    )
+
+
+def drop_keywords_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX_NAME}")
+
+
+def backfill_keyword_entries(apps, schema_editor):
+    AffiliateProduct = apps.get_model("wiki", "AffiliateProduct")
+    AffiliateKeyword = apps.get_model("wiki", "AffiliateKeyword")
+
+    entries = []
+    for product in AffiliateProduct.objects.all():
+        keywords = dict.fromkeys(
+            kw.lower().strip() for kw in product.keywords or [] if kw.strip()
+        )
+        if list(keywords) != product.keywords:
+            product.keywords = list(keywords)
+            product.save(update_fields=["keywords"])
+        entries.extend(
+            AffiliateKeyword(product_id=product.pk, keyword=kw) for kw in keywords
+        )
+    AffiliateKeyword.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0004_tip_description_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AffiliateKeyword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keyword', models.CharField(db_index=True, max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Affiliate Keyword',
+                'verbose_name_plural': 'Affiliate Keywords',
+            },
+        ),
+        migrations.AddField(
+            model_name='affiliateproduct',
+            name='category',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='affiliateproduct',
+            name='product_id',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='affiliateproduct',
+            name='product_key',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='affiliateproduct',
+            constraint=models.UniqueConstraint(condition=models.Q(('product_key', ''), _negated=True), fields=('network', 'product_key'), name='unique_affiliate_product_key'),
+        ),
+        migrations.AddField(
+            model_name='affiliatekeyword',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='keyword_entries', to='wiki.affiliateproduct'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='affiliatekeyword',
+            unique_together={('product', 'keyword')},
+        ),
+        migrations.RunPython(
+            backfill_keyword_entries, migrations.RunPython.noop
+        ),
+        migrations.RunPython(create_keywords_gin_index, drop_keywords_gin_index),
+    ]
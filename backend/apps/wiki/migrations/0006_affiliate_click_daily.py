@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 05:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0005_affiliate_keyword_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AffiliateClickDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('clicks', models.PositiveBigIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_clicks', to='wiki.affiliateproduct')),
+            ],
+            options={
+                'verbose_name': 'Affiliate Click Rollup',
+                'verbose_name_plural': 'Affiliate Click Rollups',
+                'ordering': ['-day', 'product'],
+                'indexes': [models.Index(fields=['day', 'platform'], name='wiki_affili_day_d259f8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'day'), name='unique_affiliate_click_day')],
+            },
+        ),
+    ]
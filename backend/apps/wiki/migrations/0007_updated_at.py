@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 05:59
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_tip_updated_at(apps, schema_editor):
+    """Existing tips were last modified when they were created."""
+    Tip = apps.get_model("wiki", "Tip")
+    Tip.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0006_affiliate_click_daily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='tip',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_tip_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.0.1 on 2026-10-19 06:07
+
+from django.db import migrations, models
+
+
+TITLE_TRGM_INDEX_NAME = "wiki_tip_title_trgm_idx"
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    AddIndex that builds with CREATE INDEX CONCURRENTLY on PostgreSQL, so the
+    tables stay writable while indexes are built. Plain AddIndex elsewhere.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.add_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.remove_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, self.index)
+
+
+def create_title_trgm_index(apps, schema_editor):
+    """Trigram index for search_tips' title__icontains; PostgreSQL only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # icontains compiles to UPPER("title"::text) LIKE UPPER(%s)
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {TITLE_TRGM_INDEX_NAME} "
+        "ON wiki_tip USING gin ((UPPER(title::text)) gin_trgm_ops)"
+    )
+
+
+def drop_title_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {TITLE_TRGM_INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('wiki', '0007_updated_at'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='tip',
+            index=models.Index(fields=['category', '-created_at'], name='wiki_tip_category_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tip',
+            index=models.Index(fields=['-created_at', 'id'], name='wiki_tip_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tip',
+            index=models.Index(fields=['-success_rate'], name='wiki_tip_success_rate_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='vote',
+            index=models.Index(fields=['tip', 'ip_hash'], name='wiki_vote_tip_ip_hash_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='vote',
+            index=models.Index(fields=['tip', 'created_at'], name='wiki_vote_tip_created_idx'),
+        ),
+        migrations.RunPython(create_title_trgm_index, drop_title_trgm_index),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 6.0.1 on 2026-10-19 06:30
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+
+PARENT_TABLE = "wiki_moderationlog"
+NEW_TABLE = "wiki_moderationlog_partitioned"
+DEFAULT_PARTITION = "wiki_moderationlog_default"
+SEQUENCE = "wiki_moderationlog_id_seq"
+MONTHS_AHEAD = 3
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_moderation_log(apps, schema_editor):
+    """
+    Rebuild wiki_moderationlog as a table partitioned by month on created_at.
+
+    The primary key becomes (id, created_at), as PostgreSQL requires the
+    partition key in unique constraints; ids still come from one sequence.
+    Monthly partitions are created from the oldest row through MONTHS_AHEAD
+    months from now, plus a default partition. Single table elsewhere.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    ModerationLog = apps.get_model("wiki", "ModerationLog")
+    execute = schema_editor.execute
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(created_at), MAX(id) FROM {PARENT_TABLE}")
+        oldest, max_id = cursor.fetchone()
+
+    execute(
+        f"CREATE TABLE {NEW_TABLE} ("
+        "id bigint NOT NULL, "
+        "action varchar(50) NOT NULL, "
+        "ip_hash varchar(255) NOT NULL, "
+        "details jsonb NOT NULL, "
+        "created_at timestamp with time zone NOT NULL, "
+        "flag_id bigint NULL, "
+        "tip_id bigint NULL, "
+        f"CONSTRAINT {NEW_TABLE}_pkey PRIMARY KEY (id, created_at)"
+        ") PARTITION BY RANGE (created_at)"
+    )
+    execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {NEW_TABLE} DEFAULT")
+
+    current = _month_start(datetime.now(timezone.utc))
+    month = _month_start(oldest) if oldest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        end = _add_months(month, 1)
+        execute(
+            f"CREATE TABLE wiki_moderationlog_p{month:%Y_%m} PARTITION OF {NEW_TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    execute(
+        f"INSERT INTO {NEW_TABLE} (id, action, ip_hash, details, created_at, flag_id, tip_id) "
+        f"SELECT id, action, ip_hash, details, created_at, flag_id, tip_id FROM {PARENT_TABLE}"
+    )
+    # Drops the old table's identity sequence, indexes and constraints
+    execute(f"DROP TABLE {PARENT_TABLE}")
+    execute(f"ALTER TABLE {NEW_TABLE} RENAME TO {PARENT_TABLE}")
+    execute(
+        f"ALTER TABLE {PARENT_TABLE} "
+        f"RENAME CONSTRAINT {NEW_TABLE}_pkey TO {PARENT_TABLE}_pkey"
+    )
+
+    execute(f"CREATE SEQUENCE {SEQUENCE} OWNED BY {PARENT_TABLE}.id")
+    execute(
+        f"ALTER TABLE {PARENT_TABLE} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')"
+    )
+    if max_id:
+        execute(f"SELECT setval('{SEQUENCE}', {int(max_id)})")
+
+    # Recreate Django's indexes and foreign keys under their original names;
+    # on a partitioned table they cascade to every partition.
+    for index in ModerationLog._meta.indexes:
+        schema_editor.execute(index.create_sql(ModerationLog, schema_editor))
+    for field_name in ("flag", "tip"):
+        field = ModerationLog._meta.get_field(field_name)
+        schema_editor.execute(schema_editor._create_index_sql(ModerationLog, fields=[field]))
+        schema_editor.execute(
+            schema_editor._create_fk_sql(ModerationLog, field, "_fk_%(to_table)s_%(to_column)s")
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        # Not reversible: rows would have to be copied back into a plain table
+        migrations.RunPython(partition_moderation_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-19 06:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+from apps.wiki.operations import AddIndexConcurrently, RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('wiki', '0009_partition_moderation_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Build the composite index before dropping the status index it covers
+        AddIndexConcurrently(
+            model_name='moderationflag',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='wiki_flag_status_created_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='moderationflag',
+            name='wiki_modera_status_08f431_idx',
+        ),
+    ]
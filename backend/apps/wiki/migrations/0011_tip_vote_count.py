@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 06:24
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_tip_vote_count(apps, schema_editor):
+    Tip = apps.get_model("wiki", "Tip")
+    Vote = apps.get_model("wiki", "Vote")
+    counts = (
+        Vote.objects.filter(tip=OuterRef("pk"))
+        .order_by()
+        .values("tip")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Tip.objects.update(
+        vote_count=Coalesce(Subquery(counts), Value(0), output_field=IntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0010_flag_queue_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tip',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_tip_vote_count, migrations.RunPython.noop),
+    ]
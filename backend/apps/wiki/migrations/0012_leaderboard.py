@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 06:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0011_tip_vote_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('success_rate', 'Success rate'), ('votes', 'Vote count'), ('trending', 'Trending')], max_length=20)),
+                ('entries', models.JSONField(default=list)),
+                ('rebuilt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboards', to='wiki.category')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard',
+                'verbose_name_plural': 'Leaderboards',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('metric', 'category'), name='unique_category_leaderboard'), models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('metric',), name='unique_global_leaderboard')],
+            },
+        ),
+    ]
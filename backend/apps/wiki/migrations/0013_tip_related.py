@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0012_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tip',
+            name='related',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 06:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiki', '0013_tip_related'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tip',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='TipLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('tip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='wiki.tip')),
+            ],
+            options={
+                'verbose_name': 'Tip LSH Bucket',
+                'verbose_name_plural': 'Tip LSH Buckets',
+                'indexes': [models.Index(fields=['key'], name='wiki_tiplshbucket_key_idx')],
+            },
+        ),
+    ]
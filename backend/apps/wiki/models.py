@@ -1,11 +1,22 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.text import slugify
 
+from .response_cache import bump_versions
+from .utils import (
+    normalize_keywords,
+    render_description_html,
+    reset_affiliate_generator,
+)
+
 
 class Category(models.Model):
     name = models.CharField(max_length=255)
     slug = models.SlugField(unique=True)
     description = models.TextField(blank=True)
+    # Also bumped whenever one of its tips is created, edited, voted on or
+    # deleted, so MAX(updated_at) over categories covers every page.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "Category"
@@ -15,9 +26,21 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_versions("categories")
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_versions("categories")
+        return result
+
 
 class AffiliateProduct(models.Model):
     name = models.CharField(max_length=255)
+    product_key = models.CharField(max_length=255, blank=True)
+    product_id = models.CharField(max_length=100, blank=True)
+    category = models.CharField(max_length=100, blank=True)
     affiliate_url = models.URLField()
     network = models.CharField(max_length=100)
     keywords = models.JSONField(default=list)
@@ -26,34 +49,179 @@ class AffiliateProduct(models.Model):
     class Meta:
         verbose_name = "Affiliate Product"
         verbose_name_plural = "Affiliate Products"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["network", "product_key"],
+                condition=~models.Q(product_key=""),
+                name="unique_affiliate_product_key",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.keywords = normalize_keywords(self.keywords)
+        super().save(*args, **kwargs)
+        self.sync_keyword_entries()
+        reset_affiliate_generator()
+        bump_versions("products")
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        reset_affiliate_generator()
+        bump_versions("products")
+        return result
+
+    def sync_keyword_entries(self):
+        """Mirror the keywords JSON list into the indexed AffiliateKeyword table"""
+        self.keyword_entries.all().delete()
+        AffiliateKeyword.objects.bulk_create(
+            [AffiliateKeyword(product=self, keyword=kw) for kw in self.keywords]
+        )
+
+
+class AffiliateKeyword(models.Model):
+    """
+    Normalized keyword -> product rows.
+
+    Backs keyword lookups on databases without JSON containment support
+    (SQLite); PostgreSQL filters AffiliateProduct.keywords through a GIN index.
+    """
+
+    product = models.ForeignKey(
+        AffiliateProduct, on_delete=models.CASCADE, related_name="keyword_entries"
+    )
+    keyword = models.CharField(max_length=255, db_index=True)
+
+    class Meta:
+        verbose_name = "Affiliate Keyword"
+        verbose_name_plural = "Affiliate Keywords"
+        unique_together = [("product", "keyword")]
+
+    def __str__(self):
+        return f"{self.keyword} -> {self.product_id}"
+
+
+class AffiliateClickDaily(models.Model):
+    """Per-day click rollup for an affiliate product, written in batches"""
+
+    product = models.ForeignKey(
+        AffiliateProduct, on_delete=models.CASCADE, related_name="daily_clicks"
+    )
+    platform = models.CharField(max_length=100)
+    day = models.DateField()
+    clicks = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Affiliate Click Rollup"
+        verbose_name_plural = "Affiliate Click Rollups"
+        ordering = ["-day", "product"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "day"], name="unique_affiliate_click_day"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day", "platform"]),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} on {self.day}: {self.clicks}"
+
 
 class Tip(models.Model):
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, blank=True)
     description = models.TextField()
+    description_html = models.TextField(blank=True, editable=False)
+    description_html_version = models.CharField(
+        max_length=64, blank=True, editable=False
+    )
     category = models.ForeignKey(
         Category, on_delete=models.CASCADE, related_name="tips"
     )
     effectiveness_avg = models.FloatField(default=0.0)
     difficulty_avg = models.FloatField(default=0.0)
     success_rate = models.FloatField(default=0.0)
+    # Denormalized len(votes), updated with the vote averages, so list
+    # endpoints need neither a COUNT per row nor prefetched votes
+    vote_count = models.PositiveIntegerField(default=0)
+    # Nearest tips by TF-IDF similarity as [tip_id, score] pairs, best first,
+    # written by build_related_tips; null until the tip has been indexed
+    related = models.JSONField(null=True, blank=True, editable=False)
+    # MinHash signature of title + description for near-duplicate checks
+    # (apps/wiki/dedup.py); null until indexed
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "Tip"
         verbose_name_plural = "Tips"
         ordering = ["-created_at"]
+        indexes = [
+            # Category pages: filter by category, newest first
+            models.Index(
+                fields=["category", "-created_at"],
+                name="wiki_tip_category_created_idx",
+            ),
+            # Tip list and sitemaps: newest first with a stable tiebreaker
+            models.Index(fields=["-created_at", "id"], name="wiki_tip_created_id_idx"),
+            models.Index(fields=["-success_rate"], name="wiki_tip_success_rate_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
         self.slug = slugify(self.title) if not self.slug else self.slug
+
+        # Re-render only when the description may have changed; partial saves
+        # such as vote aggregate updates pass update_fields without it.
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            # Partial saves (e.g. vote aggregates) still count as a change
+            update_fields = {*update_fields, "updated_at"}
+            kwargs["update_fields"] = update_fields
+        if update_fields is None or "description" in update_fields:
+            self.render_description()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "description_html",
+                    "description_html_version",
+                }
+
         super().save(*args, **kwargs)
+        self._touch_category()
+        self._invalidate_caches()
+
+    def delete(self, *args, **kwargs):
+        from .leaderboards import remove_tips
+
+        tip_id = self.pk
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            remove_tips([tip_id])
+        self._touch_category()
+        self._invalidate_caches(tip_id)
+        return result
+
+    def _touch_category(self):
+        Category.objects.filter(pk=self.category_id).update(updated_at=timezone.now())
+
+    def _invalidate_caches(self, tip_id=None):
+        from .sitemaps import invalidate_tip_sitemap
+
+        invalidate_tip_sitemap([tip_id or self.pk])
+        bump_versions("tips")
+
+    def render_description(self):
+        """Render description_html with affiliate links from the current mappings"""
+        self.description_html, self.description_html_version = (
+            render_description_html(self.description)
+        )
 
     def calculate_success_rate(self):
         """Calculate success rate: avg_effectiveness / (avg_difficulty + 1) * 100"""
@@ -70,11 +238,78 @@ class Vote(models.Model):
     class Meta:
         verbose_name = "Vote"
         verbose_name_plural = "Votes"
+        indexes = [
+            # One-vote-per-IP check in tip_vote
+            models.Index(fields=["tip", "ip_hash"], name="wiki_vote_tip_ip_hash_idx"),
+            models.Index(fields=["tip", "created_at"], name="wiki_vote_tip_created_idx"),
+        ]
 
     def __str__(self):
         return f"Vote for Tip {self.tip_id} - IP: {self.ip_hash}"
 
 
+class TipLSHBucket(models.Model):
+    """One LSH band bucket of a tip's MinHash signature (see apps/wiki/dedup.py)"""
+
+    tip = models.ForeignKey(Tip, on_delete=models.CASCADE, related_name="lsh_buckets")
+    key = models.BigIntegerField()
+
+    class Meta:
+        verbose_name = "Tip LSH Bucket"
+        verbose_name_plural = "Tip LSH Buckets"
+        indexes = [
+            models.Index(fields=["key"], name="wiki_tiplshbucket_key_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.key} -> {self.tip_id}"
+
+
+class Leaderboard(models.Model):
+    """
+    Materialized top tips for one metric, site-wide (no category) or within
+    a category. entries holds [tip_id, score] pairs, best first; it is kept
+    current by apps/wiki/leaderboards.py.
+    """
+
+    METRICS = [
+        ("success_rate", "Success rate"),
+        ("votes", "Vote count"),
+        ("trending", "Trending"),
+    ]
+
+    metric = models.CharField(max_length=20, choices=METRICS)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="leaderboards",
+    )
+    entries = models.JSONField(default=list)
+    rebuilt_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Leaderboard"
+        verbose_name_plural = "Leaderboards"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "category"],
+                condition=models.Q(category__isnull=False),
+                name="unique_category_leaderboard",
+            ),
+            models.UniqueConstraint(
+                fields=["metric"],
+                condition=models.Q(category__isnull=True),
+                name="unique_global_leaderboard",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} in {self.category_id or 'all categories'}"
+
+
 class BlacklistTerm(models.Model):
     term = models.CharField(max_length=255, unique=True)
     category = models.CharField(max_length=50)
@@ -136,7 +371,12 @@ class ModerationFlag(models.Model):
         verbose_name_plural = "Moderation Flags"
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["status"]),
+            # Moderation queue: filter by status, keyset-paginate newest first.
+            # Also serves status-only lookups.
+            models.Index(
+                fields=["status", "created_at", "id"],
+                name="wiki_flag_status_created_idx",
+            ),
             models.Index(fields=["flag_type"]),
             models.Index(fields=["created_at"]),
         ]
@@ -145,6 +385,28 @@ class ModerationFlag(models.Model):
         return f"Flag #{self.id} - {self.flag_type} - {self.status}"
 
 
+class ModerationLogQuerySet(models.QuerySet):
+    def between(self, start, end):
+        """
+        Logs created in [start, end).
+
+        On PostgreSQL the log table is partitioned by month on created_at;
+        filtering on this half-open range lets the planner skip every
+        partition outside it. Reporting queries should always go through here.
+        """
+        return self.filter(created_at__gte=start, created_at__lt=end)
+
+    def action_counts(self, start, end):
+        """Number of logs per action in [start, end)."""
+        return dict(
+            self.between(start, end)
+            .order_by()
+            .values("action")
+            .annotate(count=models.Count("id"))
+            .values_list("action", "count")
+        )
+
+
 class ModerationLog(models.Model):
     ACTION_TYPES = [
         ("flag_created", "Flag Created"),
@@ -174,7 +436,10 @@ class ModerationLog(models.Model):
     details = models.JSONField(default=dict)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ModerationLogQuerySet.as_manager()
+
     class Meta:
+        # Partitioned by month on PostgreSQL, see apps/wiki/partitions.py
         verbose_name = "Moderation Log"
         verbose_name_plural = "Moderation Logs"
         ordering = ["-created_at"]
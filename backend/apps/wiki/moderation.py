@@ -0,0 +1,196 @@
+"""
+Bulk review of moderation flags.
+
+Shared by the /api/moderation/flags/bulk/ endpoint and the moderate_flags
+management command. Flags are selected by id or by the queue filters. A
+review costs a fixed number of statements whatever the batch size:
+- one SELECT of the matching flags
+- one UPDATE ... WHERE id IN of their status, reviewed_by and reviewed_at
+- one bulk_create of the ModerationLog entries
+All of it runs in a single transaction.
+
+Approving a flag upholds the report. With reject_tips, the tips behind
+approved flags are removed in bulk too, and each gets a tip_rejected log.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .leaderboards import remove_tips
+from .models import Category, ModerationFlag, ModerationLog, Tip
+from .response_cache import bump_versions
+
+# Bulk action -> (new flag status, log action)
+ACTIONS = {
+    "approve": ("approved", "flag_approved"),
+    "reject": ("rejected", "flag_rejected"),
+}
+
+# Query parameter -> (ModerationFlag field, allowed values or None for any)
+FLAG_FILTERS = {
+    "status": ("status", dict(ModerationFlag.STATUS_CHOICES)),
+    "type": ("flag_type", dict(ModerationFlag.FLAG_TYPES)),
+    "category": ("category", None),
+}
+
+
+class BulkModerationError(ValueError):
+    """Invalid bulk review request; the message is safe to show to reviewers."""
+
+
+def validate_flag_filters(params):
+    """
+    Check filter values against the allowed choices.
+
+    Raises:
+        BulkModerationError: If a filter value is not allowed
+    """
+    for param, (_, choices) in FLAG_FILTERS.items():
+        value = params.get(param)
+        if value and choices is not None and value not in choices:
+            raise BulkModerationError(
+                f'Invalid {param}; expected one of {", ".join(choices)}'
+            )
+
+
+def filter_flags(queryset, params):
+    """Apply the status/type/category filters present in params."""
+    for param, (field, _) in FLAG_FILTERS.items():
+        if params.get(param):
+            queryset = queryset.filter(**{field: params[param]})
+    return queryset
+
+
+def bulk_review_flags(action, reviewer=None, ids=None, filters=None,
+                      reject_tips=False, ip_hash="", dry_run=False):
+    """
+    Approve or reject many flags at once.
+
+    Flags already in the target status are left alone and not logged.
+
+    Args:
+        action: "approve" or "reject"
+        reviewer: User stamped as reviewed_by, or None
+        ids: Flag ids to review
+        filters: Queue filters ({"status", "type", "category"}) selecting
+            the flags to review, used when ids is not given
+        reject_tips: Also remove the tips of approved flags
+        ip_hash: Hashed IP recorded on the log entries
+        dry_run: Count what would change without writing anything
+
+    Returns:
+        Dict with the number of flags updated and tips rejected
+
+    Raises:
+        BulkModerationError: On an unknown action, ids that are not a list
+            of integers, an empty or oversized selection, or an invalid filter
+    """
+    if action not in ACTIONS:
+        raise BulkModerationError(f'Invalid action; expected one of {", ".join(ACTIONS)}')
+    if reject_tips and action != "approve":
+        raise BulkModerationError("reject_tips only applies when approving flags")
+
+    new_status, log_action = ACTIONS[action]
+    limit = settings.MODERATION_BULK_MAX_FLAGS
+
+    if ids is not None:
+        if not isinstance(ids, (list, tuple)) or not all(
+            isinstance(flag_id, int) and not isinstance(flag_id, bool) for flag_id in ids
+        ):
+            raise BulkModerationError("ids must be a list of integers")
+        ids = set(ids)
+        if not ids:
+            raise BulkModerationError("No flag ids given")
+        if len(ids) > limit:
+            raise BulkModerationError(f"At most {limit} flags per request")
+        queryset = ModerationFlag.objects.filter(id__in=ids)
+    elif filters:
+        validate_flag_filters(filters)
+        queryset = filter_flags(ModerationFlag.objects.all(), filters)
+    else:
+        raise BulkModerationError("Give flag ids or at least one filter")
+
+    with transaction.atomic():
+        if not dry_run:
+            # A dry run writes nothing, so it takes no row locks either
+            queryset = queryset.select_for_update()
+        flags = list(
+            queryset.exclude(status=new_status)
+            .order_by("id")
+            .values_list("id", "tip_id", "status")[: limit + 1]
+        )
+        if len(flags) > limit:
+            raise BulkModerationError(
+                f"Filter matches more than {limit} flags; narrow it down"
+            )
+
+        flag_ids = [flag_id for flag_id, _, _ in flags]
+        tip_ids = {tip_id for _, tip_id, _ in flags if tip_id} if reject_tips else set()
+        if dry_run or not flags:
+            return {"updated": len(flags), "tips_rejected": len(tip_ids)}
+
+        now = timezone.now()
+        ModerationFlag.objects.filter(id__in=flag_ids).update(
+            status=new_status, reviewed_by=reviewer, reviewed_at=now
+        )
+
+        details = {"reviewed_by": reviewer.get_username() if reviewer else None}
+        logs = [
+            ModerationLog(
+                action=log_action,
+                flag_id=flag_id,
+                tip_id=tip_id,
+                ip_hash=ip_hash,
+                details={**details, "previous_status": previous_status},
+            )
+            for flag_id, tip_id, previous_status in flags
+        ]
+        if tip_ids:
+            logs = _reject_tips(tip_ids, logs, details, ip_hash)
+        ModerationLog.objects.bulk_create(logs)
+
+    return {"updated": len(flags), "tips_rejected": len(tip_ids)}
+
+
+def _reject_tips(tip_ids, logs, details, ip_hash):
+    """
+    Delete tips in bulk, keeping their moderation history.
+
+    Flags and logs would be deleted with their tip (on_delete=CASCADE), so
+    they are detached first and the tip id is kept in the log details.
+
+    Returns:
+        logs, detached from the deleted tips, plus one tip_rejected log per tip
+    """
+    from .sitemaps import invalidate_tip_sitemap
+
+    tips = list(
+        Tip.objects.filter(id__in=tip_ids).values_list("id", "title", "category_id")
+    )
+    ModerationFlag.objects.filter(tip_id__in=tip_ids).update(tip=None)
+    ModerationLog.objects.filter(tip_id__in=tip_ids).update(tip=None)
+    Tip.objects.filter(id__in=tip_ids).delete()
+    remove_tips(tip_ids)
+
+    for log in logs:
+        if log.tip_id in tip_ids:
+            log.details["tip_id"] = log.tip_id
+            log.tip_id = None
+    logs.extend(
+        ModerationLog(
+            action="tip_rejected",
+            ip_hash=ip_hash,
+            details={**details, "tip_id": tip_id, "title": title},
+        )
+        for tip_id, title, _ in tips
+    )
+
+    Category.objects.filter(id__in={category_id for _, _, category_id in tips}).update(
+        updated_at=timezone.now()
+    )
+    # After commit: a cache rebuild racing the transaction could otherwise
+    # store the deleted tips under the new versions
+    transaction.on_commit(lambda: invalidate_tip_sitemap(tip_ids))
+    transaction.on_commit(lambda: bump_versions("tips", "categories"))
+    return logs
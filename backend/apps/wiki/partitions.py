@@ -0,0 +1,148 @@
+"""
+Monthly range partitioning of ModerationLog on PostgreSQL.
+
+On PostgreSQL, wiki_moderationlog is partitioned by RANGE (created_at). It has
+one partition per calendar month, named wiki_moderationlog_pYYYY_MM, and a
+default partition for rows that no monthly partition covers (see migration
+0009). The rotate_moderation_logs command creates upcoming months. It drops or
+detaches expired months whole, which costs the same however many rows they
+hold. Other databases keep a single table, and expired rows are deleted in
+batches instead.
+
+Queries filtered on a created_at range (ModerationLog.objects.between) only
+touch the partitions for that range.
+"""
+
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection as default_connection
+
+PARENT_TABLE = "wiki_moderationlog"
+DEFAULT_PARTITION = "wiki_moderationlog_default"
+PARTITION_PREFIX = "wiki_moderationlog_p"
+ARCHIVE_PREFIX = "wiki_moderationlog_archive_"
+
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value):
+    """First instant of value's calendar month, in UTC."""
+    value = value.astimezone(dt_timezone.utc) if value.tzinfo else value
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, months):
+    """Shift a month_start() value by a number of months."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f"{PARTITION_PREFIX}{month:%Y_%m}"
+
+
+def is_partitioned(connection=None):
+    """Whether ModerationLog is stored in a partitioned table."""
+    connection = connection or default_connection
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [PARENT_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def monthly_partitions(connection=None):
+    """
+    List the attached monthly partitions.
+
+    Returns:
+        Dict of month start -> partition table name
+    """
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            partitions[datetime(year, month, 1, tzinfo=dt_timezone.utc)] = name
+    return partitions
+
+
+def _literal(value):
+    # DDL cannot take bind parameters; values are datetimes built here
+    return f"'{value.isoformat()}'"
+
+
+def create_partition(month, connection=None):
+    """
+    Create and attach the partition for month.
+
+    Rows for that month that already landed in the default partition are
+    moved into the new partition first, as PostgreSQL requires.
+    """
+    connection = connection or default_connection
+    name = partition_name(month)
+    start, end = _literal(month), _literal(add_months(month, 1))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {name} "
+            f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= {start} AND created_at < {end} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        )
+        cursor.execute(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ({start}) TO ({end})"
+        )
+    return name
+
+
+def drop_partition(month, connection=None):
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {partition_name(month)}")
+
+
+def archive_partition(month, connection=None):
+    """
+    Detach the partition for month and keep it as a standalone table.
+
+    Returns:
+        Name of the archive table
+    """
+    connection = connection or default_connection
+    name = partition_name(month)
+    archive = f"{ARCHIVE_PREFIX}{month:%Y_%m}"
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+        cursor.execute(f"ALTER TABLE {name} RENAME TO {archive}")
+    return archive
+
+
+def delete_default_before(cutoff, connection=None):
+    """Delete expired rows that were routed to the default partition."""
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < %s", [cutoff]
+        )
+        return cursor.rowcount
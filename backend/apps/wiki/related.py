@@ -0,0 +1,180 @@
+"""
+Related tips by TF-IDF cosine similarity, computed offline with NumPy.
+
+Tips are turned into L2-normalized TF-IDF vectors. Each tip's title counts
+twice, and the description once. Term frequencies are sublinear and the idf
+is smoothed. The vectors are kept as a compressed sparse row matrix X:
+- indptr: row boundaries
+- indices: term ids
+- data: float32 weights
+
+The same matrix is also kept column-wise (CSC), giving a postings list per
+term.
+
+Cosine similarity is X[rows] @ X.T. It is computed one block of rows at a
+time. Every (row term, posting) product of the block is expanded into flat
+arrays and summed with np.bincount into a dense block x n_tips buffer.
+Blocks are capped both in rows and in expanded products, so memory is
+bounded by the block limits, not by n_tips squared. Very common terms (in
+more than max_df of the tips) are dropped. They carry almost no signal and
+would dominate the expansion.
+
+build_related_tips stores the top neighbours on Tip.related. Incremental
+runs score only the unindexed tips against the corpus. The same scores are
+merged into the neighbour lists of existing tips, since similarity is
+symmetric. Earlier scores were computed with older idf weights, so a
+periodic full rebuild keeps everything consistent.
+"""
+
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+# Words of two or more letters, in any script
+TOKEN_RE = re.compile(r"[^\W\d_]{2,}")
+
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be but by can do for from has have how if in into is it
+    its of on or so than that the their then there these this to up use was
+    with you your
+    """.split()
+)
+
+
+def tokenize(text):
+    return [word for word in TOKEN_RE.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def document(title, description):
+    """Text indexed for a tip; the title is weighted double."""
+    return f"{title} {title} {description}"
+
+
+def vectorize(texts, min_df=2, max_df=0.5):
+    """
+    TF-IDF vectors for texts as a CSR matrix.
+
+    Args:
+        texts: Documents, one per row
+        min_df: Minimum number of documents a term must appear in
+        max_df: Maximum fraction of documents a term may appear in
+
+    Returns:
+        (indptr, indices, data, n_terms), with each row L2-normalized.
+        Rows with no kept terms are empty.
+    """
+    counts = [Counter(tokenize(text)) for text in texts]
+    n_docs = len(counts)
+    df = Counter(term for row in counts for term in row)
+    max_count = max(1, int(max_df * n_docs)) if n_docs > 2 else n_docs
+    vocabulary = {
+        term: i
+        for i, term in enumerate(sorted(t for t, n in df.items() if min_df <= n <= max_count))
+    }
+    idf = np.array(
+        [math.log((1 + n_docs) / (1 + df[term])) + 1 for term in vocabulary],
+        dtype=np.float32,
+    )
+
+    indptr = np.zeros(n_docs + 1, dtype=np.int64)
+    indices, data = [], []
+    for row, terms in enumerate(counts):
+        kept = sorted((vocabulary[t], n) for t, n in terms.items() if t in vocabulary)
+        indices.extend(term for term, _ in kept)
+        data.extend(1 + math.log(n) for _, n in kept)
+        indptr[row + 1] = len(indices)
+
+    indices = np.array(indices, dtype=np.int64)
+    data = np.array(data, dtype=np.float32) * idf[indices]
+    owners = np.repeat(np.arange(n_docs), np.diff(indptr))
+    norms = np.sqrt(np.bincount(owners, weights=data**2, minlength=n_docs))
+    data /= norms[owners].astype(np.float32)
+    return indptr, indices, data, len(vocabulary)
+
+
+def transpose(indptr, indices, data, n_columns):
+    """Convert a CSR matrix to CSC: column boundaries, row ids and weights."""
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    order = np.argsort(indices, kind="stable")
+    col_indptr = np.zeros(n_columns + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n_columns), out=col_indptr[1:])
+    return col_indptr, rows[order], data[order]
+
+
+def _expand(indptr, ids):
+    """
+    Positions in a compressed matrix of every entry of the rows ids, and
+    for each the index into ids it belongs to.
+    """
+    starts = indptr[ids]
+    lengths = indptr[ids + 1] - starts
+    ends = np.cumsum(lengths)
+    total = int(ends[-1]) if len(ends) else 0
+    positions = np.repeat(starts - ends + lengths, lengths) + np.arange(total)
+    return positions, np.repeat(np.arange(len(ids)), lengths)
+
+
+def block_scores(csr, csc, rows):
+    """Dense cosine similarities of the given rows against every row."""
+    indptr, indices, data = csr
+    col_indptr, col_rows, col_data = csc
+    n_docs = len(indptr) - 1
+
+    entries, owners = _expand(indptr, rows)
+    postings, entry_of = _expand(col_indptr, indices[entries])
+    flat = owners[entry_of] * n_docs + col_rows[postings]
+    weights = data[entries][entry_of] * col_data[postings]
+    scores = np.bincount(flat, weights=weights, minlength=len(rows) * n_docs)
+    return scores.reshape(len(rows), n_docs)
+
+
+def score_blocks(csr, csc, rows, max_rows, max_pairs):
+    """
+    Yield (block, scores) for rows in blocks, where scores[i] holds the
+    similarities of block[i] to every row. A row's similarity to itself is
+    set to -1.
+
+    A block holds at most max_rows rows (the dense score buffer) and at most
+    max_pairs term postings to expand (the flat arrays behind it), except
+    for a single row that exceeds the pair limit on its own.
+    """
+    indptr, indices, _ = csr
+    col_indptr = csc[0]
+    rows = np.asarray(rows, dtype=np.int64)
+    entries, owners = _expand(indptr, rows)
+    pairs = np.bincount(
+        owners, weights=np.diff(col_indptr)[indices[entries]], minlength=len(rows)
+    )
+
+    start = 0
+    while start < len(rows):
+        within = np.cumsum(pairs[start : start + max_rows]) <= max_pairs
+        stop = start + max(1, int(np.argmin(within)) if not within.all() else len(within))
+        block = rows[start:stop]
+        scores = block_scores(csr, csc, block)
+        scores[np.arange(len(block)), block] = -1.0
+        yield block, scores
+        start = stop
+
+
+def best(scores, k, min_score=0.0):
+    """The (at most k) best rows scoring above min_score, and their scores."""
+    k = min(k, len(scores))
+    candidates = np.argpartition(-scores, k - 1)[:k] if k else np.array([], dtype=np.int64)
+    candidates = candidates[scores[candidates] > min_score]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order], scores[candidates[order]]
+
+
+def merge(entries, additions, k):
+    """
+    Merge [tip_id, score] additions into a best-first neighbour list,
+    keeping the best k, with ties going to the lower tip id.
+    """
+    merged = {tip_id: score for tip_id, score in entries}
+    merged.update((tip_id, score) for tip_id, score in additions)
+    best = sorted(merged.items(), key=lambda item: (-item[1], item[0]))[:k]
+    return [[tip_id, score] for tip_id, score in best]
@@ -0,0 +1,319 @@
+"""
+Two-tier cache for public GET API responses.
+
+Rendered JSON bodies are cached under the request path plus its normalized
+query string. Lookups go through two tiers:
+- a small in-process LRU, which needs no network round trip and no unpickling;
+- the shared "responses" cache alias, which every worker sees.
+
+Invalidation uses version keys. Each response depends on one or more
+namespaces ("tips", "categories", "products"), and each namespace has a
+version token in the shared cache. The token is part of every cache key. A
+write bumps the token, so all dependent keys miss at once in both tiers.
+Nothing is deleted; old entries age out of the LRU and time out in the
+shared cache.
+
+A miss on a cold key is rebuilt once. The first request takes a short
+lock in the shared cache and rebuilds the response. Concurrent requests
+for the same key wait for its result instead of all hitting the database.
+If the lock holder takes longer than RESPONSE_CACHE_LOCK_WAIT, waiters
+build the response themselves.
+
+The same version tokens give each response a strong ETag and a
+Last-Modified time. A conditional GET is answered with 304 before the view
+runs, without touching the database or the cached body.
+
+Hit/miss counters are per process; see stats().
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .routers import pin_to_primary
+
+CACHE_ALIAS = "responses"
+VERSION_KEY = "response:version:{namespace}"
+RESPONSE_KEY = "response:{versions}:{digest}"
+LOCK_KEY = "response:lock:{key}"
+# Seconds between checks while another worker rebuilds a key
+POLL_INTERVAL = 0.025
+# Response headers kept with a cached body
+CACHED_HEADERS = ("Content-Type", "Vary", "Allow")
+
+NAMESPACES = ("tips", "categories", "products")
+
+
+class LocalLRU:
+    """Thread-safe in-process LRU of cached responses, with a per-entry TTL."""
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_local = LocalLRU(
+    getattr(settings, "RESPONSE_CACHE_LOCAL_ENTRIES", 512),
+    getattr(settings, "RESPONSE_CACHE_LOCAL_TIMEOUT", 30),
+)
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _shared():
+    return caches[CACHE_ALIAS]
+
+
+def stats():
+    """
+    Counters for this process.
+
+    Returns:
+        Dict with local_hits, shared_hits, misses, rebuilds (responses
+        built after taking the lock), waits (requests that waited for
+        another rebuild) and local_entries
+    """
+    with _stats_lock:
+        counters = {
+            name: _stats[name]
+            for name in ("local_hits", "shared_hits", "misses", "rebuilds", "waits")
+        }
+    counters["local_entries"] = len(_local)
+    return counters
+
+
+def reset():
+    """Empty the in-process tier and zero the counters (tests, deploys)."""
+    _local.clear()
+    with _stats_lock:
+        _stats.clear()
+
+
+def _new_token():
+    # Creation time first; last_modified() reads it back
+    return f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+
+
+def bump_versions(*namespaces):
+    """Invalidate every cached response that depends on the namespaces."""
+    _shared().set_many(
+        {VERSION_KEY.format(namespace=ns): _new_token() for ns in namespaces}, None
+    )
+
+
+def current_versions(namespaces):
+    """Current version token of each namespace, creating missing ones."""
+    cache = _shared()
+    keys = [VERSION_KEY.format(namespace=ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # add() keeps a token another worker set in the meantime
+            cache.add(key, _new_token(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def last_modified(versions):
+    """
+    Latest bump time of the versions, as a Unix timestamp.
+
+    A token recreated after eviction carries its creation time, which is
+    later than the real change, so Last-Modified never understates age.
+    """
+    return max(int(token.split("-", 1)[0]) for token in versions)
+
+
+def normalized_query(query_dict):
+    """Query string with parameters sorted, so ?b=1&a=2 and ?a=2&b=1 match."""
+    return urlencode(sorted(query_dict.lists()), doseq=True)
+
+
+def response_key(request, versions):
+    """Cache key for request under the given namespace versions."""
+    target = f"{request.path}?{normalized_query(request.GET)}"
+    digest = hashlib.sha256(target.encode("utf-8")).hexdigest()
+    return RESPONSE_KEY.format(versions=".".join(versions), digest=digest)
+
+
+def response_etag(key):
+    """Strong ETag for the response stored under key."""
+    return quote_etag(hashlib.sha256(key.encode("utf-8")).hexdigest()[:32])
+
+
+def is_json_get(request):
+    """Whether request is a GET for the JSON representation."""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.GET.get("format") not in (None, "json"):
+        return False
+    # Browsers get DRF's HTML browsable API, which shows the user
+    return "text/html" not in request.META.get("HTTP_ACCEPT", "")
+
+
+def is_cacheable(request):
+    """Only JSON GETs are cached; these endpoints do not vary by user."""
+    return getattr(settings, "RESPONSE_CACHE_ENABLED", True) and is_json_get(request)
+
+
+def fetch(key, build):
+    """
+    Return the cached payload for key, building it at most once across workers.
+
+    Args:
+        key: Key from response_key()
+        build: Callable returning (response, payload); payload is None when
+            the response must not be cached
+
+    Returns:
+        (response or None, payload, source); response is None unless this
+        call built it, source is "local", "shared" or "miss"
+    """
+    payload = _local.get(key)
+    if payload is not None:
+        _count("local_hits")
+        return None, payload, "local"
+
+    cache = _shared()
+    payload = cache.get(key)
+    if payload is not None:
+        _local.set(key, payload)
+        _count("shared_hits")
+        return None, payload, "shared"
+
+    _count("misses")
+    lock_key = LOCK_KEY.format(key=key)
+    lock_timeout = getattr(settings, "RESPONSE_CACHE_LOCK_TIMEOUT", 10)
+    if cache.add(lock_key, 1, lock_timeout):
+        _count("rebuilds")
+        try:
+            response, payload = build()
+            if payload is not None:
+                cache.set(key, payload)
+                _local.set(key, payload)
+        finally:
+            cache.delete(lock_key)
+        return response, payload, "miss"
+
+    # Another worker is rebuilding this key; wait for its result
+    _count("waits")
+    deadline = time.monotonic() + getattr(settings, "RESPONSE_CACHE_LOCK_WAIT", 2.0)
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        payload = cache.get(key)
+        if payload is not None:
+            _local.set(key, payload)
+            return None, payload, "shared"
+        if cache.get(lock_key) is None:
+            break
+
+    response, payload = build()
+    if payload is not None:
+        cache.set(key, payload)
+        _local.set(key, payload)
+    return response, payload, "miss"
+
+
+def _set_validators(response, etag, modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(modified)
+    # Let browsers keep the body but revalidate it on every use
+    patch_cache_control(response, no_cache=True)
+
+
+class CachedResponseMixin:
+    """
+    Serve a DRF view's GET responses through the response cache.
+
+    cache_namespaces lists the namespaces whose writes invalidate the view.
+    JSON GETs get ETag and Last-Modified; a matching If-None-Match or
+    If-Modified-Since is answered with 304 before the view runs. Only 200
+    responses are stored. Cached responses skip the view entirely, so use
+    this on public views only. X-Cache reports local, shared or miss.
+    """
+
+    cache_namespaces = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_json_get(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        versions = current_versions(self.cache_namespaces)
+        key = response_key(request, versions)
+        etag, modified = response_etag(key), last_modified(versions)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=modified)
+        if not_modified is not None:
+            if not_modified.status_code == 304:
+                _set_validators(not_modified, etag, modified)
+            return not_modified
+
+        if not is_cacheable(request):
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200:
+                _set_validators(response, etag, modified)
+            return response
+
+        def build():
+            # Cached bodies outlive replication lag, so build them from the
+            # primary; a lagging replica would otherwise pin stale content
+            # to the version a write just bumped.
+            pin_to_primary()
+            response = super(CachedResponseMixin, self).dispatch(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response, None
+            response.render()
+            headers = {name: response[name] for name in CACHED_HEADERS if name in response}
+            return response, (response.content, headers)
+
+        response, payload, source = fetch(key, build)
+        if response is None:
+            content, headers = payload
+            response = HttpResponse(content, headers=headers)
+        if response.status_code == 200:
+            _set_validators(response, etag, modified)
+        response["X-Cache"] = source
+        return response
@@ -0,0 +1,94 @@
+"""
+Primary/replica database routing.
+
+When DATABASE_REPLICAS lists replica aliases (built from DATABASE_REPLICA_URLS
+in settings), ORM reads go to a randomly chosen replica and writes go to the
+primary. Once anything is written, the rest of the current request or
+command reads from the primary too, and PrimaryPinningMiddleware keeps the
+writing client's reads on the primary for DATABASE_PIN_SECONDS so it sees
+its own writes despite replication lag.
+
+DatabaseCache (CACHE_URL=db://) always uses the primary, without touching
+the pinning state. Replica lag would break the read-your-writes pin and the
+response cache's version tokens and locks, and a cache write is not a
+client's write.
+
+Without replicas every method returns None and Django's default routing
+applies unchanged.
+"""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_pinned = ContextVar("wiki_db_pinned", default=False)
+_wrote = ContextVar("wiki_db_wrote", default=False)
+
+# app_label of DatabaseCache's internal model
+CACHE_APP_LABEL = "django_cache"
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def pin_to_primary():
+    """Send the remaining reads of the current context to the primary."""
+    _pinned.set(True)
+
+
+def start_routing_context(pinned=False):
+    """
+    Reset pinning state at the start of a request.
+
+    Returns:
+        Tokens to pass to end_routing_context()
+    """
+    return _pinned.set(pinned), _wrote.set(False)
+
+
+def end_routing_context(tokens):
+    """Restore the pinning state saved by start_routing_context()."""
+    pinned_token, wrote_token = tokens
+    _pinned.reset(pinned_token)
+    _wrote.reset(wrote_token)
+
+
+def wrote_to_primary():
+    """Whether anything was routed for writing in the current context."""
+    return _wrote.get()
+
+
+class PrimaryReplicaRouter:
+    """Route reads to replicas and writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas:
+            return None
+        if model._meta.app_label == CACHE_APP_LABEL or _pinned.get():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if not replica_aliases():
+            return None
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return DEFAULT_DB_ALIAS
+        # Later reads in this request must see the write
+        _pinned.set(True)
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        if replica_aliases():
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
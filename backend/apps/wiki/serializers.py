@@ -1,16 +1,68 @@
+from operator import itemgetter
+
+from django.db.models import Count
 from rest_framework import serializers
 from .models import (
     Category,
     Tip,
     Vote,
     AffiliateProduct,
+    AffiliateClickDaily,
     BlacklistTerm,
     ModerationFlag,
     ModerationLog,
 )
 
 
-class CategorySerializer(serializers.ModelSerializer):
+def requested_fields(params, available):
+    """
+    Output fields selected with ?fields=a,b or ?exclude=c,d.
+
+    Args:
+        params: Request query parameters
+        available: Field names the endpoint can return, in output order
+
+    Returns:
+        The selected names in output order, or None when neither parameter
+        is given (the full shape)
+
+    Raises:
+        ValueError: If both parameters are given, a name is unknown or
+            nothing would be left to return
+    """
+    include, exclude = params.get("fields"), params.get("exclude")
+    if include is None and exclude is None:
+        return None
+    if include is not None and exclude is not None:
+        raise ValueError('Use either "fields" or "exclude", not both')
+
+    names = {name.strip() for name in (include or exclude).split(",") if name.strip()}
+    unknown = sorted(names.difference(available))
+    if unknown:
+        raise ValueError(
+            f'Unknown field(s): {", ".join(unknown)}; '
+            f'expected any of {", ".join(available)}'
+        )
+    if include is not None:
+        selected = [name for name in available if name in names]
+    else:
+        selected = [name for name in available if name not in names]
+    if not selected:
+        raise ValueError("No fields selected")
+    return selected
+
+
+class SparseFieldsMixin:
+    """Serializer mixin taking fields=[...] to drop every other field."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields).difference(fields):
+                self.fields.pop(name)
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Category model with tips count"""
 
     tips_count = serializers.SerializerMethodField()
@@ -22,9 +74,26 @@ class CategorySerializer(serializers.ModelSerializer):
 
     def get_tips_count(self, obj):
         """Return count of published tips in this category"""
+        if hasattr(obj, "num_tips"):
+            return obj.num_tips
         return obj.tips.count()
 
 
+def category_queryset(queryset, fields=None):
+    """
+    Project a Category queryset onto the CategorySerializer fields requested.
+
+    Only the selected columns are loaded, and tips_count is counted in the
+    same query (as num_tips) when asked for, instead of once per category.
+    """
+    fields = CategorySerializer.Meta.fields if fields is None else fields
+    columns = {"id"}.union(name for name in fields if name != "tips_count")
+    queryset = queryset.only(*columns)
+    if "tips_count" in fields:
+        queryset = queryset.annotate(num_tips=Count("tips"))
+    return queryset
+
+
 class VoteSerializer(serializers.ModelSerializer):
     """Serializer for Vote model"""
 
@@ -42,6 +111,44 @@ class AffiliateProductSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "affiliate_url", "network", "keywords", "is_active"]
 
 
+class AffiliateClickDailySerializer(serializers.ModelSerializer):
+    """Serializer for daily affiliate click rollups"""
+
+    product_id = serializers.IntegerField(read_only=True)
+    product_name = serializers.CharField(source="product.name", read_only=True)
+
+    class Meta:
+        model = AffiliateClickDaily
+        fields = ["product_id", "product_name", "platform", "day", "clicks"]
+
+
+class ModerationQueueSerializer(serializers.ModelSerializer):
+    """Compact flag row for the reviewer queue"""
+
+    tip_id = serializers.IntegerField(read_only=True)
+    tip_title = serializers.CharField(source="tip.title", read_only=True, default=None)
+    reviewed_by = serializers.CharField(
+        source="reviewed_by.username", read_only=True, default=None
+    )
+
+    class Meta:
+        model = ModerationFlag
+        fields = [
+            "id",
+            "tip_id",
+            "tip_title",
+            "flag_type",
+            "category",
+            "confidence",
+            "status",
+            "reason",
+            "created_at",
+            "reviewed_by",
+            "reviewed_at",
+        ]
+        read_only_fields = fields
+
+
 class TipListSerializer(serializers.ModelSerializer):
     """Optimized list serializer for tips - minimal data"""
 
@@ -64,17 +171,73 @@ class TipListSerializer(serializers.ModelSerializer):
 
     def get_vote_score(self, obj):
         """Calculate vote score: avg_effectiveness * votes"""
-        vote_count = obj.votes.count()
-        return round(obj.effectiveness_avg * vote_count, 1) if vote_count > 0 else 0
-
-
-class TipDetailSerializer(serializers.ModelSerializer):
+        return vote_score(obj.effectiveness_avg, obj.vote_count)
+
+
+def vote_score(effectiveness_avg, vote_count):
+    return round(effectiveness_avg * vote_count, 1) if vote_count > 0 else 0
+
+
+# Output field -> Tip columns it is built from, for tip_list_rows()
+TIP_LIST_FIELDS = {
+    "id": ("id",),
+    "title": ("title",),
+    "slug": ("slug",),
+    "category_name": ("category__name",),
+    "vote_score": ("effectiveness_avg", "vote_count"),
+    "effectiveness_avg": ("effectiveness_avg",),
+    "difficulty_avg": ("difficulty_avg",),
+    "success_rate": ("success_rate",),
+    "created_at": ("created_at",),
+}
+_datetime_field = serializers.DateTimeField()
+
+
+def tip_list_rows(queryset, fields=None):
+    """
+    Fast path for TipListSerializer(queryset, many=True).data.
+
+    Reads only the columns behind the requested fields as tuples, joining
+    the category only when category_name is asked for, and builds the output
+    dicts directly. No model instances or per-field DRF machinery are
+    involved. The output must stay identical to TipListSerializer;
+    tests/test_api.py checks this.
+
+    Args:
+        queryset: Tip queryset, already filtered, ordered and sliced
+        fields: Output fields to include (see requested_fields()), or None
+            for all of them
+    """
+    fields = list(TIP_LIST_FIELDS) if fields is None else fields
+    columns = list(dict.fromkeys(c for name in fields for c in TIP_LIST_FIELDS[name]))
+    index = {column: i for i, column in enumerate(columns)}
+    to_datetime = _datetime_field.to_representation
+
+    getters = []
+    for name in fields:
+        if name == "vote_score":
+            avg, count = index["effectiveness_avg"], index["vote_count"]
+            getters.append((name, lambda row: vote_score(row[avg], row[count])))
+        elif name == "created_at":
+            created = index["created_at"]
+            getters.append((name, lambda row: to_datetime(row[created])))
+        else:
+            getters.append((name, itemgetter(index[TIP_LIST_FIELDS[name][0]])))
+
+    return [
+        {name: get(row) for name, get in getters}
+        for row in queryset.values_list(*columns)
+    ]
+
+
+class TipDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Detail serializer for tip with full nested relationships"""
 
     category = CategorySerializer(read_only=True)
     votes = VoteSerializer(many=True, read_only=True)
     vote_count = serializers.SerializerMethodField()
     vote_score = serializers.SerializerMethodField()
+    related = serializers.SerializerMethodField()
 
     class Meta:
         model = Tip
@@ -83,23 +246,116 @@ class TipDetailSerializer(serializers.ModelSerializer):
             "title",
             "slug",
             "description",
+            "description_html",
             "category",
             "votes",
             "vote_count",
             "vote_score",
+            "related",
             "effectiveness_avg",
             "difficulty_avg",
             "success_rate",
             "created_at",
         ]
-        read_only_fields = ["id", "vote_count", "created_at", "votes"]
+        read_only_fields = [
+            "id",
+            "description_html",
+            "vote_count",
+            "created_at",
+            "votes",
+        ]
 
     def get_vote_count(self, obj):
-        return obj.votes.count()
+        return obj.vote_count
 
     def get_vote_score(self, obj):
-        vote_count = obj.votes.count()
-        return round(obj.effectiveness_avg * vote_count, 1) if vote_count > 0 else 0
+        return vote_score(obj.effectiveness_avg, self.get_vote_count(obj))
+
+    def get_related(self, obj):
+        if not hasattr(obj, "related_tips"):
+            attach_related_tips([obj])
+        return obj.related_tips
+
+
+def attach_related_tips(tips):
+    """
+    Set related_tips on each tip: {id, title, slug} for the tips in its
+    precomputed related list, in order, read with one id__in query.
+    """
+    wanted = {tip_id for tip in tips for tip_id, _ in tip.related or ()}
+    rows = {
+        row["id"]: row
+        for row in Tip.objects.filter(id__in=wanted).values("id", "title", "slug")
+    } if wanted else {}
+    for tip in tips:
+        tip.related_tips = [
+            rows[tip_id] for tip_id, _ in tip.related or () if tip_id in rows
+        ]
+
+
+# Output field -> Tip columns it is built from, for tip_detail_queryset()
+TIP_DETAIL_COLUMNS = {
+    "id": ("id",),
+    "title": ("title",),
+    "slug": ("slug",),
+    "description": ("description",),
+    "description_html": ("description_html",),
+    "category": ("category",),
+    "votes": (),
+    "vote_count": ("vote_count",),
+    "vote_score": ("effectiveness_avg", "vote_count"),
+    "related": ("related",),
+    "effectiveness_avg": ("effectiveness_avg",),
+    "difficulty_avg": ("difficulty_avg",),
+    "success_rate": ("success_rate",),
+    "created_at": ("created_at",),
+}
+
+
+def tip_detail_queryset(queryset, fields=None):
+    """
+    Project a Tip queryset onto the TipDetailSerializer fields requested.
+
+    Only the selected columns are loaded. The category is joined only for
+    the category field and votes are prefetched only for the votes field;
+    vote_count and vote_score read the stored Tip.vote_count.
+    """
+    fields = TipDetailSerializer.Meta.fields if fields is None else fields
+    columns = {"id"}.union(c for name in fields for c in TIP_DETAIL_COLUMNS[name])
+    queryset = queryset.only(*columns)
+    if "category" in fields:
+        queryset = queryset.select_related("category")
+    if "votes" in fields:
+        queryset = queryset.prefetch_related("votes")
+    return queryset
+
+
+def tip_batch(ids, fields=None):
+    """
+    Load tips for TipDetailSerializer by id, keyed by id.
+
+    One id__in query fetches the tips, projected as in tip_detail_queryset.
+    When the nested category is requested, one aggregate query counts the
+    tips of all their categories together, instead of once per category.
+    Votes add one prefetch query and related
+    tips one id__in query, each only when requested.
+    """
+    tips = {
+        tip.id: tip
+        for tip in tip_detail_queryset(Tip.objects.filter(id__in=ids), fields)
+    }
+    if fields is None or "category" in fields:
+        counts = dict(
+            Tip.objects.filter(category_id__in={tip.category_id for tip in tips.values()})
+            .values("category_id")
+            .annotate(n=Count("id"))
+            .values_list("category_id", "n")
+        )
+        for tip in tips.values():
+            tip.category.num_tips = counts.get(tip.category_id, 0)
+    if fields is None or "related" in fields:
+        attach_related_tips(list(tips.values()))
+    return tips
 
 
 class CreateTipSerializer(serializers.Serializer):
@@ -1,43 +1,147 @@
 """
 Sitemap generator for wiki application
 Generates clean, SEO-friendly URLs with lowercase, hyphen-separated slugs
+
+/sitemap.xml is a sitemap index; each section is served from
+/sitemap-<section>.xml, and the tips section is split into pages of at most
+TipSitemap.limit URLs (?p=N).
 """
 
-from django.contrib.sitemaps import Sitemap
+import hashlib
+import re
+import uuid
+
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap, views as sitemap_views
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count, Max
 from django.urls import reverse
+from django.views.decorators.http import condition
 from .models import Tip, Category
 
+TIP_CHUNK_VERSION_KEY = "sitemap:tips:chunk:{chunk}:version"
+TIP_CHUNK_URLS_KEY = "sitemap:tips:chunk:{chunk}:{version}:{protocol}:{domain}"
+
+
+def _tip_chunk_version(chunk):
+    """Current cache version token for a tips sitemap chunk."""
+    return cache.get_or_set(
+        TIP_CHUNK_VERSION_KEY.format(chunk=chunk), uuid.uuid4().hex, None
+    )
+
+
+def invalidate_tip_sitemap(tip_ids):
+    """
+    Invalidate the cached sitemap chunks containing the given tip ids.
+
+    Chunks are fixed id ranges, so only the pages covering changed tips are
+    rebuilt; every other page keeps its cached URLs.
+    """
+    chunks = {(tip_id - 1) // TipSitemap.limit + 1 for tip_id in tip_ids if tip_id}
+    cache.set_many(
+        {TIP_CHUNK_VERSION_KEY.format(chunk=chunk): uuid.uuid4().hex for chunk in chunks},
+        None,
+    )
+
+
+def invalidate_tip_sitemap_range(first_id, last_id):
+    """Invalidate every sitemap chunk overlapping ids [first_id, last_id]."""
+    if not first_id or not last_id or last_id < first_id:
+        return
+    invalidate_tip_sitemap(
+        [*range(first_id, last_id + 1, TipSitemap.limit), last_id]
+    )
+
 
 class TipSitemap(Sitemap):
     """
     Sitemap for Tip pages with clean, SEO-friendly URLs
     Format: /tips/:id-:slug (e.g., /tips/123-how-to-clean-kitchen)
+
+    Page N holds tips with ids in ((N-1)*limit, N*limit], built from
+    (id, slug, updated_at) rows streamed through a server-side cursor and
+    cached until a tip in that range changes.
     """
 
     changefreq = "weekly"
     priority = 0.8
+    limit = 50000
+
+    @property
+    def paginator(self):
+        # A range stands in for the id space: num_pages and page validation
+        # come from MAX(id) without loading a single tip.
+        max_id = Tip.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+        return Paginator(range(max_id), self.limit)
 
     def items(self):
-        return Tip.objects.all()
+        return Tip.objects.order_by("id").values_list("id", "slug", "updated_at")
 
     def lastmod(self, obj):
-        return obj.created_at
+        return obj[2]
 
     def location(self, obj):
         """
         Generate clean URL format: /tips/:id-:slug
         Example: /tips/123-how-to-clean-kitchen
         """
-        slug = self._create_slug(obj.title)
-        return f"/tips/{obj.id}-{slug}"
+        tip_id, slug = obj[0], obj[1]
+        return f"/tips/{tip_id}-{slug or self._create_slug_for(tip_id)}"
+
+    def get_latest_lastmod(self):
+        return Tip.objects.aggregate(latest=Max("updated_at"))["latest"]
+
+    def get_urls(self, page=1, site=None, protocol=None):
+        protocol = self.get_protocol(protocol)
+        domain = self.get_domain(site)
+        page = self.paginator.validate_number(page)
+
+        key = TIP_CHUNK_URLS_KEY.format(
+            chunk=page,
+            version=_tip_chunk_version(page),
+            protocol=protocol,
+            domain=domain,
+        )
+        urls = cache.get(key)
+        if urls is None:
+            urls = self._chunk_urls(page, protocol, domain)
+            cache.set(key, urls, getattr(settings, "SITEMAP_CACHE_TIMEOUT", 6 * 3600))
+
+        if urls:
+            self.latest_lastmod = max(url["lastmod"] for url in urls)
+        return urls
+
+    def _chunk_urls(self, page, protocol, domain):
+        low = (page - 1) * self.limit
+        rows = (
+            self.items()
+            .filter(id__gt=low, id__lte=low + self.limit)
+            .iterator(chunk_size=2000)
+        )
+        priority = str(self.priority)
+        return [
+            {
+                "item": row[0],
+                "location": f"{protocol}://{domain}{self.location(row)}",
+                "lastmod": self.lastmod(row),
+                "changefreq": self.changefreq,
+                "priority": priority,
+                "alternates": [],
+            }
+            for row in rows
+        ]
+
+    def _create_slug_for(self, tip_id):
+        """Fallback for legacy rows saved without a slug"""
+        title = Tip.objects.filter(id=tip_id).values_list("title", flat=True).first()
+        return self._create_slug(title or "")
 
     def _create_slug(self, text):
         """
         Convert title to lowercase, hyphen-separated slug
         Example: "How to Clean Kitchen" -> "how-to-clean-kitchen"
         """
-        import re
-
         slug = text.lower()
         slug = re.sub(r"[^\w\s-]", "", slug)
         slug = re.sub(r"[\s_]+", "-", slug)
@@ -56,10 +160,13 @@ class CategorySitemap(Sitemap):
     priority = 0.6
 
     def items(self):
-        return Category.objects.all()
+        return Category.objects.only("slug", "updated_at").order_by("slug")
 
     def lastmod(self, obj):
-        return None
+        return obj.updated_at
+
+    def get_latest_lastmod(self):
+        return Category.objects.aggregate(latest=Max("updated_at"))["latest"]
 
     def location(self, obj):
         """
@@ -84,3 +191,60 @@ class StaticViewSitemap(Sitemap):
         if item == "home":
             return "/"
         return f"/{item}/"
+
+
+def _sitemap_version(request, sitemaps, section=None):
+    """
+    (latest updated_at, row count) for the requested sitemap, from one query.
+
+    Category.updated_at is bumped by every tip change, so the index and the
+    categories section use MAX over categories; a tips page only looks at the
+    tips in its own id range. The count makes deletions change the ETag.
+    Memoized on the request because ETag and Last-Modified both need it.
+    """
+    if hasattr(request, "_sitemap_version"):
+        return request._sitemap_version
+
+    version = None
+    if section == "tips":
+        try:
+            page = int(request.GET.get("p", 1))
+        except ValueError:
+            page = None
+        if page is not None and page > 0:
+            low = (page - 1) * TipSitemap.limit
+            version = Tip.objects.filter(
+                id__gt=low, id__lte=low + TipSitemap.limit
+            ).aggregate(latest=Max("updated_at"), count=Count("id"))
+    elif section in (None, "categories"):
+        version = Category.objects.aggregate(
+            latest=Max("updated_at"), count=Count("id")
+        )
+
+    if version is not None and version["latest"] is None:
+        version = None
+    request._sitemap_version = version
+    return version
+
+
+def sitemap_last_modified(request, sitemaps, section=None, **kwargs):
+    version = _sitemap_version(request, sitemaps, section)
+    return version["latest"] if version else None
+
+
+def sitemap_etag(request, sitemaps, section=None, **kwargs):
+    version = _sitemap_version(request, sitemaps, section)
+    if not version:
+        return None
+    raw = f"{section}:{request.GET.get('p', 1)}:{version['latest'].isoformat()}:{version['count']}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+# Sitemap views that answer If-None-Match / If-Modified-Since with 304
+# before any sitemap is built.
+index = condition(etag_func=sitemap_etag, last_modified_func=sitemap_last_modified)(
+    sitemap_views.index
+)
+sitemap = condition(etag_func=sitemap_etag, last_modified_func=sitemap_last_modified)(
+    sitemap_views.sitemap
+)
@@ -0,0 +1,199 @@
+"""
+Streaming export/import of wiki content.
+
+Shared by the export_wiki and import_wiki management commands. Each table
+is written to its own file in a directory (categories, tips, votes, flags),
+as JSONL or CSV and optionally gzip-compressed. Rows are streamed one at a
+time in both directions, so memory use does not grow with the dataset.
+Foreign keys are exported as the source database's ids and remapped to the
+target's ids on import.
+"""
+
+import csv
+import datetime
+import gzip
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Category, ModerationFlag, Tip, Vote
+
+FORMATS = ("jsonl", "csv")
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder that keeps full microsecond precision on datetimes."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class Table:
+    """An exported model: file name, field attnames and foreign key targets."""
+
+    def __init__(self, name, model, fields, foreign_keys=None):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        # attname -> name of the table the id refers to
+        self.foreign_keys = foreign_keys or {}
+
+
+# In dependency order: a table only references tables listed before it.
+# ModerationFlag.reviewed_by is not exported; users are not part of the wiki dump.
+TABLES = [
+    Table("categories", Category, ["id", "name", "slug", "description", "updated_at"]),
+    Table(
+        "tips",
+        Tip,
+        [
+            "id",
+            "title",
+            "slug",
+            "description",
+            "description_html",
+            "description_html_version",
+            "category_id",
+            "effectiveness_avg",
+            "difficulty_avg",
+            "success_rate",
+            "vote_count",
+            "created_at",
+            "updated_at",
+        ],
+        foreign_keys={"category_id": "categories"},
+    ),
+    Table(
+        "votes",
+        Vote,
+        ["id", "tip_id", "effectiveness", "difficulty", "ip_hash", "created_at"],
+        foreign_keys={"tip_id": "tips"},
+    ),
+    Table(
+        "flags",
+        ModerationFlag,
+        [
+            "id",
+            "tip_id",
+            "flag_type",
+            "category",
+            "confidence",
+            "status",
+            "matched_terms",
+            "reason",
+            "ip_hash",
+            "reviewed_at",
+            "created_at",
+        ],
+        foreign_keys={"tip_id": "tips"},
+    ),
+]
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+
+def data_path(directory, table, fmt, compress=False):
+    """Return the path a table is exported to."""
+    suffix = f".{fmt}.gz" if compress else f".{fmt}"
+    return Path(directory) / f"{table.name}{suffix}"
+
+
+def find_data_file(directory, table):
+    """
+    Locate an exported table in a directory.
+
+    Returns:
+        (path, fmt) for the first existing file, or (None, None)
+    """
+    for fmt in FORMATS:
+        for compress in (False, True):
+            path = data_path(directory, table, fmt, compress)
+            if path.exists():
+                return path, fmt
+    return None, None
+
+
+def open_text(path, mode="r"):
+    """Open a data file as text, transparently handling .gz files."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, f"{mode}t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def write_rows(stream, fmt, fields, rows):
+    """
+    Write rows (tuples ordered like fields) to an open text stream.
+
+    Returns:
+        Number of rows written
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow(_csv_value(value) for value in row)
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(dict(zip(fields, row)), cls=ExportJSONEncoder))
+            stream.write("\n")
+            count += 1
+    return count
+
+
+def read_rows(stream, fmt):
+    """Yield each row of an open text stream as a dict of raw values."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def decode_value(field, value, fmt):
+    """Convert a raw exported value back to a Python value for field."""
+    if fmt == "csv":
+        if value == "" and field.null:
+            return None
+        if field.get_internal_type() == "JSONField":
+            return json.loads(value)
+    if value is None:
+        return None
+    return field.to_python(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+@contextmanager
+def preserve_timestamps(model):
+    """
+    Keep exported created_at/updated_at values during bulk_create.
+
+    auto_now and auto_now_add fields would otherwise be overwritten with the
+    current time when the rows are inserted.
+    """
+    fields = [
+        (f, f.auto_now, f.auto_now_add)
+        for f in model._meta.concrete_fields
+        if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
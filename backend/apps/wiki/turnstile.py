@@ -0,0 +1,220 @@
+"""
+Cloudflare Turnstile token verification.
+
+Tokens are checked against the siteverify endpoint (TURNSTILE_VERIFY_URL)
+through one requests.Session per process. Its connection pool keeps
+connections alive, so a submission normally reuses an open TLS connection
+instead of paying a new handshake.
+
+Every attempt is bounded by TURNSTILE_CONNECT_TIMEOUT and
+TURNSTILE_READ_TIMEOUT, so a hung upstream cannot hold a worker. Failed
+attempts are retried up to TURNSTILE_MAX_RETRIES times, with a short
+backoff. These count as failures: connection errors, timeouts, 429 and 5xx
+responses, unparseable bodies and Cloudflare's "internal-error". All
+attempts for one token send the same idempotency_key. A retry after a read
+timeout therefore gets the original answer, instead of being rejected as a
+replayed token. The worst case for one verification is about
+(1 + retries) * (connect + read timeout) plus the backoff.
+
+When every attempt fails, the upstream is unavailable, and TURNSTILE_FAIL_OPEN
+decides the outcome:
+- off (the default): the submission is refused;
+- on: it is let through, and the rest of create_tip's checks still run.
+
+Fail-open only covers the upstream. If the client itself cannot run
+(requests is not installed), every token is refused.
+
+Outcome counters and recent latencies are per process; see stats().
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import Counter, deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 1000  # most recent verifications kept for percentiles
+
+RETRYABLE_ERROR_CODES = frozenset({"internal-error"})
+
+_session = None
+_session_lock = threading.Lock()
+_stats = Counter()
+_latencies = deque(maxlen=LATENCY_WINDOW)
+_stats_lock = threading.Lock()
+
+
+class UpstreamError(Exception):
+    """A siteverify attempt that did not produce a usable answer."""
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests  # Lazy import prevents startup failure if dependency is missing.
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=getattr(settings, "TURNSTILE_POOL_SIZE", 10),
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _attempt(session, payload):
+    """One siteverify call; returns the decoded answer or raises UpstreamError."""
+    import requests
+
+    try:
+        response = session.post(
+            settings.TURNSTILE_VERIFY_URL,
+            data=payload,
+            timeout=(settings.TURNSTILE_CONNECT_TIMEOUT, settings.TURNSTILE_READ_TIMEOUT),
+        )
+    except requests.Timeout as exc:
+        _count("timeouts")
+        raise UpstreamError(f"timed out: {exc}") from exc
+    except requests.RequestException as exc:
+        _count("connection_errors")
+        raise UpstreamError(f"request failed: {exc}") from exc
+
+    if response.status_code == 429 or response.status_code >= 500:
+        _count("server_errors")
+        raise UpstreamError(f"HTTP {response.status_code}")
+    try:
+        result = response.json()
+    except ValueError as exc:
+        _count("bad_responses")
+        raise UpstreamError("response is not JSON") from exc
+    if not isinstance(result, dict):
+        _count("bad_responses")
+        raise UpstreamError("response is not a JSON object")
+    if not result.get("success") and RETRYABLE_ERROR_CODES.intersection(
+        result.get("error-codes") or ()
+    ):
+        _count("server_errors")
+        raise UpstreamError(f"error codes {result['error-codes']}")
+    return result
+
+
+def verify(token, remote_ip=None):
+    """
+    Check a Turnstile token.
+
+    Args:
+        token: The client's turnstile_token
+        remote_ip: Visitor IP, passed on to Cloudflare as remoteip
+
+    Returns:
+        Dict with success (whether to accept the submission), unavailable
+        (no answer was obtained; success then reflects TURNSTILE_FAIL_OPEN
+        for upstream failures, and is False when requests is missing) and
+        error_codes (as reported by Cloudflare)
+    """
+    started = time.perf_counter()
+    _count("verifications")
+    payload = {
+        "secret": settings.TURNSTILE_SECRET_KEY,
+        "response": token,
+        "idempotency_key": str(uuid.uuid4()),
+    }
+    if remote_ip:
+        payload["remoteip"] = remote_ip
+
+    try:
+        session = _get_session()
+    except ImportError:
+        logger.exception("requests dependency is missing while verifying Turnstile.")
+        _count("failed_closed")
+        return {"success": False, "unavailable": True, "error_codes": []}
+
+    result = None
+    attempts = 1 + settings.TURNSTILE_MAX_RETRIES
+    for attempt in range(attempts):
+        if attempt:
+            _count("retries")
+            time.sleep(settings.TURNSTILE_RETRY_BACKOFF * attempt)
+        try:
+            result = _attempt(session, payload)
+            break
+        except UpstreamError as exc:
+            logger.warning(
+                "Turnstile siteverify attempt %d/%d failed: %s", attempt + 1, attempts, exc
+            )
+
+    elapsed = time.perf_counter() - started
+    with _stats_lock:
+        _latencies.append(elapsed)
+
+    if result is None:
+        fail_open = settings.TURNSTILE_FAIL_OPEN
+        _count("failed_open" if fail_open else "failed_closed")
+        return {"success": fail_open, "unavailable": True, "error_codes": []}
+
+    success = bool(result.get("success"))
+    _count("valid" if success else "invalid")
+    return {
+        "success": success,
+        "unavailable": False,
+        "error_codes": list(result.get("error-codes") or []),
+    }
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def stats():
+    """
+    Counters for this process.
+
+    Returns:
+        Dict with verifications, valid, invalid, failed_open and
+        failed_closed (outcomes), retries, timeouts, connection_errors,
+        server_errors and bad_responses (failed attempts), and latency_ms:
+        count, p50, p95, p99 and max over the last LATENCY_WINDOW
+        verifications, retries included
+    """
+    names = (
+        "verifications", "valid", "invalid", "failed_open", "failed_closed",
+        "retries", "timeouts", "connection_errors", "server_errors", "bad_responses",
+    )
+    with _stats_lock:
+        counters = {name: _stats[name] for name in names}
+        ordered = sorted(_latencies)
+    latency = {"count": len(ordered)}
+    if ordered:
+        latency.update(
+            (name, round(_percentile(ordered, fraction) * 1000, 1))
+            for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+        )
+        latency["max"] = round(ordered[-1] * 1000, 1)
+    counters["latency_ms"] = latency
+    return counters
+
+
+def reset():
+    """Close the pooled session and zero the counters (tests, settings changes)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+    with _stats_lock:
+        _stats.clear()
+        _latencies.clear()
@@ -6,9 +6,12 @@ from django.views.decorators.csrf import csrf_exempt
 
 urlpatterns = [
     # Public API endpoints
+    # Homepage aggregate
+    path("home/", views.HomeView.as_view(), name="home"),
     # Tips endpoints
     path("tips/", views.TipListView.as_view(), name="tip-list-create"),
     path("tips/<int:tip_id>/", views.TipDetailView.as_view(), name="tip-detail"),
+    path("tips/batch/", views.TipBatchView.as_view(), name="tip-batch"),
     # Voting endpoint (existing)
     path("tips/<int:tip_id>/vote/", views.tip_vote, name="tip-vote"),
     # Tip creation endpoint (existing)
@@ -22,8 +25,28 @@ urlpatterns = [
         views.CategoryDetailView.as_view(),
         name="category-detail",
     ),
+    # Materialized leaderboards
+    path(
+        "leaderboards/<str:metric>/",
+        views.LeaderboardView.as_view(),
+        name="leaderboard",
+    ),
     # Products endpoint
     path("products/", views.AffiliateProductList.as_view(), name="product-list"),
+    path(
+        "products/clicks/",
+        views.AffiliateClickReport.as_view(),
+        name="product-click-report",
+    ),
+    # Affiliate click-through redirect
+    path("go/<int:product_id>/", views.affiliate_go, name="affiliate-go"),
+    # Reviewer moderation queue
+    path("moderation/flags/", views.ModerationQueue.as_view(), name="moderation-queue"),
+    path("moderation/flags/bulk/", views.bulk_moderate_flags, name="moderation-bulk"),
+    # Response cache counters
+    path("cache/stats/", views.response_cache_stats, name="response-cache-stats"),
+    # Turnstile verification counters
+    path("turnstile/stats/", views.turnstile_stats, name="turnstile-stats"),
     # Search endpoint
     path("tips/search/", views.search_tips, name="tip-search"),
 ]
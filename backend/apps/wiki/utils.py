@@ -5,39 +5,102 @@ This module provides functionality to automatically convert keywords in text
 into affiliate links with proper SEO attributes (rel="nofollow sponsored").
 """
 
+import hashlib
 import json
 import os
+import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Pattern, Tuple
 
 from django.conf import settings
+from django.core.cache import caches
+from django.utils.html import escape
+
+
+# Default path: fixtures/affiliate_products.json relative to this file
+DEFAULT_AFFILIATE_FIXTURE = Path(__file__).parent / "fixtures" / "affiliate_products.json"
+
+
+def normalize_keywords(keywords: List[str]) -> List[str]:
+    """
+    Normalize affiliate keywords: lowercase, stripped, de-duplicated, non-empty.
+
+    Args:
+        keywords: Raw keyword list.
+
+    Returns:
+        Normalized keywords in their original order.
+    """
+    normalized = (keyword.lower().strip() for keyword in keywords or [])
+    return list(dict.fromkeys(keyword for keyword in normalized if keyword))
 
 
 class AffiliateLinkGenerator:
     """
     Generates affiliate links from keyword mappings.
 
-    Uses a JSON fixture file containing product mappings for Amazon and iHerb.
+    Uses product mappings for Amazon and iHerb, either from the JSON fixture
+    file or from an in-memory snapshot of AffiliateProduct rows.
     Keywords in text are automatically replaced with affiliate links containing
     rel="nofollow sponsored" attributes for SEO compliance.
     """
 
-    def __init__(self, fixture_path: Optional[str] = None):
+    def __init__(
+        self, fixture_path: Optional[str] = None, mappings: Optional[Dict] = None
+    ):
         """
         Initialize the affiliate link generator.
 
         Args:
             fixture_path: Optional path to the affiliate_products.json fixture file.
                          If not provided, uses the default path relative to this file.
+            mappings: Optional pre-built mappings in the fixture format. When given,
+                      the fixture file is not read.
         """
         if fixture_path is None:
-            # Default path: fixtures/affiliate_products.json relative to this file
-            base_dir = Path(__file__).parent
-            fixture_path = base_dir / "fixtures" / "affiliate_products.json"
+            fixture_path = DEFAULT_AFFILIATE_FIXTURE
 
         self.fixture_path = Path(fixture_path)
-        self._mappings: Dict = self._load_mappings()
+        self._mappings: Dict = mappings if mappings is not None else self._load_mappings()
         self._keyword_index: Dict[str, Dict] = self._build_keyword_index()
+        self._product_index: Dict[int, Dict] = self._build_product_index()
+        self._keyword_pattern: Optional[Pattern[str]] = self._compile_keyword_pattern()
+        self.version: str = self._compute_version()
+
+    @classmethod
+    def from_products(cls, products) -> "AffiliateLinkGenerator":
+        """
+        Build a generator from an in-memory snapshot of AffiliateProduct rows.
+
+        Args:
+            products: Iterable of AffiliateProduct instances (typically the
+                      active ones).
+
+        Returns:
+            AffiliateLinkGenerator whose keyword index mirrors the products.
+        """
+        from django.urls import reverse
+
+        tracking_base = getattr(settings, "AFFILIATE_TRACKING_BASE_URL", "")
+
+        mappings: Dict[str, Dict] = {}
+        for product in products:
+            product_key = product.product_key or f"product_{product.pk}"
+            product_data = {
+                "pk": product.pk,
+                "keyword": list(product.keywords),
+                "name": product.name,
+                "url": product.affiliate_url,
+                "category": product.category,
+                "product_id": product.product_id,
+            }
+            if tracking_base:
+                # Route clicks through the /api/go/<id>/ counter redirect
+                product_data["link_url"] = tracking_base.rstrip("/") + reverse(
+                    "affiliate-go", args=[product.pk]
+                )
+            mappings.setdefault(product.network, {})[product_key] = product_data
+        return cls(mappings={"affiliate_mappings": mappings})
 
     def _load_mappings(self) -> Dict:
         """
@@ -78,9 +141,93 @@ class AffiliateLinkGenerator:
                         "product_id": product_data.get("asin")
                         or product_data.get("product_id", ""),
                     }
+                    if product_data.get("link_url"):
+                        index[normalized_keyword]["link_url"] = product_data["link_url"]
 
         return index
 
+    def _build_product_index(self) -> Dict[int, Dict]:
+        """
+        Build a primary-key-to-product index for products loaded from the database.
+
+        Returns:
+            Dictionary mapping AffiliateProduct ids to their URL, name and platform.
+        """
+        index = {}
+
+        for platform, products in self._mappings.get("affiliate_mappings", {}).items():
+            for product_data in products.values():
+                if product_data.get("pk") is not None:
+                    index[product_data["pk"]] = {
+                        "name": product_data.get("name", ""),
+                        "url": product_data.get("url", ""),
+                        "platform": platform,
+                    }
+
+        return index
+
+    def _compute_version(self) -> str:
+        """
+        Fingerprint the keyword index so rendered output can be invalidated.
+
+        Returns:
+            Short hex digest that changes whenever any keyword, URL or product
+            name changes.
+        """
+        payload = json.dumps(self._keyword_index, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:16]
+
+    def _compile_keyword_pattern(self) -> Optional[Pattern[str]]:
+        """
+        Compile the keyword index into a single matcher over lowercased text.
+
+        Existing anchors and HTML tags are matched first (group "markup") so the
+        scanner can copy them through untouched. Keywords are compiled as a trie
+        that prefers the longest match, so "waxed floss" wins over "floss", and
+        are anchored on word boundaries so "soap" never matches inside "soapy".
+
+        Returns:
+            Compiled pattern, or None when there are no keywords.
+        """
+        if not self._keyword_index:
+            return None
+
+        trie: Dict = {}
+        for keyword in self._keyword_index:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        return re.compile(
+            r"(?P<markup><a\b[^>]*>.*?</a\s*>|<[^>]*>)"
+            rf"|(?<!\w)(?P<keyword>{self._trie_to_regex(trie)})(?!\w)",
+            re.DOTALL,
+        )
+
+    @classmethod
+    def _trie_to_regex(cls, node: Dict) -> str:
+        """
+        Render a character trie as a regex with shared prefixes factored out.
+
+        A flat "kw1|kw2|..." alternation makes the engine retry every keyword at
+        every text position; the trie form rejects a position on its first
+        character. Longer branches are emitted before the end-of-keyword marker
+        so the engine still prefers the longest keyword.
+        """
+        branches = [
+            re.escape(char) + cls._trie_to_regex(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if "" in node:
+            if not branches:
+                return ""
+            return f"(?:{'|'.join(branches)})?"
+        if len(branches) == 1:
+            return branches[0]
+        return f"(?:{'|'.join(branches)})"
+
     def generate_affiliate_link(
         self,
         keyword: str,
@@ -115,7 +262,7 @@ class AffiliateLinkGenerator:
         css_class_attr = f' class="{css_class}"' if css_class else ""
 
         html = (
-            f'<a href="{product_info["url"]}" '
+            f'<a href="{product_info.get("link_url") or product_info["url"]}" '
             f'rel="nofollow sponsored" '
             f'target="{target}" '
             f'title="{product_info["name"]}" '
@@ -149,34 +296,50 @@ class AffiliateLinkGenerator:
             >>> generator.convert_text_with_affiliate_links(text)
             'I recommend <a href="...">omega3</a> and <a href="...">vitamin_d3</a> supplements.'
         """
-        if skip_words is None:
-            skip_words = []
-
-        words_to_skip = {word.lower().strip() for word in skip_words}
-        result = text
-        links_added = 0
-
-        # Sort keywords by length (longest first) to avoid partial matches
-        sorted_keywords = sorted(
-            self._keyword_index.keys(), key=lambda x: len(x.split()), reverse=True
-        )
+        if self._keyword_pattern is None or max_links_per_text <= 0:
+            return text
+
+        words_to_skip = {word.lower().strip() for word in skip_words or []}
+        linked_keywords = set()
+        parts: List[str] = []
+        position = 0
+
+        # Match against a lowercased copy (cheaper than re.IGNORECASE) and
+        # slice the original text by the same offsets, so lowercasing must not
+        # change the length of any character.
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = "".join(
+                lower if len(lower) == 1 else char
+                for char, lower in ((char, char.lower()) for char in text)
+            )
 
-        for keyword in sorted_keywords:
-            if links_added >= max_links_per_text:
-                break
+        # Single left-to-right scan: each keyword is linked on its first
+        # occurrence only, and existing markup is never rewritten.
+        for match in self._keyword_pattern.finditer(lowered):
+            keyword = match.group("keyword")
+            if keyword is None:
+                continue
 
-            if keyword in words_to_skip:
+            if keyword in words_to_skip or keyword in linked_keywords:
                 continue
 
-            if keyword.lower() in result.lower():
-                # Generate affiliate link for this keyword
-                affiliate_link = self.generate_affiliate_link(keyword)
+            start, end = match.span()
+            parts.append(text[position:start])
+            parts.append(
+                self.generate_affiliate_link(keyword, link_text=text[start:end])
+            )
+            position = end
+            linked_keywords.add(keyword)
+
+            if len(linked_keywords) >= max_links_per_text:
+                break
 
-                # Replace only the first occurrence to avoid spam
-                result = result.replace(keyword, affiliate_link, 1)
-                links_added += 1
+        if not parts:
+            return text
 
-        return result
+        parts.append(text[position:])
+        return "".join(parts)
 
     def get_product_by_keyword(self, keyword: str) -> Optional[Dict]:
         """
@@ -199,6 +362,19 @@ class AffiliateLinkGenerator:
         """
         return self._keyword_index.get(keyword.lower().strip())
 
+    def get_product_by_pk(self, pk: int) -> Optional[Dict]:
+        """
+        Get product information by AffiliateProduct primary key.
+
+        Args:
+            pk: AffiliateProduct id.
+
+        Returns:
+            Dictionary with 'name', 'url' and 'platform', or None if the product
+            is unknown, inactive or the mappings came from the JSON fixture.
+        """
+        return self._product_index.get(pk)
+
     def get_all_keywords(self) -> List[str]:
         """
         Get all available keywords in the affiliate database.
@@ -243,10 +419,41 @@ def get_affiliate_generator() -> AffiliateLinkGenerator:
     """
     global _affiliate_generator
     if _affiliate_generator is None:
-        _affiliate_generator = AffiliateLinkGenerator()
+        _affiliate_generator = _load_affiliate_generator()
     return _affiliate_generator
 
 
+def _load_affiliate_generator() -> AffiliateLinkGenerator:
+    """
+    Snapshot active AffiliateProduct rows into a generator.
+
+    The database is the source of truth (populated by the
+    import_affiliate_products command). The JSON fixture is only used when the
+    table is empty or not migrated yet, e.g. on a fresh install.
+    """
+    from django.db import DatabaseError
+
+    from .models import AffiliateProduct
+
+    try:
+        products = list(AffiliateProduct.objects.filter(is_active=True))
+    except DatabaseError:
+        logger.warning("AffiliateProduct table unavailable, using fixture mappings")
+        products = []
+
+    if products:
+        return AffiliateLinkGenerator.from_products(products)
+    return AffiliateLinkGenerator()
+
+
+def reset_affiliate_generator() -> None:
+    """
+    Drop the global generator so the next call reloads the affiliate mappings.
+    """
+    global _affiliate_generator
+    _affiliate_generator = None
+
+
 def generate_affiliate_link(
     keyword: str,
     link_text: Optional[str] = None,
@@ -289,6 +496,24 @@ def convert_text_with_affiliate_links(
     )
 
 
+def render_description_html(text: str) -> Tuple[str, str]:
+    """
+    Render a plain-text tip description as HTML with affiliate links.
+
+    The text is HTML-escaped before linking, so the only markup in the result
+    is the affiliate anchors themselves.
+
+    Args:
+        text: Plain-text description.
+
+    Returns:
+        Tuple of (rendered HTML, affiliate version it was rendered with).
+    """
+    generator = get_affiliate_generator()
+    html = generator.convert_text_with_affiliate_links(escape(text))
+    return html, generator.version
+
+
 import logging
 from threading import Lock
 
@@ -405,6 +630,11 @@ class AIModerator:
                 'all_scores': {}
             }
 
+        cache_key = self._verdict_cache_key(text, threshold)
+        verdict = caches['moderation'].get(cache_key)
+        if verdict is not None:
+            return verdict
+
         try:
             classifier = self.get_classifier()
 
@@ -424,13 +654,16 @@ class AIModerator:
                 top_score >= threshold
             )
 
-            return {
+            verdict = {
                 'is_flagged': is_flagged,
                 'reason': f"Content flagged as: {top_result}",
                 'confidence': top_score,
                 'category': top_result if is_flagged else None,
                 'all_scores': dict(zip(result['labels'], result['scores']))
             }
+            # Only classifier verdicts are cached; fallbacks retry next time
+            caches['moderation'].set(cache_key, verdict)
+            return verdict
 
         except RuntimeError as e:
             logger.warning(f"AI classifier unavailable, falling back to keyword check: {e}")
@@ -446,6 +679,11 @@ class AIModerator:
                 'all_scores': {}
             }
 
+    def _verdict_cache_key(self, text: str, threshold: float) -> str:
+        """Cache key for a verdict: same text, model, labels and threshold."""
+        payload = json.dumps([self.model_name, self.categories, threshold, text])
+        return f"verdict:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
     def _fallback_keyword_check(self, text: str) -> Dict[str, any]:
         """
         Fallback keyword-based moderation when AI classifier is unavailable.
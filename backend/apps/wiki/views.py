@@ -1,27 +1,69 @@
 # pyright: reportMissingTypeStubs=false, reportUnknownMemberType=false, reportUnknownVariableType=false, reportUnknownParameterType=false, reportMissingParameterType=false, reportUnknownArgumentType=false, reportAttributeAccessIssue=false, reportUnusedImport=false, reportDuplicateImport=false, reportImplicitOverride=false, reportUnreachable=false
 
 from rest_framework import generics, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
-from .models import Category, Tip, Vote, AffiliateProduct
+from django.utils.dateparse import parse_date
+from .clicks import click_buffer
+from .models import (Category, Tip, Vote, AffiliateProduct, AffiliateClickDaily,
+                     ModerationFlag)
 from .serializers import (CategorySerializer, TipListSerializer, TipDetailSerializer,
                            CreateTipSerializer, VoteTipSerializer, FlagTipSerializer,
-                           AffiliateProductSerializer)
+                           AffiliateProductSerializer, AffiliateClickDailySerializer,
+                           ModerationQueueSerializer, TIP_LIST_FIELDS, category_queryset,
+                           requested_fields, tip_batch, tip_detail_queryset,
+                           tip_list_rows)
+from .moderation import (BulkModerationError, bulk_review_flags, filter_flags,
+                         validate_flag_filters)
+from . import dedup, leaderboards, response_cache, turnstile
+from .response_cache import CachedResponseMixin
+from .utils import get_affiliate_generator
 from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Avg, Count
+from datetime import timedelta
 import json
+import os
 
 
-class TipListView(generics.ListAPIView):
+class SparseFieldsMixin:
+    """
+    Reads ?fields=a,b / ?exclude=c against sparse_fields into
+    self.selected_fields (None for the full shape). Unknown names are a 400.
+    """
+    sparse_fields = ()
+    selected_fields = None
+
+    def get(self, request, *args, **kwargs):
+        try:
+            self.selected_fields = requested_fields(request.query_params, self.sparse_fields)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
+        return super().get(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.selected_fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class TipListView(CachedResponseMixin, SparseFieldsMixin, generics.ListAPIView):
     """List all tips with pagination"""
-    queryset = Tip.objects.select_related('category').prefetch_related('votes').order_by('-created_at')
+    cache_namespaces = ('tips', 'categories')
+    sparse_fields = tuple(TIP_LIST_FIELDS)
+    queryset = Tip.objects.order_by('-created_at')
     serializer_class = TipListSerializer
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         page = self.paginate_queryset(queryset)
-        serializer = self.get_serializer(page.object_list, many=True)
-        return self.get_paginated_response(page, serializer.data)
+        return self.get_paginated_response(
+            page, tip_list_rows(page.object_list, self.selected_fields)
+        )
 
     def paginate_queryset(self, queryset):
         paginator = Paginator(queryset, 20)
@@ -40,45 +82,286 @@ class TipListView(generics.ListAPIView):
         })
 
 
-class TipDetailView(generics.RetrieveAPIView):
+class TipDetailView(CachedResponseMixin, SparseFieldsMixin, generics.RetrieveAPIView):
     """Get detail view for a specific tip"""
-    queryset = Tip.objects.select_related('category').prefetch_related('votes')
+    cache_namespaces = ('tips', 'categories')
+    sparse_fields = tuple(TipDetailSerializer.Meta.fields)
     serializer_class = TipDetailSerializer
     lookup_field = 'id'
     lookup_url_kwarg = 'tip_id'
 
+    def get_queryset(self):
+        return tip_detail_queryset(Tip.objects.all(), self.selected_fields)
+
+
+class TipBatchView(CachedResponseMixin, SparseFieldsMixin, generics.ListAPIView):
+    """
+    Tip details for up to TIP_BATCH_MAX_IDS ids (?ids=1,2,3) in one request,
+    in the order asked for. Ids with no tip are listed under "missing".
+    """
+    cache_namespaces = ('tips', 'categories')
+    sparse_fields = tuple(TipDetailSerializer.Meta.fields)
+    serializer_class = TipDetailSerializer
+
+    def list(self, request, *args, **kwargs):
+        try:
+            ids = list(dict.fromkeys(
+                int(tip_id) for tip_id in request.query_params.get('ids', '').split(',')
+                if tip_id.strip()
+            ))
+        except ValueError:
+            return Response({'error': '"ids" must be comma-separated integers'}, status=400)
+        if not ids:
+            return Response({'error': 'Query parameter "ids" is required'}, status=400)
+        limit = settings.TIP_BATCH_MAX_IDS
+        if len(ids) > limit:
+            return Response({'error': f'At most {limit} ids per request'}, status=400)
+
+        tips = tip_batch(ids, self.selected_fields)
+        return Response({
+            'results': self.get_serializer(
+                [tips[tip_id] for tip_id in ids if tip_id in tips], many=True
+            ).data,
+            'missing': [tip_id for tip_id in ids if tip_id not in tips],
+        })
 
-class CategoryListView(generics.ListAPIView):
+
+class CategoryListView(CachedResponseMixin, SparseFieldsMixin, generics.ListAPIView):
     """List all categories with tips count"""
-    queryset = Category.objects.all().order_by('name')
+    cache_namespaces = ('tips', 'categories')
+    sparse_fields = tuple(CategorySerializer.Meta.fields)
     serializer_class = CategorySerializer
 
+    def get_queryset(self):
+        return category_queryset(Category.objects.order_by('name'), self.selected_fields)
+
 
-class CategoryDetailView(generics.RetrieveAPIView):
+class CategoryDetailView(CachedResponseMixin, SparseFieldsMixin, generics.RetrieveAPIView):
     """Get category details with its tips"""
-    queryset = Category.objects.all()
+    cache_namespaces = ('tips', 'categories')
+    sparse_fields = ('id', 'name', 'slug', 'description', 'tips')
     serializer_class = CategorySerializer
     lookup_field = 'slug'
 
+    def get_queryset(self):
+        fields = self.selected_fields or self.sparse_fields
+        return Category.objects.only('id', *(name for name in fields if name != 'tips'))
+
     def retrieve(self, request, *args, **kwargs):
         category = self.get_object()
-        tips = Tip.objects.filter(category=category).select_related('category').order_by('-created_at')
-        serializer = TipListSerializer(tips, many=True)
+        fields = self.selected_fields or self.sparse_fields
+        data = {name: getattr(category, name) for name in fields if name != 'tips'}
+        if 'tips' in fields:
+            tips = Tip.objects.filter(category=category).order_by('-created_at')
+            data['tips'] = tip_list_rows(tips)
+        return Response(data)
+
+
+class HomeView(CachedResponseMixin, generics.GenericAPIView):
+    """
+    Everything the homepage renders, in one response: categories with tip
+    counts, and the latest, top (by success_rate) and trending tips.
+    Trending tips are the most voted on within TRENDING_DAYS. Five
+    queries at most, all bounded by HOME_SECTION_SIZE or the category count.
+    """
+    cache_namespaces = ('tips', 'categories')
+
+    def get(self, request, *args, **kwargs):
+        size = settings.HOME_SECTION_SIZE
+        since = timezone.now() - timedelta(days=settings.TRENDING_DAYS)
+        trending_ids = list(
+            Vote.objects.filter(created_at__gte=since)
+            .values('tip_id')
+            .annotate(recent_votes=Count('id'))
+            .order_by('-recent_votes', '-tip_id')
+            .values_list('tip_id', flat=True)[:size]
+        )
+        trending = {row['id']: row for row in tip_list_rows(Tip.objects.filter(id__in=trending_ids))}
+        categories = category_queryset(Category.objects.order_by('name'))
+
         return Response({
-            'id': category.id,
-            'name': category.name,
-            'slug': category.slug,
-            'description': category.description,
-            'tips': serializer.data,
+            'categories': CategorySerializer(categories, many=True).data,
+            'latest': tip_list_rows(Tip.objects.order_by('-created_at', '-id')[:size]),
+            'top': tip_list_rows(
+                Tip.objects.order_by('-success_rate', '-vote_count', '-id')[:size]
+            ),
+            'trending': [trending[tip_id] for tip_id in trending_ids if tip_id in trending],
         })
 
 
-class AffiliateProductList(generics.ListAPIView):
-    """List all active affiliate products"""
+class LeaderboardView(CachedResponseMixin, SparseFieldsMixin, generics.ListAPIView):
+    """
+    Best tips for a metric (success_rate, votes or trending), site-wide or
+    for ?category=<slug>, read from the materialized leaderboards.
+    ?limit= caps the rows (default 20, at most LEADERBOARD_SIZE).
+    """
+    cache_namespaces = ('tips', 'categories')
+    sparse_fields = tuple(TIP_LIST_FIELDS)
+
+    def list(self, request, *args, **kwargs):
+        metric = kwargs['metric']
+        if metric not in leaderboards.METRICS:
+            return Response(
+                {'error': f'Invalid metric; expected one of {", ".join(leaderboards.METRICS)}'},
+                status=400,
+            )
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response({'error': '"limit" must be an integer'}, status=400)
+        limit = max(1, min(limit, settings.LEADERBOARD_SIZE))
+
+        category_id = None
+        if request.query_params.get('category'):
+            category_id = get_object_or_404(
+                Category.objects.only('id'), slug=request.query_params['category']
+            ).id
+
+        ids = leaderboards.top_tip_ids(metric, category_id, limit)
+        fields = self.selected_fields
+        # The id is always read, to put the rows back in board order
+        rows = tip_list_rows(
+            Tip.objects.filter(id__in=ids),
+            None if fields is None else list(dict.fromkeys(['id', *fields])),
+        )
+        by_id = {row['id']: row for row in rows}
+        results = [by_id[tip_id] for tip_id in ids if tip_id in by_id]
+        if fields is not None and 'id' not in fields:
+            for row in results:
+                del row['id']
+        return Response(results)
+
 
-    queryset = AffiliateProduct.objects.filter(is_active=True)
+class AffiliateProductList(CachedResponseMixin, generics.ListAPIView):
+    """List active affiliate products, optionally filtered by ?keyword= and ?network="""
+
+    queryset = AffiliateProduct.objects.filter(is_active=True).order_by('id')
     serializer_class = AffiliateProductSerializer
     permission_classes = []  # Public access
+    cache_namespaces = ('products',)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        network = self.request.query_params.get('network', '').strip()
+        if network:
+            queryset = queryset.filter(network=network)
+
+        keyword = self.request.query_params.get('keyword', '').lower().strip()
+        if keyword:
+            if connection.features.supports_json_field_contains:
+                # jsonb @> containment, served by the GIN index on keywords
+                queryset = queryset.filter(keywords__contains=[keyword])
+            else:
+                queryset = queryset.filter(keyword_entries__keyword=keyword)
+
+        return queryset
+
+
+def affiliate_go(request, product_id):
+    """
+    Redirect to an affiliate product and count the click.
+
+    Served from the in-memory affiliate snapshot; the click goes to the
+    buffered counter and reaches the database in batches.
+    """
+    product = get_affiliate_generator().get_product_by_pk(product_id)
+    if product is None:
+        raise Http404("Affiliate product not found")
+
+    click_buffer.record(product_id, product['platform'])
+
+    response = HttpResponseRedirect(product['url'])
+    response['Cache-Control'] = 'no-store'
+    response['X-Robots-Tag'] = 'noindex, nofollow'
+    return response
+
+
+class AffiliateClickReport(generics.ListAPIView):
+    """
+    Daily click counts per product and platform (staff only).
+
+    Filters: ?product=<id>, ?platform=<network>, ?start=YYYY-MM-DD, ?end=YYYY-MM-DD
+    """
+
+    serializer_class = AffiliateClickDailySerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = AffiliateClickDaily.objects.select_related('product').order_by(
+            '-day', 'product_id'
+        )
+        params = self.request.query_params
+
+        if params.get('product'):
+            try:
+                product_id = int(params['product'])
+            except ValueError:
+                raise ValidationError('product must be an integer')
+            queryset = queryset.filter(product_id=product_id)
+        if params.get('platform'):
+            queryset = queryset.filter(platform=params['platform'])
+        if params.get('start'):
+            queryset = queryset.filter(day__gte=self._date(params['start']))
+        if params.get('end'):
+            queryset = queryset.filter(day__lte=self._date(params['end']))
+
+        return queryset
+
+    @staticmethod
+    def _date(value):
+        try:
+            day = parse_date(value)
+        except ValueError:  # well formed but not a real date, e.g. 2026-02-30
+            day = None
+        if day is None:
+            raise ValidationError('Dates must be YYYY-MM-DD')
+        return day
+
+    def list(self, request, *args, **kwargs):
+        try:
+            return super().list(request, *args, **kwargs)
+        except ValidationError:
+            return Response({'error': 'Invalid filter value'}, status=400)
+
+
+class ModerationQueuePagination(CursorPagination):
+    """
+    Keyset pagination: each page continues from the last row's created_at
+    instead of an OFFSET, and no COUNT(*) is run, so page cost does not grow
+    with queue length.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class ModerationQueue(generics.ListAPIView):
+    """
+    Reviewer queue of moderation flags, newest first (staff only).
+
+    Filters: ?status=, ?type=, ?category=. Served by the
+    (status, created_at, id) index.
+    """
+
+    serializer_class = ModerationQueueSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = ModerationQueuePagination
+
+    def get_queryset(self):
+        queryset = ModerationFlag.objects.select_related('tip', 'reviewed_by').only(
+            'id', 'tip_id', 'tip__title', 'flag_type', 'category', 'confidence',
+            'status', 'reason', 'created_at', 'reviewed_by__username', 'reviewed_at',
+        )
+        return filter_flags(queryset, self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        try:
+            validate_flag_filters(request.query_params)
+        except BulkModerationError as exc:
+            return Response({'error': str(exc)}, status=400)
+        return super().list(request, *args, **kwargs)
 
 
 @api_view(['GET'])
@@ -88,12 +371,8 @@ def search_tips(request):
     if not query:
         return Response({'error': 'Query parameter "q" is required'}, status=400)
 
-    tips = Tip.objects.filter(
-        title__icontains=query
-    ).select_related('category').prefetch_related('votes')[:20]
-
-    serializer = TipListSerializer(tips, many=True)
-    return Response(serializer.data)
+    tips = Tip.objects.filter(title__icontains=query)[:20]
+    return Response(tip_list_rows(tips))
 
 
 # Existing views (keep these)
@@ -172,12 +451,17 @@ def tip_vote(request, tip_id):
         tip=tip, effectiveness=effectiveness, difficulty=difficulty, ip_hash=ip_hash
     )
 
-    votes = tip.votes.all()
-    if votes.exists():
-        tip.effectiveness_avg = sum(v.effectiveness for v in votes) / votes.count()
-        tip.difficulty_avg = sum(v.difficulty for v in votes) / votes.count()
-        tip.success_rate = tip.calculate_success_rate()
-    tip.save()
+    stats = tip.votes.aggregate(
+        effectiveness=Avg("effectiveness"), difficulty=Avg("difficulty"), count=Count("id")
+    )
+    tip.effectiveness_avg = stats["effectiveness"]
+    tip.difficulty_avg = stats["difficulty"]
+    tip.success_rate = tip.calculate_success_rate()
+    tip.vote_count = stats["count"]
+    tip.save(
+        update_fields=["effectiveness_avg", "difficulty_avg", "success_rate", "vote_count"]
+    )
+    leaderboards.record_vote(tip)
 
     return Response(
         {
@@ -194,7 +478,9 @@ def tip_vote(request, tip_id):
 def create_tip(request):
     """
     Create a new tip with rate limiting (5 posts/hour per IP).
-    Performs both keyword and AI moderation before saving.
+    Rejects near-duplicates of existing tips (or answers with the existing
+    tip, per DUPLICATE_TIP_ACTION), then performs keyword and AI moderation
+    before saving.
     """
     if is_ratelimited(request, group="create_tip", increment=True):
             return Response(
@@ -225,23 +511,40 @@ def create_tip(request):
             return Response({"error": "Turnstile token is required"}, status=400)
 
         if turnstile_token:
-            try:
-                import requests  # Lazy import prevents startup failure if dependency is missing.
-            except ImportError:
-                logger.exception("requests dependency is missing while verifying Turnstile.")
+            verification = turnstile.verify(turnstile_token, get_client_ip(request))
+            if not verification["success"]:
+                if verification["unavailable"]:
+                    return Response(
+                        {"error": "CAPTCHA verification unavailable"}, status=503
+                    )
+                return Response({"error": "Invalid Turnstile token"}, status=403)
+
+        # Near-duplicates are turned away before any moderation runs
+        signature = dedup.signature(dedup.tip_text(title, description))
+        duplicate = dedup.find_duplicate(signature)
+        if duplicate is not None:
+            if settings.DUPLICATE_TIP_ACTION == "merge":
                 return Response(
-                    {"error": "CAPTCHA verification unavailable"}, status=503
+                    {
+                        "success": True,
+                        "merged": True,
+                        "tip_id": duplicate.id,
+                        "title": duplicate.title,
+                        "message": "A matching tip already exists",
+                    },
+                    status=200,
                 )
-
-            verify_response = requests.post(
-                'https://challenges.cloudflare.com/turnstile/v0/siteverify',
-                data={
-                    'secret': settings.TURNSTILE_SECRET_KEY,
-                    'response': turnstile_token
-                }
+            return Response(
+                {
+                    "error": "A very similar tip already exists",
+                    "duplicate_of": {
+                        "id": duplicate.id,
+                        "title": duplicate.title,
+                        "slug": duplicate.slug,
+                    },
+                },
+                status=409,
             )
-            if not verify_response.json().get('success'):
-                return Response({"error": "Invalid Turnstile token"}, status=403)
 
         combined_text = f"{title} {description}"
 
@@ -285,6 +588,8 @@ def create_tip(request):
             )
 
         tip = Tip.objects.create(title=title, description=description, category=category)
+        dedup.index_tips([tip])
+        leaderboards.record_tip(tip)
 
         return Response(
             {
@@ -362,3 +667,53 @@ def flag_content(request, tip_id):
     except Exception:
         logger.exception("Unexpected error while flagging content.")
         return Response({"error": "Internal server error"}, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_moderate_flags(request):
+    """
+    Approve or reject many flags in one transaction (staff only).
+
+    Body: {"action": "approve"|"reject", "ids": [...]} or
+    {"action": ..., "filter": {"status": ..., "type": ..., "category": ...}},
+    plus optional "reject_tips": true to remove the tips of approved flags.
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return Response({"error": "Invalid JSON"}, status=400)
+    if not isinstance(data, dict):
+        return Response({"error": "Body must be a JSON object"}, status=400)
+
+    filters = data.get("filter")
+    if filters is not None and not isinstance(filters, dict):
+        return Response({"error": "filter must be an object"}, status=400)
+
+    try:
+        result = bulk_review_flags(
+            data.get("action"),
+            reviewer=request.user,
+            ids=data.get("ids"),
+            filters=filters,
+            reject_tips=bool(data.get("reject_tips")),
+            ip_hash=hash_ip(get_client_ip(request)),
+        )
+    except BulkModerationError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    return Response({"success": True, **result})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def response_cache_stats(request):
+    """Response cache hit/miss counters of the worker serving this request (staff only)."""
+    return Response({'pid': os.getpid(), **response_cache.stats()})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def turnstile_stats(request):
+    """Turnstile verification outcomes and latency of the worker serving this request (staff only)."""
+    return Response({'pid': os.getpid(), **turnstile.stats()})
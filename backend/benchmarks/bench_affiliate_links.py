@@ -0,0 +1,95 @@
+"""
+Benchmark for affiliate keyword linking on long tip descriptions.
+
+Compares the single-pass compiled matcher in AffiliateLinkGenerator against
+the previous per-keyword lower()/replace() loop, using the real
+affiliate_products.json keyword set.
+
+Usage (from the backend directory):
+    python benchmarks/bench_affiliate_links.py
+    python benchmarks/bench_affiliate_links.py --words 20000 --repeat 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+from apps.wiki.utils import AffiliateLinkGenerator  # noqa: E402
+
+FILLER_WORDS = (
+    "wash rinse clean daily water warm towel surface kitchen bathroom "
+    "gently scrub dry skin teeth hands before after every morning night"
+).split()
+
+
+def legacy_convert(generator, text, max_links_per_text=5):
+    """Previous implementation: O(keywords x text) lower()/replace() loop."""
+    result = text
+    links_added = 0
+    sorted_keywords = sorted(
+        generator._keyword_index.keys(), key=lambda x: len(x.split()), reverse=True
+    )
+    for keyword in sorted_keywords:
+        if links_added >= max_links_per_text:
+            break
+        if keyword.lower() in result.lower():
+            result = result.replace(
+                keyword, generator.generate_affiliate_link(keyword), 1
+            )
+            links_added += 1
+    return result
+
+
+def build_description(keywords, words, keyword_ratio, rng):
+    """Build a synthetic description sprinkled with affiliate keywords."""
+    tokens = []
+    for _ in range(words):
+        if rng.random() < keyword_ratio:
+            tokens.append(rng.choice(keywords))
+        else:
+            tokens.append(rng.choice(FILLER_WORDS))
+    return " ".join(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--keyword-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = AffiliateLinkGenerator()
+    keywords = generator.get_all_keywords()
+    rng = random.Random(args.seed)
+
+    print(f"{len(keywords)} keywords, {args.repeat} calls per size")
+    print(f"{'words':>8} {'legacy (us)':>14} {'single-pass (us)':>18} {'speedup':>9}")
+
+    for words in args.words:
+        text = build_description(keywords, words, args.keyword_ratio, rng)
+
+        legacy = timeit.timeit(
+            lambda: legacy_convert(generator, text), number=args.repeat
+        )
+        current = timeit.timeit(
+            lambda: generator.convert_text_with_affiliate_links(text),
+            number=args.repeat,
+        )
+
+        legacy_us = legacy / args.repeat * 1e6
+        current_us = current / args.repeat * 1e6
+        print(
+            f"{words:>8} {legacy_us:>14.1f} {current_us:>18.1f} "
+            f"{legacy_us / current_us:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
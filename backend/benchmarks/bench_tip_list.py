@@ -0,0 +1,99 @@
+"""
+Benchmark for tip list serialization on /api/tips/-style pages.
+
+Compares the values()-based tip_list_rows() fast path against the previous
+path: TipListSerializer over select_related('category') and
+prefetch_related('votes') instances, counting prefetched votes per row.
+Reports CPU time per page (process time, so database waits are excluded)
+and queries per page. Runs against a throwaway test database filled by
+generate_dataset.
+
+Usage (from the backend directory):
+    python benchmarks/bench_tip_list.py
+    python benchmarks/bench_tip_list.py --tips 5000 --page-sizes 20 100 --repeat 50
+"""
+
+import argparse
+import os
+import sys
+import time
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from apps.wiki.models import Tip  # noqa: E402
+from apps.wiki.serializers import TipListSerializer, tip_list_rows  # noqa: E402
+
+
+class LegacyTipListSerializer(TipListSerializer):
+    """TipListSerializer as it was: vote count from prefetched votes."""
+
+    def get_vote_score(self, obj):
+        vote_count = obj.votes.count()
+        return round(obj.effectiveness_avg * vote_count, 1) if vote_count > 0 else 0
+
+
+def legacy_page(size):
+    tips = (
+        Tip.objects.select_related("category")
+        .prefetch_related("votes")
+        .order_by("-created_at")[:size]
+    )
+    return LegacyTipListSerializer(tips, many=True).data
+
+
+def fast_page(size):
+    return tip_list_rows(Tip.objects.order_by("-created_at")[:size])
+
+
+def measure(func, size, repeat):
+    """CPU milliseconds and queries per call."""
+    func(size)  # warm up
+    with CaptureQueriesContext(connection) as queries:
+        func(size)
+    started = time.process_time()
+    for _ in range(repeat):
+        func(size)
+    return (time.process_time() - started) / repeat * 1e3, len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tips", type=int, default=2000)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        call_command("generate_dataset", tips=args.tips, seed=args.seed, stdout=StringIO())
+
+        print(f"{args.tips} tips, {args.repeat} pages per size")
+        print(
+            f"{'rows':>6} {'legacy (ms)':>12} {'queries':>8} "
+            f"{'fast (ms)':>10} {'queries':>8} {'speedup':>8}"
+        )
+        for size in args.page_sizes:
+            legacy_ms, legacy_queries = measure(legacy_page, size, args.repeat)
+            fast_ms, fast_queries = measure(fast_page, size, args.repeat)
+            print(
+                f"{size:>6} {legacy_ms:>12.2f} {legacy_queries:>8} "
+                f"{fast_ms:>10.2f} {fast_queries:>8} {legacy_ms / fast_ms:>7.1f}x"
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
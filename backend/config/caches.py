@@ -0,0 +1,70 @@
+"""
+Build Django CACHES entries from cache URLs.
+
+One URL selects the backend, like DATABASE_URL does for the database:
+
+    redis://host:6379/0          RedisCache (rediss:// for TLS)
+    memcached://host:11211       PyMemcacheCache (comma-separate several hosts)
+    file:///var/tmp/wiki-cache   FileBasedCache, one subdirectory per alias
+    db://wiki_cache              DatabaseCache, one table per alias
+                                 (python manage.py createcachetable)
+    locmem://                    LocMemCache, private to each worker process
+
+Each alias gets its own key prefix and, on the local backends, its own
+storage, so culling one alias never evicts another's keys.
+"""
+
+from urllib.parse import urlsplit
+
+SCHEMES = ("redis", "rediss", "memcached", "file", "db", "locmem")
+
+
+def is_shared(url):
+    """Whether every worker process sees the same entries through url."""
+    return urlsplit(url).scheme != "locmem"
+
+
+def cache_config(url, alias, timeout, max_entries, cull_frequency=3):
+    """
+    Return the CACHES entry for alias.
+
+    Args:
+        url: Cache URL in one of the forms above
+        alias: Cache alias; used as key prefix, file subdirectory, table
+            suffix or LocMem name
+        timeout: Default timeout in seconds (None caches forever)
+        max_entries: Entries kept before culling (local backends only;
+            Redis and Memcached evict by their own memory policy)
+        cull_frequency: 1/cull_frequency of entries is removed on a cull
+
+    Raises:
+        ValueError: On an unsupported scheme
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme
+    config = {"TIMEOUT": timeout, "KEY_PREFIX": alias}
+    cull = {"MAX_ENTRIES": max_entries, "CULL_FREQUENCY": cull_frequency}
+
+    if scheme in ("redis", "rediss"):
+        config["BACKEND"] = "django.core.cache.backends.redis.RedisCache"
+        config["LOCATION"] = url
+    elif scheme == "memcached":
+        config["BACKEND"] = "django.core.cache.backends.memcached.PyMemcacheCache"
+        config["LOCATION"] = parts.netloc.split(",")
+    elif scheme == "file":
+        config["BACKEND"] = "django.core.cache.backends.filebased.FileBasedCache"
+        config["LOCATION"] = f"{parts.path.rstrip('/')}/{alias}"
+        config["OPTIONS"] = cull
+    elif scheme == "db":
+        config["BACKEND"] = "django.core.cache.backends.db.DatabaseCache"
+        config["LOCATION"] = f"{parts.netloc or 'wiki_cache'}_{alias}"
+        config["OPTIONS"] = cull
+    elif scheme == "locmem":
+        config["BACKEND"] = "django.core.cache.backends.locmem.LocMemCache"
+        config["LOCATION"] = alias
+        config["OPTIONS"] = cull
+    else:
+        raise ValueError(
+            f"Unsupported cache URL scheme {scheme!r}; expected one of {', '.join(SCHEMES)}"
+        )
+    return config
@@ -14,6 +14,8 @@ import os
 import dj_database_url
 from pathlib import Path
 
+from config.caches import cache_config, is_shared
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -55,6 +57,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Read-replica pinning; first so session and auth queries are routed too
+    "apps.wiki.middleware.PrimaryPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware - must be before CommonMiddleware
@@ -98,6 +102,81 @@ DATABASES = {
     )
 }
 
+# Optional read replicas, as comma-separated database URLs. ORM reads are
+# routed to a replica and writes to the primary; see apps/wiki/routers.py.
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+DATABASE_REPLICAS = []
+for index, url in enumerate(DATABASE_REPLICA_URLS):
+    alias = f"replica_{index}"
+    DATABASES[alias] = dj_database_url.parse(
+        url, conn_max_age=600, conn_health_checks=True
+    )
+    # Tests run replicas against the primary's test database
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["apps.wiki.routers.PrimaryReplicaRouter"]
+
+# Seconds a client's reads stay on the primary after it writes
+DATABASE_PIN_SECONDS = int(os.environ.get("DATABASE_PIN_SECONDS", 5))
+
+
+# Caches
+# CACHE_URL selects the backend (see config/caches.py): redis://,
+# memcached://, file:// or db:// (run createcachetable). The default is a
+# file cache under var/cache, which the gunicorn workers of one host share;
+# use redis://, memcached:// or db:// when web processes run on several hosts.
+# locmem:// is private to each process, so cache hits are per worker; only
+# use it with one worker. Rate limits stay on the shared default even then,
+# since a per-worker count would let each client through once per worker.
+# CACHE_URL_<ALIAS> (e.g. CACHE_URL_RATELIMIT) moves one alias elsewhere.
+SHARED_CACHE_URL = f"file://{BASE_DIR / 'var' / 'cache'}"
+CACHE_URL = os.environ.get("CACHE_URL", SHARED_CACHE_URL)
+
+
+def _cache_url(alias, shared=False):
+    url = os.environ.get(f"CACHE_URL_{alias.upper()}")
+    if url:
+        return url
+    if shared and not is_shared(CACHE_URL):
+        return SHARED_CACHE_URL
+    return CACHE_URL
+
+
+def _cache(alias, timeout, max_entries, cull_frequency=3, shared=False):
+    url = _cache_url(alias, shared)
+    return cache_config(url, alias, timeout, max_entries, cull_frequency)
+
+
+CACHES = {
+    # Sitemaps, read-replica pins, IP hash timestamps
+    "default": _cache("default", 300, 10000),
+    # Rate limit counters; culling resets limits, so keep many and cull little
+    "ratelimit": _cache("ratelimit", 86400, 100000, cull_frequency=10, shared=True),
+    # Rendered API responses; short-lived and cheap to rebuild
+    "responses": _cache("responses", 300, 5000),
+    # AI moderation verdicts by content hash; the classifier is slow
+    "moderation": _cache("moderation", 7 * 86400, 20000),
+}
+
+# Two-tier API response cache (apps/wiki/response_cache.py): an in-process
+# LRU in front of the "responses" alias. Local entries live briefly so a
+# version bump from another worker is seen quickly. Off by default when the
+# alias is locmem://, where other workers would never see a bump.
+RESPONSE_CACHE_ENABLED = os.environ.get(
+    "RESPONSE_CACHE_ENABLED", str(is_shared(_cache_url("responses")))
+) == "True"
+RESPONSE_CACHE_LOCAL_ENTRIES = 512
+RESPONSE_CACHE_LOCAL_TIMEOUT = 30  # seconds
+# A rebuild holds its single-flight lock at most this long (seconds) ...
+RESPONSE_CACHE_LOCK_TIMEOUT = 10
+# ... and other requests for the key wait this long before building too
+RESPONSE_CACHE_LOCK_WAIT = 2.0
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -177,10 +256,77 @@ if not DEBUG:
 
 # Turnstile configuration
 TURNSTILE_SECRET_KEY = os.environ.get("TURNSTILE_SECRET_KEY", "")
+# Verification goes through a pooled keep-alive session (apps/wiki/turnstile.py).
+# The URL can point at a local stand-in (backend/tests/turnstile_server.py).
+TURNSTILE_VERIFY_URL = os.environ.get(
+    "TURNSTILE_VERIFY_URL", "https://challenges.cloudflare.com/turnstile/v0/siteverify"
+)
+TURNSTILE_CONNECT_TIMEOUT = 1.0  # seconds
+TURNSTILE_READ_TIMEOUT = 3.0  # seconds
+TURNSTILE_MAX_RETRIES = 1
+TURNSTILE_RETRY_BACKOFF = 0.1  # seconds, times the attempt number
+TURNSTILE_POOL_SIZE = 10  # kept-alive connections per worker process
+# Whether submissions are accepted while siteverify is unreachable
+TURNSTILE_FAIL_OPEN = os.environ.get("TURNSTILE_FAIL_OPEN", "False") == "True"
+
+# Sitemap chunks are cached until a tip in their id range changes; the
+# timeout only bounds staleness after bulk writes that bypass Tip.save().
+SITEMAP_CACHE_TIMEOUT = 6 * 3600
+
+# Affiliate click tracking
+# When set (e.g. "https://api.example.com"), rendered affiliate links point at
+# the /api/go/<id>/ counting redirect instead of the merchant URL.
+AFFILIATE_TRACKING_BASE_URL = os.environ.get("AFFILIATE_TRACKING_BASE_URL", "")
+AFFILIATE_CLICK_FLUSH_INTERVAL = 30  # seconds
+AFFILIATE_CLICK_FLUSH_THRESHOLD = 500  # buffered clicks
 
 # Content Moderation Settings
 IP_HASH_RETENTION_DAYS = 7
 
+# ModerationLog retention, applied by rotate_moderation_logs. On PostgreSQL
+# the log is partitioned by month and whole months are dropped.
+MODERATION_LOG_RETENTION_MONTHS = 12
+
+# Where import_wiki keeps its id map journals unless --idmap-dir is given;
+# the export directory itself is never written to
+IMPORT_WIKI_STATE_DIR = os.environ.get(
+    "IMPORT_WIKI_STATE_DIR", str(BASE_DIR / "var" / "import_wiki")
+)
+MODERATION_LOG_PARTITIONS_AHEAD = 3
+
+# Most flags one bulk approve/reject may touch; larger filter matches are
+# refused rather than silently truncated.
+MODERATION_BULK_MAX_FLAGS = 5000
+
+# Most ids one /api/tips/batch/ request may ask for
+TIP_BATCH_MAX_IDS = 100
+
+# Related tips stored per tip by build_related_tips, and the lowest TF-IDF
+# cosine similarity that still counts as related
+RELATED_TIPS_COUNT = 5
+RELATED_TIPS_MIN_SCORE = 0.05
+
+# Near-duplicate submissions (apps/wiki/dedup.py): estimated Jaccard
+# similarity of word shingles at or above which a new tip is a duplicate,
+# and what create_tip does with it: "reject" (409) or "merge" (answer with
+# the existing tip instead of creating one)
+DUPLICATE_TIP_THRESHOLD = 0.8
+DUPLICATE_TIP_ACTION = os.environ.get("DUPLICATE_TIP_ACTION", "reject")
+# Most LSH candidates checked per lookup
+DUPLICATE_MAX_CANDIDATES = 20
+
+# Tips per /api/home/ section
+HOME_SECTION_SIZE = 8
+
+# Trending tips are ranked by the votes cast in the last TRENDING_DAYS
+TRENDING_DAYS = 7
+
+# Tips kept on each materialized leaderboard (see apps/wiki/leaderboards.py).
+# Trending boards are rebuilt on read once older than the max age (seconds),
+# since votes leave the trending window without any write.
+LEADERBOARD_SIZE = 50
+LEADERBOARD_TRENDING_MAX_AGE = 3600
+
 # Hugging Face AI Moderation
 HUGGINGFACE_ZERO_SHOT_MODEL = os.environ.get(
     "HUGGINGFACE_ZERO_SHOT_MODEL", "facebook/bart-large-mnli"
@@ -197,6 +343,6 @@ MODERATION_CATEGORIES = [
 ]
 
 # Rate Limiting Settings
-RATELIMIT_USE_CACHE = "default"
+RATELIMIT_USE_CACHE = "ratelimit"
 RATELIMIT_VIEW = "apps.wiki.utils.rate_limited"
 RATELIMIT_ENABLE = True
@@ -16,7 +16,6 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
@@ -24,6 +23,7 @@ from django.http import HttpResponse
 from django.conf.urls.static import serve
 
 from apps.wiki.sitemaps import TipSitemap, CategorySitemap, StaticViewSitemap
+from apps.wiki.sitemaps import index as sitemap_index, sitemap
 
 SITEMAPS = {
     "tips": TipSitemap,
@@ -57,6 +57,12 @@ urlpatterns = [
     path("robots.txt", robots_txt),
     path(
         "sitemap.xml",
+        sitemap_index,
+        {"sitemaps": SITEMAPS},
+        name="django.contrib.sitemaps.views.index",
+    ),
+    path(
+        "sitemap-<section>.xml",
         sitemap,
         {"sitemaps": SITEMAPS},
         name="django.contrib.sitemaps.views.sitemap",
@@ -0,0 +1,26 @@
+"""
+Shared pytest fixtures for the wiki test suite.
+"""
+
+import pytest
+from django.core.cache import caches
+
+from apps.wiki import response_cache
+from apps.wiki.utils import reset_affiliate_generator
+
+
+@pytest.fixture(autouse=True)
+def fresh_affiliate_generator():
+    """Keep the global affiliate snapshot from leaking between tests."""
+    reset_affiliate_generator()
+    yield
+    reset_affiliate_generator()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty caches on every alias."""
+    for cache in caches.all():
+        cache.clear()
+    response_cache.reset()
+    yield
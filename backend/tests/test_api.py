@@ -4,11 +4,31 @@ Tests all REST API views including tips, categories, voting, and search.
 """
 
 import json
+from datetime import timedelta
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils import timezone
+from django.db import connection
+from django.db.models import QuerySet
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
-from apps.wiki.models import Category, Tip, Vote, ModerationFlag, BlacklistTerm
+from apps.wiki.models import (
+    AffiliateClickDaily,
+    AffiliateProduct,
+    BlacklistTerm,
+    Category,
+    ModerationFlag,
+    ModerationLog,
+    Tip,
+    Vote,
+)
+from apps.wiki import response_cache
+from apps.wiki.moderation import bulk_review_flags
+from apps.wiki.serializers import TipListSerializer, tip_list_rows
 
 
 @pytest.mark.django_db
@@ -100,6 +120,75 @@ class TestTipListView:
         assert data['results'][0]['title'] == 'Second Tip'
         assert data['results'][1]['title'] == 'First Tip'
 
+    def test_fast_rows_match_serializer(self, client):
+        """Test the values() fast path returns exactly what TipListSerializer does."""
+        call_command('generate_dataset', tips=60, flag_rate=0, stdout=StringIO())
+
+        tips = Tip.objects.order_by('-created_at')
+        expected = TipListSerializer(tips.select_related('category'), many=True).data
+
+        expected = [dict(row) for row in expected]
+        assert tip_list_rows(tips) == expected
+        assert client.get('/api/tips/').json()['results'] == expected[:20]
+
+    def test_list_query_count_is_constant(self, client, django_assert_max_num_queries):
+        """Test a page costs a count and one joined query, whatever the vote count."""
+        call_command('generate_dataset', tips=30, flag_rate=0, stdout=StringIO())
+
+        with django_assert_max_num_queries(2):
+            client.get('/api/tips/')
+
+    def test_vote_updates_vote_count(self, client):
+        """Test voting keeps the denormalized vote_count in step."""
+        category = Category.objects.create(name='Test Category', slug='test-category')
+        tip = Tip.objects.create(title='Tip', description='Test', category=category)
+        for i in range(2):
+            client.post(
+                f'/api/tips/{tip.id}/vote/',
+                data=json.dumps({'effectiveness': 4, 'difficulty': 2}),
+                content_type='application/json',
+                REMOTE_ADDR=f'10.0.0.{i + 1}',
+            )
+
+        tip.refresh_from_db()
+        assert tip.vote_count == 2 == tip.votes.count()
+        assert client.get('/api/tips/').json()['results'][0]['vote_score'] == 8.0
+
+    def test_sparse_fields(self, client):
+        """Test ?fields= narrows rows and reads only the columns behind them."""
+        call_command('generate_dataset', tips=5, flag_rate=0, stdout=StringIO())
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/tips/?fields=success_rate,id,title,slug')
+        assert response.status_code == 200
+        rows = response.json()['results']
+        assert list(rows[0]) == ['id', 'title', 'slug', 'success_rate']
+        select = queries.captured_queries[-1]['sql']
+        assert 'wiki_category' not in select
+        assert '"description"' not in select and '"created_at"' not in select.split('ORDER BY')[0]
+
+        full = client.get('/api/tips/').json()['results']
+        assert rows == [{k: row[k] for k in rows[0]} for row in full]
+
+    def test_sparse_exclude(self, client):
+        """Test ?exclude= drops fields, and vote_score still gets its columns."""
+        call_command('generate_dataset', tips=5, flag_rate=0, stdout=StringIO())
+
+        rows = client.get('/api/tips/?exclude=category_name,created_at').json()['results']
+        full = client.get('/api/tips/').json()['results']
+        assert rows == [
+            {k: v for k, v in row.items() if k not in ('category_name', 'created_at')}
+            for row in full
+        ]
+
+    def test_sparse_fields_invalid(self, client):
+        """Test unknown fields, or fields with exclude, are rejected."""
+        response = client.get('/api/tips/?fields=id,secret')
+        assert response.status_code == 400
+        assert 'secret' in response.json()['error']
+        assert client.get('/api/tips/?fields=id&exclude=title').status_code == 400
+        assert client.get('/api/tips/?fields=,').status_code == 400
+
 
 @pytest.mark.django_db
 class TestTipDetailView:
@@ -144,6 +233,8 @@ class TestTipDetailView:
         
         Vote.objects.create(tip=tip, effectiveness=5, difficulty=1, ip_hash='hash1')
         Vote.objects.create(tip=tip, effectiveness=4, difficulty=2, ip_hash='hash2')
+        # vote_count is the stored counter tip_vote maintains
+        Tip.objects.filter(id=tip.id).update(vote_count=2)
         
         response = client.get(f'/api/tips/{tip.id}/')
         assert response.status_code == 200
@@ -152,6 +243,173 @@ class TestTipDetailView:
         assert len(data['votes']) == 2
         assert data['vote_count'] == 2
 
+    def test_sparse_fields_skip_relations(self, client, django_assert_num_queries):
+        """Test unrequested columns, the category join and votes are never fetched."""
+        category = Category.objects.create(name='Test Category', slug='test-category')
+        tip = Tip.objects.create(
+            title='Test Tip', description='Secret', category=category,
+            effectiveness_avg=5.0, vote_count=1,
+        )
+        Vote.objects.create(tip=tip, effectiveness=5, difficulty=1, ip_hash='hash1')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'/api/tips/{tip.id}/?fields=id,title,vote_score')
+        assert response.json() == {'id': tip.id, 'title': 'Test Tip', 'vote_score': 5.0}
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        assert 'wiki_category' not in sql
+        assert 'wiki_vote' not in sql
+        assert 'GROUP BY' not in sql
+        assert '"description"' not in sql
+
+        with django_assert_num_queries(3):
+            # Tip with the category join, its tips_count, and the votes
+            data = client.get(f'/api/tips/{tip.id}/?fields=category,votes').json()
+        assert list(data) == ['category', 'votes']
+        assert data['category']['tips_count'] == 1
+        assert len(data['votes']) == 1
+
+    def test_related_tips(self, client, django_assert_max_num_queries):
+        """Test related tips come from the precomputed list in one lookup."""
+        category = Category.objects.create(name='Test Category', slug='test-category')
+        others = [
+            Tip.objects.create(title=f'Other {i}', description='Test', category=category)
+            for i in range(2)
+        ]
+        tip = Tip.objects.create(
+            title='Test Tip', description='Test', category=category,
+            related=[[others[1].id, 0.8], [99999, 0.5], [others[0].id, 0.3]],
+        )
+
+        with django_assert_max_num_queries(2):
+            data = client.get(f'/api/tips/{tip.id}/?fields=id,related').json()
+        assert data['related'] == [
+            {'id': others[1].id, 'title': 'Other 1', 'slug': 'other-1'},
+            {'id': others[0].id, 'title': 'Other 0', 'slug': 'other-0'},
+        ]
+        assert client.get(f'/api/tips/{others[0].id}/').json()['related'] == []
+
+    def test_sparse_fields_invalid(self, client):
+        """Test an unknown field is a 400 rather than being ignored."""
+        category = Category.objects.create(name='Test Category', slug='test-category')
+        tip = Tip.objects.create(title='Test Tip', description='Test', category=category)
+
+        response = client.get(f'/api/tips/{tip.id}/?exclude=ip_hash')
+        assert response.status_code == 400
+        assert 'ip_hash' in response.json()['error']
+
+
+@pytest.mark.django_db
+class TestTipBatchView:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for the /api/tips/batch/ endpoint."""
+
+    @pytest.fixture
+    def tips(self):
+        kitchen = Category.objects.create(name='Kitchen', slug='kitchen')
+        bathroom = Category.objects.create(name='Bathroom', slug='bathroom')
+        tips = [
+            Tip.objects.create(title=f'Tip {i}', description='Desc', category=category)
+            for i, category in enumerate([kitchen, kitchen, bathroom])
+        ]
+        for i, tip in enumerate(tips):
+            for j in range(i):
+                Vote.objects.create(tip=tip, effectiveness=4, difficulty=2, ip_hash=f'h{i}{j}')
+        return tips
+
+    def test_matches_detail_in_requested_order(self, client, tips):
+        """Test each result equals the detail response, in the order asked for."""
+        ids = [tips[2].id, tips[0].id, tips[1].id]
+        data = client.get(f'/api/tips/batch/?ids={",".join(map(str, ids))}').json()
+
+        assert data['missing'] == []
+        assert data['results'] == [client.get(f'/api/tips/{i}/').json() for i in ids]
+
+    def test_query_count_is_constant(self, client, tips, django_assert_num_queries):
+        """Test tips, category counts and votes cost one query each."""
+        ids = ','.join(str(tip.id) for tip in tips)
+        with django_assert_num_queries(3):
+            client.get(f'/api/tips/batch/?ids={ids}')
+        with django_assert_num_queries(1):
+            client.get(f'/api/tips/batch/?ids={ids}&fields=id,title,vote_count')
+
+    def test_reports_missing_ids(self, client, tips):
+        """Test unknown ids are reported and duplicates collapse."""
+        data = client.get(f'/api/tips/batch/?ids=99999,{tips[0].id},{tips[0].id}').json()
+
+        assert [tip['id'] for tip in data['results']] == [tips[0].id]
+        assert data['missing'] == [99999]
+
+    def test_invalid_ids(self, client, settings):
+        """Test missing, malformed and oversized id lists are rejected."""
+        settings.TIP_BATCH_MAX_IDS = 3
+        assert client.get('/api/tips/batch/').status_code == 400
+        assert client.get('/api/tips/batch/?ids=1,two').status_code == 400
+        response = client.get('/api/tips/batch/?ids=1,2,3,4')
+        assert response.status_code == 400
+        assert 'At most 3' in response.json()['error']
+
+
+@pytest.mark.django_db
+class TestHomeView:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+        settings.HOME_SECTION_SIZE = 2
+
+    """Tests for the /api/home/ aggregate endpoint."""
+
+    @pytest.fixture
+    def tips(self):
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        Category.objects.create(name='Bathroom', slug='bathroom')
+        return [
+            Tip.objects.create(
+                title=f'Tip {i}', description='Desc', category=category, success_rate=rate
+            )
+            for i, rate in enumerate([50.0, 150.0, 100.0])
+        ]
+
+    def test_sections(self, client, tips):
+        """Test categories and each tip section are built as specified."""
+        Vote.objects.create(tip=tips[0], effectiveness=4, difficulty=2, ip_hash='a')
+        Vote.objects.create(tip=tips[0], effectiveness=4, difficulty=2, ip_hash='b')
+        old = Vote.objects.create(tip=tips[1], effectiveness=4, difficulty=2, ip_hash='c')
+        Vote.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=30))
+        Vote.objects.create(tip=tips[2], effectiveness=4, difficulty=2, ip_hash='d')
+
+        data = client.get('/api/home/').json()
+
+        assert [(c['name'], c['tips_count']) for c in data['categories']] == [
+            ('Bathroom', 0), ('Kitchen', 3)
+        ]
+        assert [tip['title'] for tip in data['latest']] == ['Tip 2', 'Tip 1']
+        assert [tip['title'] for tip in data['top']] == ['Tip 1', 'Tip 2']
+        assert [tip['title'] for tip in data['trending']] == ['Tip 0', 'Tip 2']
+        assert data['latest'][0] == client.get('/api/tips/').json()['results'][0]
+
+    def test_bounded_queries_and_cached(self, client, tips, django_assert_max_num_queries):
+        """Test one cold build runs a fixed handful of queries and is then cached."""
+        with django_assert_max_num_queries(5):
+            assert client.get('/api/home/')['X-Cache'] == 'miss'
+        with django_assert_max_num_queries(0):
+            assert client.get('/api/home/')['X-Cache'] == 'local'
+
+    def test_vote_invalidates(self, client, tips):
+        """Test a vote bumps the version key, so the next response is rebuilt."""
+        assert client.get('/api/home/').json()['trending'] == []
+
+        client.post(
+            f'/api/tips/{tips[0].id}/vote/',
+            data=json.dumps({'effectiveness': 4, 'difficulty': 2}),
+            content_type='application/json',
+        )
+        response = client.get('/api/home/')
+        assert response['X-Cache'] == 'miss'
+        assert [tip['id'] for tip in response.json()['trending']] == [tips[0].id]
+
 
 @pytest.mark.django_db
 class TestCategoryListView:
@@ -190,6 +448,26 @@ class TestCategoryListView:
         data = response.json()
         assert data[0]['tips_count'] == 2
 
+    def test_tips_count_in_one_query(self, client, django_assert_num_queries):
+        """Test tips_count is counted in the category query, not per row."""
+        for name in ('Kitchen', 'Bathroom', 'Laundry'):
+            category = Category.objects.create(name=name, slug=name.lower())
+            Tip.objects.create(title=f'{name} tip', description='Desc', category=category)
+
+        with django_assert_num_queries(1):
+            data = client.get('/api/categories/').json()
+        assert [row['tips_count'] for row in data] == [1, 1, 1]
+
+    def test_sparse_fields(self, client):
+        """Test ?fields= without tips_count skips the count entirely."""
+        Category.objects.create(name='Kitchen', slug='kitchen', description='Kitchen tips')
+
+        with CaptureQueriesContext(connection) as queries:
+            data = client.get('/api/categories/?fields=slug,name').json()
+        assert data == [{'name': 'Kitchen', 'slug': 'kitchen'}]
+        sql = queries.captured_queries[-1]['sql']
+        assert 'COUNT' not in sql.upper() and '"description"' not in sql
+
 
 @pytest.mark.django_db
 class TestCategoryDetailView:
@@ -222,7 +500,156 @@ class TestCategoryDetailView:
         response = client.get('/api/categories/non-existent/')
         assert response.status_code == 404
 
+    def test_sparse_fields(self, client, django_assert_num_queries):
+        """Test leaving out tips skips the tip query."""
+        category = Category.objects.create(name='Test Category', slug='test-category')
+        Tip.objects.create(title='Tip 1', description='Desc 1', category=category)
+
+        with django_assert_num_queries(1):
+            data = client.get('/api/categories/test-category/?exclude=tips,description').json()
+        assert data == {'id': category.id, 'name': 'Test Category', 'slug': 'test-category'}
+
+        data = client.get('/api/categories/test-category/?fields=tips').json()
+        assert list(data) == ['tips'] and len(data['tips']) == 1
+
+
+
+
+@pytest.mark.django_db
+class TestAffiliateProductList:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for the AffiliateProductList API endpoint."""
+
+    @pytest.fixture
+    def products(self):
+        return [
+            AffiliateProduct.objects.create(
+                name='Floss', affiliate_url='https://amazon.com/dp/1',
+                network='amazon', keywords=['dental floss', 'floss pick']
+            ),
+            AffiliateProduct.objects.create(
+                name='Serum', affiliate_url='https://iherb.com/p/2',
+                network='iherb', keywords=['face serum']
+            ),
+            AffiliateProduct.objects.create(
+                name='Old Floss', affiliate_url='https://amazon.com/dp/3',
+                network='amazon', keywords=['dental floss'], is_active=False
+            ),
+        ]
+
+    def test_list_active_products(self, client, products):
+        """Test only active products are listed."""
+        response = client.get('/api/products/')
+        assert response.status_code == 200
+        assert [p['name'] for p in response.json()] == ['Floss', 'Serum']
+
+    def test_filter_by_keyword(self, client, products):
+        """Test ?keyword= matches normalized keywords exactly."""
+        response = client.get('/api/products/?keyword=Dental%20Floss')
+        assert [p['name'] for p in response.json()] == ['Floss']
+
+        response = client.get('/api/products/?keyword=floss')
+        assert response.json() == []
 
+    def test_filter_by_network(self, client, products):
+        """Test ?network= narrows products to one network."""
+        response = client.get('/api/products/?network=iherb')
+        assert [p['name'] for p in response.json()] == ['Serum']
+
+        response = client.get('/api/products/?network=iherb&keyword=dental%20floss')
+        assert response.json() == []
+
+
+@pytest.mark.django_db
+class TestAffiliateGo:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for the affiliate click-through redirect and click report."""
+
+    @pytest.fixture
+    def buffer(self):
+        from apps.wiki.clicks import click_buffer
+        click_buffer.flush_threshold = 10**6
+        click_buffer.flush()
+        yield click_buffer
+        click_buffer.flush()
+
+    @pytest.fixture
+    def product(self):
+        return AffiliateProduct.objects.create(
+            name='Floss', affiliate_url='https://amazon.com/dp/1',
+            network='amazon', keywords=['dental floss']
+        )
+
+    def test_redirects_and_buffers_click(self, client, buffer, product):
+        """Test the redirect is served without writing a click row."""
+        response = client.get(f'/api/go/{product.id}/')
+
+        assert response.status_code == 302
+        assert response['Location'] == 'https://amazon.com/dp/1'
+        assert AffiliateClickDaily.objects.count() == 0
+        assert sum(buffer.pending().values()) == 1
+
+    def test_flush_aggregates_clicks(self, client, buffer, product):
+        """Test repeated clicks collapse into one daily rollup row."""
+        for _ in range(3):
+            client.get(f'/api/go/{product.id}/')
+        assert buffer.flush() == 3
+
+        client.get(f'/api/go/{product.id}/')
+        assert buffer.flush() == 1
+
+        rollup = AffiliateClickDaily.objects.get()
+        assert rollup.product == product
+        assert rollup.platform == 'amazon'
+        assert rollup.clicks == 4
+
+    def test_flush_after_threshold(self, client, buffer, product):
+        """Test the buffer flushes itself once the request has finished."""
+        buffer.flush_threshold = 2
+        client.get(f'/api/go/{product.id}/')
+        assert AffiliateClickDaily.objects.count() == 0
+
+        client.get(f'/api/go/{product.id}/')
+        assert AffiliateClickDaily.objects.get().clicks == 2
+
+    def test_unknown_or_inactive_product(self, client, buffer, product):
+        """Test unknown and inactive products return 404."""
+        assert client.get('/api/go/99999/').status_code == 404
+
+        product.is_active = False
+        product.save()
+        assert client.get(f'/api/go/{product.id}/').status_code == 404
+
+    def test_click_report_requires_staff(self, client, product):
+        """Test the click report is not public."""
+        response = client.get('/api/products/clicks/')
+        assert response.status_code in (401, 403)
+
+    def test_click_report(self, client, buffer, product):
+        """Test the report lists clicks per product, platform and day."""
+        client.get(f'/api/go/{product.id}/')
+        buffer.flush()
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        client.force_login(admin)
+
+        response = client.get('/api/products/clicks/?platform=amazon')
+        assert response.status_code == 200
+        rows = response.json()
+        assert len(rows) == 1
+        assert rows[0]['product_id'] == product.id
+        assert rows[0]['product_name'] == 'Floss'
+        assert rows[0]['clicks'] == 1
+
+        for query in ('start=not-a-date', 'end=2026-02-30', 'product=abc'):
+            response = client.get(f'/api/products/clicks/?{query}')
+            assert response.status_code == 400, query
+            assert 'error' in response.json()
 
 
 @pytest.mark.django_db
@@ -512,3 +939,244 @@ class TestFlagContent:
         )
         
         assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestModerationQueue:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for the reviewer moderation queue endpoint."""
+
+    @pytest.fixture
+    def admin_client(self, client):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        client.force_login(admin)
+        return client
+
+    @pytest.fixture
+    def flags(self):
+        category = Category.objects.create(name='Test', slug='test')
+        tip = Tip.objects.create(title='Flagged Tip', description='Test', category=category)
+        return [
+            ModerationFlag.objects.create(
+                tip=tip,
+                flag_type='keyword' if i % 2 else 'manual',
+                category='spam' if i % 3 else 'offensive',
+                status='pending' if i % 4 else 'approved',
+                matched_terms=['term'],
+                ip_hash='hash',
+            )
+            for i in range(12)
+        ]
+
+    def test_requires_staff(self, client):
+        """Test anonymous users cannot read the queue."""
+        response = client.get('/api/moderation/flags/')
+        assert response.status_code in (401, 403)
+
+    def test_compact_rows(self, admin_client, flags):
+        """Test rows carry the tip title and omit matched terms and IP hashes."""
+        response = admin_client.get('/api/moderation/flags/')
+
+        assert response.status_code == 200
+        row = response.json()['results'][0]
+        assert row['tip_title'] == 'Flagged Tip'
+        assert row['tip_id'] == flags[0].tip_id
+        assert 'matched_terms' not in row
+        assert 'ip_hash' not in row
+
+    def test_filters(self, admin_client, flags):
+        """Test status, type and category filters combine."""
+        response = admin_client.get(
+            '/api/moderation/flags/?status=pending&type=keyword&category=spam'
+        )
+
+        expected = {
+            f.id for f in flags
+            if f.status == 'pending' and f.flag_type == 'keyword' and f.category == 'spam'
+        }
+        assert {row['id'] for row in response.json()['results']} == expected
+
+    def test_invalid_status(self, admin_client):
+        """Test an unknown status is rejected."""
+        response = admin_client.get('/api/moderation/flags/?status=bogus')
+
+        assert response.status_code == 400
+        assert 'status' in response.json()['error']
+
+    def test_cursor_pages_cover_queue_once(self, admin_client, flags):
+        """Test following next links returns every flag exactly once, newest first."""
+        seen = []
+        url = '/api/moderation/flags/?page_size=5'
+        while url:
+            data = admin_client.get(url).json()
+            assert 'count' not in data
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+
+        assert sorted(seen) == sorted(f.id for f in flags)
+        assert seen == sorted(seen, reverse=True)
+
+    def test_query_count_is_constant(self, admin_client, flags, django_assert_max_num_queries):
+        """Test tips and reviewers are joined rather than fetched per row."""
+        with django_assert_max_num_queries(4):
+            admin_client.get('/api/moderation/flags/')
+
+
+@pytest.mark.django_db
+class TestBulkModerateFlags:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for the bulk flag review endpoint."""
+
+    @pytest.fixture
+    def admin(self):
+        return User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    @pytest.fixture
+    def admin_client(self, client, admin):
+        client.force_login(admin)
+        return client
+
+    @pytest.fixture
+    def tip(self):
+        category = Category.objects.create(name='Test', slug='test')
+        return Tip.objects.create(title='Flagged Tip', description='Test', category=category)
+
+    def _flags(self, tip, count, **kwargs):
+        return [
+            ModerationFlag.objects.create(
+                tip=tip, flag_type='manual', category='spam', ip_hash='hash', **kwargs
+            )
+            for _ in range(count)
+        ]
+
+    def _post(self, client, data):
+        return client.post(
+            '/api/moderation/flags/bulk/',
+            data=json.dumps(data),
+            content_type='application/json',
+        )
+
+    def test_requires_staff(self, client, tip):
+        """Test anonymous users cannot review flags."""
+        flag = self._flags(tip, 1)[0]
+        response = self._post(client, {'action': 'approve', 'ids': [flag.id]})
+
+        assert response.status_code in (401, 403)
+        flag.refresh_from_db()
+        assert flag.status == 'pending'
+
+    def test_reject_by_ids(self, admin_client, admin, tip, django_assert_max_num_queries):
+        """Test flags are updated, stamped and logged in a fixed number of queries."""
+        flags = self._flags(tip, 30)
+        other = self._flags(tip, 1)[0]
+
+        with django_assert_max_num_queries(10):
+            response = self._post(
+                admin_client, {'action': 'reject', 'ids': [f.id for f in flags]}
+            )
+
+        assert response.status_code == 200
+        assert response.json()['updated'] == 30
+        rejected = ModerationFlag.objects.filter(status='rejected')
+        assert rejected.count() == 30
+        assert set(rejected.values_list('reviewed_by', flat=True)) == {admin.id}
+        assert not rejected.filter(reviewed_at__isnull=True).exists()
+        assert ModerationLog.objects.filter(action='flag_rejected').count() == 30
+        other.refresh_from_db()
+        assert other.status == 'pending'
+
+    def test_filter_skips_flags_already_in_status(self, admin_client, tip):
+        """Test a filter selects matching flags and leaves finished ones alone."""
+        self._flags(tip, 3)
+        self._flags(tip, 2, status='approved')
+
+        response = self._post(
+            admin_client, {'action': 'approve', 'filter': {'category': 'spam'}}
+        )
+
+        assert response.json()['updated'] == 3
+        assert ModerationFlag.objects.filter(status='approved').count() == 5
+        assert ModerationLog.objects.filter(action='flag_approved').count() == 3
+
+    def test_reject_tips_keeps_history(self, admin_client, tip):
+        """Test approving with reject_tips removes the tip but keeps flags and logs."""
+        flags = self._flags(tip, 2)
+        tip_id = tip.id
+
+        response = self._post(
+            admin_client,
+            {'action': 'approve', 'ids': [f.id for f in flags], 'reject_tips': True},
+        )
+
+        assert response.json()['tips_rejected'] == 1
+        assert not Tip.objects.filter(id=tip_id).exists()
+        assert ModerationFlag.objects.filter(status='approved', tip__isnull=True).count() == 2
+        rejected = ModerationLog.objects.get(action='tip_rejected')
+        assert rejected.details['tip_id'] == tip_id
+        assert rejected.details['title'] == 'Flagged Tip'
+        assert ModerationLog.objects.filter(action='flag_approved').count() == 2
+
+    def test_reject_tips_invalidates_after_commit(self, tip, django_capture_on_commit_callbacks):
+        """Test caches are bumped only once the deletion is committed."""
+        flags = self._flags(tip, 1)
+        before = response_cache.current_versions(['tips', 'categories'])
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            bulk_review_flags('approve', ids=[flags[0].id], reject_tips=True)
+            assert response_cache.current_versions(['tips', 'categories']) == before
+
+        assert len(callbacks) == 2
+        for callback in callbacks:
+            callback()
+        after = response_cache.current_versions(['tips', 'categories'])
+        assert all(old != new for old, new in zip(before, after))
+
+    def test_dry_run_takes_no_locks(self, tip, monkeypatch):
+        """Test a dry run neither writes nor locks the selected flags."""
+        flags = self._flags(tip, 2)
+        locked = []
+        select_for_update = QuerySet.select_for_update
+
+        def record(queryset, *args, **kwargs):
+            locked.append(queryset.model)
+            return select_for_update(queryset, *args, **kwargs)
+
+        monkeypatch.setattr(QuerySet, 'select_for_update', record)
+        result = bulk_review_flags('reject', ids=[f.id for f in flags], dry_run=True)
+
+        assert result == {'updated': 2, 'tips_rejected': 0}
+        assert locked == []
+        bulk_review_flags('reject', ids=[f.id for f in flags])
+        assert locked == [ModerationFlag]
+
+    def test_invalid_requests(self, admin_client, tip, settings):
+        """Test bad actions, malformed input, empty selections and oversized batches are rejected."""
+        settings.MODERATION_BULK_MAX_FLAGS = 2
+        flags = self._flags(tip, 3)
+        ids = [f.id for f in flags]
+
+        for data in (
+            {'action': 'delete', 'ids': ids[:1]},
+            {'action': 'approve'},
+            {'action': 'approve', 'ids': ids},
+            {'action': 'approve', 'filter': {'status': 'pending'}},
+            {'action': 'approve', 'filter': {'status': 'bogus'}},
+            {'action': 'reject', 'ids': ids[:1], 'reject_tips': True},
+            {'action': 'approve', 'ids': ''.join(str(i) for i in ids[:2])},
+            {'action': 'approve', 'ids': [str(ids[0])]},
+            {'action': 'approve', 'ids': [True]},
+            [{'action': 'approve', 'ids': ids[:1]}],
+            ids[0],
+        ):
+            response = self._post(admin_client, data)
+            assert response.status_code == 400, data
+            assert 'error' in response.json()
+
+        assert not ModerationFlag.objects.exclude(status='pending').exists()
+        assert not ModerationLog.objects.exists()
@@ -0,0 +1,99 @@
+"""
+Tests for cache configuration and the named cache aliases.
+"""
+
+import runpy
+from unittest.mock import Mock
+
+import pytest
+from django.core.cache import caches
+from config import settings as project_settings
+from config.caches import cache_config, is_shared
+from apps.wiki.middleware import ContentModerationMiddleware
+
+
+class TestCacheConfig:
+    """Tests for building CACHES entries from cache URLs."""
+
+    def test_redis(self):
+        """Test redis:// URLs are passed through with a per-alias key prefix."""
+        config = cache_config('redis://cache:6379/1', 'ratelimit', 60, 100)
+
+        assert config['BACKEND'] == 'django.core.cache.backends.redis.RedisCache'
+        assert config['LOCATION'] == 'redis://cache:6379/1'
+        assert config['KEY_PREFIX'] == 'ratelimit'
+        assert config['TIMEOUT'] == 60
+        assert 'OPTIONS' not in config
+
+    def test_memcached_hosts(self):
+        """Test comma-separated memcached hosts become a server list."""
+        config = cache_config('memcached://a:11211,b:11211', 'default', 300, 100)
+
+        assert config['BACKEND'].endswith('PyMemcacheCache')
+        assert config['LOCATION'] == ['a:11211', 'b:11211']
+
+    def test_local_backends_are_separate_per_alias(self):
+        """Test file and db caches give each alias its own storage and culling."""
+        file_config = cache_config('file:///var/tmp/wiki/', 'responses', 300, 5000)
+        db_config = cache_config('db://wiki_cache', 'moderation', 300, 20000, cull_frequency=10)
+
+        assert file_config['LOCATION'] == '/var/tmp/wiki/responses'
+        assert file_config['OPTIONS'] == {'MAX_ENTRIES': 5000, 'CULL_FREQUENCY': 3}
+        assert db_config['BACKEND'] == 'django.core.cache.backends.db.DatabaseCache'
+        assert db_config['LOCATION'] == 'wiki_cache_moderation'
+        assert db_config['OPTIONS'] == {'MAX_ENTRIES': 20000, 'CULL_FREQUENCY': 10}
+
+    def test_only_locmem_is_per_process(self):
+        assert not is_shared('locmem://')
+        for url in ('redis://cache:6379/0', 'memcached://a:11211',
+                    'file:///var/tmp/wiki', 'db://wiki_cache'):
+            assert is_shared(url), url
+
+    def test_unknown_scheme(self):
+        """Test unsupported URLs fail at startup rather than silently."""
+        with pytest.raises(ValueError):
+            cache_config('mongodb://localhost', 'default', 300, 100)
+
+
+class TestCacheAliases:
+    """Tests for the configured aliases."""
+
+    def test_default_backend_is_shared_between_workers(self, settings):
+        """Test the default aliases are not private to each gunicorn worker."""
+        for alias, config in settings.CACHES.items():
+            assert not config['BACKEND'].endswith('LocMemCache'), alias
+
+    def test_rate_limits_stay_shared_with_locmem(self, monkeypatch):
+        """Test CACHE_URL=locmem:// keeps rate limit counters shared unless moved explicitly."""
+        monkeypatch.setenv('CACHE_URL', 'locmem://')
+        monkeypatch.delenv('CACHE_URL_RATELIMIT', raising=False)
+        monkeypatch.delenv('RESPONSE_CACHE_ENABLED', raising=False)
+        configured = runpy.run_path(project_settings.__file__)
+
+        assert configured['CACHES']['ratelimit']['BACKEND'].endswith('FileBasedCache')
+        assert configured['CACHES']['responses']['BACKEND'].endswith('LocMemCache')
+        assert configured['RESPONSE_CACHE_ENABLED'] is False
+
+        monkeypatch.setenv('CACHE_URL_RATELIMIT', 'locmem://')
+        configured = runpy.run_path(project_settings.__file__)
+        assert configured['CACHES']['ratelimit']['BACKEND'].endswith('LocMemCache')
+
+    def test_aliases_do_not_share_keys(self):
+        """Test a key written to one alias is invisible to the others."""
+        caches['responses'].set('key', 'response')
+
+        assert caches['default'].get('key') is None
+        assert caches['ratelimit'].get('key') is None
+
+    def test_rate_limit_counts_in_ratelimit_alias(self):
+        """Test middleware rate limits count hits in the ratelimit cache."""
+        request = Mock(hashed_ip='abc')
+
+        results = [
+            ContentModerationMiddleware.check_rate_limit(request, 'vote', 2, 'hour')
+            for _ in range(3)
+        ]
+
+        assert results == [True, True, False]
+        assert caches['ratelimit'].get('ratelimit_vote_abc') == 2
+        assert caches['default'].get('ratelimit_vote_abc') is None
@@ -0,0 +1,602 @@
+"""
+Test suite for wiki management commands.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+from django.db.models import Avg, Count
+from django.utils import timezone
+from apps.wiki import dedup, partitions
+from apps.wiki.models import (
+    AffiliateKeyword,
+    AffiliateProduct,
+    Category,
+    Leaderboard,
+    ModerationFlag,
+    ModerationLog,
+    Tip,
+    TipLSHBucket,
+    Vote,
+)
+from apps.wiki.utils import get_affiliate_generator
+
+
+@pytest.mark.django_db
+class TestRenderDescriptionsCommand:
+    """Tests for the render_descriptions management command."""
+
+    def test_renders_only_stale_tips(self):
+        """Test tips with an outdated affiliate version are re-rendered."""
+        category = Category.objects.create(name='Test', slug='test')
+        stale = Tip.objects.create(title='Stale', description='Use mouthwash', category=category)
+        fresh = Tip.objects.create(title='Fresh', description='Use mouthwash', category=category)
+        Tip.objects.filter(pk=stale.pk).update(description_html='', description_html_version='old')
+        Tip.objects.filter(pk=fresh.pk).update(description_html='kept')
+
+        call_command('render_descriptions')
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        assert 'nofollow sponsored' in stale.description_html
+        assert stale.description_html_version == get_affiliate_generator().version
+        assert fresh.description_html == 'kept'
+
+    def test_force_renders_all_tips(self):
+        """Test --force re-renders tips even when their version is current."""
+        category = Category.objects.create(name='Test', slug='test')
+        tip = Tip.objects.create(title='Tip', description='Use mouthwash', category=category)
+        Tip.objects.filter(pk=tip.pk).update(description_html='kept')
+
+        call_command('render_descriptions', force=True, batch_size=1)
+
+        tip.refresh_from_db()
+        assert 'nofollow sponsored' in tip.description_html
+
+
+@pytest.mark.django_db
+class TestImportAffiliateProductsCommand:
+    """Tests for the import_affiliate_products management command."""
+
+    def write_fixture(self, tmp_path, products):
+        fixture_file = tmp_path / "affiliate_products.json"
+        fixture_file.write_text(json.dumps({"affiliate_mappings": {"amazon": products}}))
+        return str(fixture_file)
+
+    def test_import_default_fixture(self):
+        """Test the bundled fixture imports with its keyword rows."""
+        call_command('import_affiliate_products')
+
+        product = AffiliateProduct.objects.get(network='amazon', product_key='dental_floss_waxed')
+        assert 'dental floss' in product.keywords
+        assert AffiliateKeyword.objects.filter(product=product, keyword='dental floss').exists()
+
+    def test_import_is_idempotent_and_updates(self, tmp_path):
+        """Test re-importing updates rows in place and rebuilds keywords."""
+        products = {
+            "floss": {"name": "Floss", "url": "https://amazon.com/dp/1", "keyword": ["Floss"]},
+        }
+        call_command('import_affiliate_products', fixture=self.write_fixture(tmp_path, products))
+
+        products["floss"]["keyword"] = ["waxed floss"]
+        call_command('import_affiliate_products', fixture=self.write_fixture(tmp_path, products))
+
+        product = AffiliateProduct.objects.get()
+        assert product.keywords == ['waxed floss']
+        assert list(AffiliateKeyword.objects.values_list('keyword', flat=True)) == ['waxed floss']
+
+    def test_deactivate_missing(self, tmp_path):
+        """Test --deactivate-missing disables products dropped from the fixture."""
+        products = {
+            "floss": {"name": "Floss", "url": "https://amazon.com/dp/1", "keyword": ["floss"]},
+            "soap": {"name": "Soap", "url": "https://amazon.com/dp/2", "keyword": ["soap"]},
+        }
+        call_command('import_affiliate_products', fixture=self.write_fixture(tmp_path, products))
+
+        del products["soap"]
+        call_command(
+            'import_affiliate_products',
+            fixture=self.write_fixture(tmp_path, products),
+            deactivate_missing=True,
+        )
+
+        assert not AffiliateProduct.objects.get(product_key='soap').is_active
+        assert AffiliateProduct.objects.get(product_key='floss').is_active
+
+
+@pytest.mark.django_db
+class TestSeedTipsCommand:
+    """Tests for the seed_tips management command."""
+
+    def test_seed_creates_categories_and_tips(self):
+        """Test seeding creates every curated category and tip with rendered HTML."""
+        from apps.wiki.fixtures.tips_data import CATEGORIES, TIPS_DATA
+
+        call_command('seed_tips', stdout=StringIO())
+
+        assert Category.objects.count() == len(CATEGORIES)
+        assert Tip.objects.count() == len({(t['title'], t['description']) for t in TIPS_DATA})
+        assert not Tip.objects.filter(slug='').exists()
+        assert not Tip.objects.filter(description_html='').exists()
+
+    def test_slug_collision_reuses_existing_category(self):
+        """Test a curated category whose slug exists under another name reuses that row."""
+        from django.utils.text import slugify
+        from apps.wiki.fixtures.tips_data import CATEGORIES, TIPS_DATA
+
+        existing = Category.objects.create(name='Renamed', slug=slugify(CATEGORIES[0]))
+        call_command('seed_tips', stdout=StringIO())
+
+        expected = len({
+            (t['title'], t['description']) for t in TIPS_DATA if t['category'] == CATEGORIES[0]
+        })
+        assert expected and existing.tips.count() == expected
+        assert Category.objects.count() == len(CATEGORIES)
+
+    def test_seed_is_idempotent(self, django_assert_max_num_queries):
+        """Test re-seeding skips existing tips using a bounded number of queries."""
+        call_command('seed_tips', stdout=StringIO())
+        count = Tip.objects.count()
+
+        out = StringIO()
+        with django_assert_max_num_queries(12):
+            call_command('seed_tips', stdout=out)
+
+        assert Tip.objects.count() == count
+        assert 'New tips created: 0' in out.getvalue()
+
+    def test_dry_run_writes_nothing(self):
+        """Test --dry-run reports planned work and timing without writing."""
+        out = StringIO()
+        call_command('seed_tips', dry_run=True, stdout=out)
+
+        assert Category.objects.count() == 0
+        assert Tip.objects.count() == 0
+        assert 'Tips to create:' in out.getvalue()
+        assert 'Planning time:' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestGenerateDatasetCommand:
+    """Tests for the generate_dataset management command."""
+
+    def _snapshot(self):
+        return (
+            list(Tip.objects.order_by('id').values_list('title', 'description', 'created_at')),
+            list(
+                Vote.objects.order_by('id').values_list(
+                    'tip__title', 'effectiveness', 'difficulty', 'ip_hash', 'created_at'
+                )
+            ),
+            list(
+                ModerationFlag.objects.order_by('id').values_list(
+                    'tip__title', 'flag_type', 'status', 'created_at'
+                )
+            ),
+        )
+
+    def test_generates_tips_votes_and_flags(self):
+        """Test the requested number of tips is written with votes and flags."""
+        call_command('generate_dataset', tips=300, flag_rate=0.1, stdout=StringIO())
+
+        assert Tip.objects.count() == 300
+        assert Vote.objects.count() > 0
+        assert ModerationFlag.objects.count() > 0
+        assert not Tip.objects.filter(description_html='').exists()
+
+    def test_output_is_reproducible(self):
+        """Test the same seed produces identical rows regardless of batch size."""
+        call_command('generate_dataset', tips=200, seed=7, stdout=StringIO())
+        first = self._snapshot()
+
+        Tip.objects.all().delete()
+        call_command('generate_dataset', tips=200, seed=7, batch_size=17, stdout=StringIO())
+
+        assert self._snapshot() == first
+
+    def test_aggregates_match_votes(self):
+        """Test tip aggregates are recomputed from the generated votes."""
+        call_command('generate_dataset', tips=100, stdout=StringIO())
+
+        for tip in Tip.objects.annotate(
+            eff=Avg('votes__effectiveness'), diff=Avg('votes__difficulty')
+        ):
+            assert tip.effectiveness_avg == pytest.approx(tip.eff or 0.0)
+            assert tip.difficulty_avg == pytest.approx(tip.diff or 0.0)
+            assert tip.success_rate == pytest.approx(tip.calculate_success_rate())
+
+    def test_votes_per_tip_distribution(self):
+        """Test a custom distribution bounds the votes drawn per tip."""
+        call_command(
+            'generate_dataset', tips=100, votes_per_tip_dist='none=1.0', stdout=StringIO()
+        )
+
+        assert not Tip.objects.annotate(n=Count('votes')).filter(n__gt=1).exists()
+
+    def test_invalid_distribution(self):
+        """Test distributions that do not sum to 1 are rejected."""
+        with pytest.raises(CommandError):
+            call_command(
+                'generate_dataset', tips=10, votes_per_tip_dist='high=0.5', stdout=StringIO()
+            )
+
+
+@pytest.mark.django_db
+class TestExportImportWikiCommands:
+    """Tests for the export_wiki and import_wiki management commands."""
+
+    @pytest.fixture(autouse=True)
+    def state_dir(self, settings, tmp_path_factory):
+        settings.IMPORT_WIKI_STATE_DIR = str(tmp_path_factory.mktemp('import-state'))
+        return settings.IMPORT_WIKI_STATE_DIR
+
+    @pytest.fixture
+    def wiki_data(self):
+        category = Category.objects.create(name='Hand Hygiene', slug='hand-hygiene')
+        tips = [
+            Tip.objects.create(
+                title=f'Tip {i}', description=f'Wash with soap {i}', category=category
+            )
+            for i in range(3)
+        ]
+        for i, tip in enumerate(tips):
+            for j in range(i + 1):
+                Vote.objects.create(
+                    tip=tip, effectiveness=j + 1, difficulty=2, ip_hash=f'ip-{i}-{j}'
+                )
+        ModerationFlag.objects.create(
+            tip=tips[0], flag_type='manual', category='user_report',
+            matched_terms=['soap'], ip_hash='ip-flag',
+        )
+        return tips
+
+    def _snapshot(self):
+        return (
+            sorted(Tip.objects.values_list('title', 'description', 'category__slug', 'created_at')),
+            sorted(Vote.objects.values_list('tip__title', 'effectiveness', 'ip_hash', 'created_at')),
+            sorted(ModerationFlag.objects.values_list('tip__title', 'matched_terms', 'reviewed_at')),
+        )
+
+    def _clear(self):
+        Tip.objects.all().delete()
+        Category.objects.all().delete()
+
+    @pytest.mark.parametrize('options', [{'format': 'jsonl', 'gzip': True}, {'format': 'csv'}])
+    def test_round_trip(self, wiki_data, tmp_path, options):
+        """Test exported content is restored unchanged, timestamps included."""
+        before = self._snapshot()
+        call_command('export_wiki', str(tmp_path), stdout=StringIO(), **options)
+
+        self._clear()
+        call_command('import_wiki', str(tmp_path), chunk_size=2, stdout=StringIO())
+
+        assert self._snapshot() == before
+
+    def test_foreign_keys_are_remapped(self, wiki_data, tmp_path):
+        """Test rows attach to the new ids when the target database differs."""
+        call_command('export_wiki', str(tmp_path), stdout=StringIO())
+        self._clear()
+        # Shift the id sequences so old ids point at the wrong rows
+        other = Category.objects.create(name='Other', slug='other')
+        Tip.objects.create(title='Unrelated', description='x', category=other)
+
+        call_command('import_wiki', str(tmp_path), stdout=StringIO())
+
+        assert Vote.objects.filter(tip__title='Unrelated').count() == 0
+        assert Vote.objects.filter(tip__title='Tip 2').count() == 3
+        assert Tip.objects.get(title='Tip 0').category.slug == 'hand-hygiene'
+
+    def test_resume_after_interrupted_import(self, wiki_data, tmp_path, monkeypatch, state_dir):
+        """Test a resume skips committed rows and redoes a chunk that never committed."""
+        before = self._snapshot()
+        call_command('export_wiki', str(tmp_path), stdout=StringIO())
+        self._clear()
+        call_command('import_wiki', str(tmp_path), tables=['categories', 'tips'], stdout=StringIO())
+
+        from apps.wiki.management.commands.import_wiki import Command
+        record_ids = Command._record_ids
+        journaled = []
+
+        def crash_before_second_commit(self, name, pairs):
+            record_ids(self, name, pairs)
+            journaled.append(name)
+            if len(journaled) == 2:
+                raise RuntimeError('killed')
+
+        monkeypatch.setattr(Command, '_record_ids', crash_before_second_commit)
+        with pytest.raises(RuntimeError):
+            call_command(
+                'import_wiki', str(tmp_path), tables=['votes'], chunk_size=2, stdout=StringIO()
+            )
+        monkeypatch.undo()
+        # The second chunk is journaled but rolled back
+        assert Vote.objects.count() == 2
+        (journal,) = Path(state_dir).glob('*/votes.idmap')
+        assert len(journal.read_text().splitlines()) == 4
+
+        out = StringIO()
+        call_command('import_wiki', str(tmp_path), tables=['votes', 'flags'], resume=True, stdout=out)
+
+        assert 'dropped 2 id map entries' in out.getvalue()
+        assert 'votes: 4 imported, 0 skipped, 2 already imported' in out.getvalue()
+        assert self._snapshot() == before
+
+    def test_export_directory_is_not_written(self, wiki_data, tmp_path, state_dir):
+        """Test id maps go to a state directory per export and database, or --idmap-dir."""
+        call_command('export_wiki', str(tmp_path), stdout=StringIO())
+        exported = sorted(tmp_path.iterdir())
+        self._clear()
+
+        call_command('import_wiki', str(tmp_path), stdout=StringIO())
+        assert sorted(tmp_path.iterdir()) == exported
+        assert len(list(Path(state_dir).glob('*/tips.idmap'))) == 1
+
+        self._clear()
+        idmap_dir = tmp_path.parent / 'explicit-idmaps'
+        call_command('import_wiki', str(tmp_path), idmap_dir=str(idmap_dir), stdout=StringIO())
+        assert (idmap_dir / 'tips.idmap').exists()
+        assert sorted(tmp_path.iterdir()) == exported
+
+    def test_missing_export_file(self, tmp_path):
+        """Test importing from a directory without export files fails clearly."""
+        with pytest.raises(CommandError):
+            call_command('import_wiki', str(tmp_path), stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestRotateModerationLogsCommand:
+    """Tests for rotate_moderation_logs and its month arithmetic."""
+
+    def _log_at(self, created_at):
+        log = ModerationLog.objects.create(action='flag_created', ip_hash='ip')
+        ModerationLog.objects.filter(pk=log.pk).update(created_at=created_at)
+        return log
+
+    def test_month_arithmetic(self):
+        """Test month starts and offsets across year boundaries."""
+        month = partitions.month_start(datetime(2026, 1, 31, 23, 59, tzinfo=dt_timezone.utc))
+
+        assert month == datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        assert partitions.add_months(month, -1) == datetime(2025, 12, 1, tzinfo=dt_timezone.utc)
+        assert partitions.add_months(month, 13) == datetime(2027, 2, 1, tzinfo=dt_timezone.utc)
+        assert partitions.partition_name(month) == 'wiki_moderationlog_p2026_01'
+
+    def test_deletes_expired_logs_in_single_table_mode(self):
+        """Test logs older than the retention window are deleted in batches."""
+        now = timezone.now()
+        old = [self._log_at(now - timedelta(days=400)) for _ in range(3)]
+        recent = self._log_at(now - timedelta(days=10))
+
+        out = StringIO()
+        call_command('rotate_moderation_logs', retention_months=12, batch_size=2, stdout=out)
+
+        assert list(ModerationLog.objects.values_list('id', flat=True)) == [recent.id]
+        assert not ModerationLog.objects.filter(id__in=[log.id for log in old]).exists()
+        assert 'Deleted 3 logs' in out.getvalue()
+
+    def test_dry_run_keeps_logs(self):
+        """Test --dry-run only reports expired logs."""
+        self._log_at(timezone.now() - timedelta(days=400))
+
+        out = StringIO()
+        call_command('rotate_moderation_logs', dry_run=True, stdout=out)
+
+        assert ModerationLog.objects.count() == 1
+        assert 'Would delete 1 expired logs' in out.getvalue()
+
+    def test_archive_requires_partitions(self):
+        """Test --archive is rejected without the partitioned table."""
+        with pytest.raises(CommandError):
+            call_command('rotate_moderation_logs', archive=True, stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestModerateFlagsCommand:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for the moderate_flags management command."""
+
+    @pytest.fixture
+    def flags(self):
+        category = Category.objects.create(name='Test', slug='test')
+        tip = Tip.objects.create(title='Flagged Tip', description='Test', category=category)
+        return [
+            ModerationFlag.objects.create(
+                tip=tip, flag_type=flag_type, category='spam', ip_hash='hash'
+            )
+            for flag_type in ('keyword', 'keyword', 'manual')
+        ]
+
+    def test_approve_by_filter(self, flags):
+        """Test filters select flags and the reviewer is stamped."""
+        reviewer = User.objects.create_user('alice', password='password')
+
+        out = StringIO()
+        call_command(
+            'moderate_flags', 'approve', flag_type='keyword', reviewer='alice', stdout=out
+        )
+
+        approved = ModerationFlag.objects.filter(status='approved')
+        assert approved.count() == 2
+        assert set(approved.values_list('reviewed_by', flat=True)) == {reviewer.id}
+        assert ModerationLog.objects.filter(action='flag_approved').count() == 2
+        assert 'Approved 2 flags' in out.getvalue()
+
+    def test_reject_by_ids_dry_run(self, flags):
+        """Test --dry-run reports the count without touching flags."""
+        out = StringIO()
+        call_command(
+            'moderate_flags', 'reject', ids=[flags[0].id, flags[1].id], dry_run=True, stdout=out
+        )
+
+        assert not ModerationFlag.objects.exclude(status='pending').exists()
+        assert not ModerationLog.objects.exists()
+        assert '[dry run] Rejected 2 flags' in out.getvalue()
+
+    def test_reject_tips(self, flags):
+        """Test --reject-tips removes the flagged tip in bulk."""
+        call_command(
+            'moderate_flags', 'approve', ids=[flags[0].id], reject_tips=True, stdout=StringIO()
+        )
+
+        assert not Tip.objects.exists()
+        assert ModerationFlag.objects.count() == 3
+        assert ModerationLog.objects.filter(action='tip_rejected').count() == 1
+
+    def test_requires_selection(self, flags):
+        """Test running without ids or filters is refused."""
+        with pytest.raises(CommandError):
+            call_command('moderate_flags', 'approve', stdout=StringIO())
+
+    def test_unknown_reviewer(self, flags):
+        """Test an unknown reviewer username is an error."""
+        with pytest.raises(CommandError):
+            call_command('moderate_flags', 'approve', ids=[flags[0].id], reviewer='nobody')
+
+
+@pytest.mark.django_db
+class TestRebuildLeaderboardsCommand:
+    """Tests for the rebuild_leaderboards command."""
+
+    def test_rebuilds_drifted_boards(self):
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        tip = Tip.objects.create(title='Tip', description='Desc', category=category)
+        Leaderboard.objects.create(metric='votes', entries=[[999, 5]])
+        Tip.objects.filter(id=tip.id).update(vote_count=2)
+
+        out = StringIO()
+        call_command('rebuild_leaderboards', stdout=out)
+
+        assert 'Rebuilt 6 leaderboards' in out.getvalue()
+        board = Leaderboard.objects.get(metric='votes', category=None)
+        assert board.entries == [[tip.id, 2]]
+
+    def test_single_metric(self):
+        call_command('rebuild_leaderboards', '--metric', 'trending', stdout=StringIO())
+        assert list(Leaderboard.objects.values_list('metric', flat=True)) == ['trending']
+
+
+@pytest.mark.django_db
+class TestBuildRelatedTipsCommand:
+    """Tests for the build_related_tips command."""
+
+    @pytest.fixture
+    def tips(self):
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        texts = [
+            ('Sponge in the microwave', 'Microwave a damp sponge to kill bacteria'),
+            ('Replace your sponge', 'Bacteria build up in a kitchen sponge within a week'),
+            ('Clean grout with vinegar', 'Vinegar and baking soda lift mold from grout'),
+            ('Mold on grout', 'Scrub grout mold with a vinegar paste'),
+            ('Cutting boards', 'Wash cutting boards right after raw meat'),
+        ]
+        return [
+            Tip.objects.create(title=title, description=description, category=category)
+            for title, description in texts
+        ]
+
+    def test_full_build(self, tips):
+        out = StringIO()
+        call_command('build_related_tips', '--max-block-mb', '0', stdout=out)
+
+        assert 'Indexed 5 of 5 tips' in out.getvalue()
+        related = dict(Tip.objects.values_list('id', 'related'))
+        assert [tip_id for tip_id, _ in related[tips[0].id]][0] == tips[1].id
+        assert [tip_id for tip_id, _ in related[tips[2].id]][0] == tips[3].id
+        scores = [score for _, score in related[tips[2].id]]
+        assert scores == sorted(scores, reverse=True)
+        assert all(0 < score <= 1 for score in scores)
+
+    def test_incremental_scores_only_new_tips(self, tips):
+        call_command('build_related_tips', stdout=StringIO())
+        new = Tip.objects.create(
+            title='Sponge bacteria', description='Boil the kitchen sponge', category=tips[0].category
+        )
+        Tip.objects.filter(id=tips[4].id).update(related=[[999, 0.5]])
+
+        out = StringIO()
+        call_command('build_related_tips', '--incremental', stdout=out)
+        assert 'Indexed 1 of 6 tips' in out.getvalue()
+        incremental = dict(Tip.objects.values_list('id', 'related'))
+        # Unrelated existing lists are left alone
+        assert incremental[tips[4].id] == [[999, 0.5]]
+        # Existing tips pick up the new tip where it ranks
+        assert new.id in [tip_id for tip_id, _ in incremental[tips[0].id]]
+
+        call_command('build_related_tips', stdout=StringIO())
+        full = dict(Tip.objects.values_list('id', 'related'))
+        assert incremental[new.id] == full[new.id]
+
+    def test_incremental_without_new_tips_skips_the_corpus(self, tips, django_assert_num_queries):
+        call_command('build_related_tips', stdout=StringIO())
+        before = dict(Tip.objects.values_list('id', 'related'))
+
+        out = StringIO()
+        with django_assert_num_queries(1):
+            call_command('build_related_tips', '--incremental', stdout=out)
+        assert 'All tips are indexed' in out.getvalue()
+        assert dict(Tip.objects.values_list('id', 'related')) == before
+
+    def test_top_k(self, tips):
+        call_command('build_related_tips', '--top-k', '1', '--min-score', '0', stdout=StringIO())
+        assert all(
+            len(entries) <= 1 for entries in Tip.objects.values_list('related', flat=True)
+        )
+
+
+@pytest.mark.django_db
+class TestFindDuplicateTipsCommand:
+    """Tests for the find_duplicate_tips command."""
+
+    def test_backfills_and_reports_clusters(self):
+        sponge = (
+            'Put a damp kitchen sponge in the microwave for one minute on high '
+            'to kill most of the bacteria living in it'
+        )
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        originals = [
+            Tip.objects.create(title='Sponge', description=sponge, category=category),
+            Tip.objects.create(title='Sponge tip', description=sponge, category=category),
+            Tip.objects.create(
+                title='Grout', category=category,
+                description='Scrub bathroom grout with a paste of baking soda and vinegar',
+            ),
+        ]
+
+        out = StringIO()
+        call_command('find_duplicate_tips', stdout=out)
+        output = out.getvalue()
+
+        assert 'Indexed 3 tips' in output
+        assert 'Cluster of 2:' in output
+        assert f'#{originals[0].id} Sponge' in output
+        assert '1 duplicate clusters covering 2 tips' in output
+        assert not Tip.objects.filter(minhash__isnull=True).exists()
+
+        out = StringIO()
+        call_command('find_duplicate_tips', stdout=out)
+        assert 'Indexed 0 tips' in out.getvalue()
+
+        call_command('find_duplicate_tips', '--rebuild', stdout=StringIO())
+        assert TipLSHBucket.objects.count() == 3 * dedup.MINHASH_BANDS
+
+    def test_backfill_only_skips_clustering(self, django_assert_num_queries):
+        """Test deploys index new tips without scanning the bucket table."""
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        Tip.objects.create(title='Sponge', description='Microwave the sponge', category=category)
+        call_command('find_duplicate_tips', '--backfill-only', stdout=StringIO())
+        assert TipLSHBucket.objects.count() == dedup.MINHASH_BANDS
+
+        out = StringIO()
+        with django_assert_num_queries(1):
+            # Only the lookup of unindexed tips
+            call_command('find_duplicate_tips', '--backfill-only', stdout=out)
+        assert out.getvalue() == 'Indexed 0 tips\n'
@@ -0,0 +1,131 @@
+"""
+Tests for MinHash/LSH near-duplicate detection.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from apps.wiki import dedup
+from apps.wiki.models import Category, Tip, TipLSHBucket
+
+DESCRIPTION = (
+    "Put a damp kitchen sponge in the microwave for one minute on high to kill "
+    "most of the bacteria living in it, then let it cool before you use it again"
+)
+
+
+class TestSignatures:
+    """Tests for shingling and MinHash signatures."""
+
+    def test_deterministic(self):
+        """Test signatures and bucket keys are stable, so stored ones stay valid."""
+        sig = dedup.signature(DESCRIPTION)
+        assert sig.dtype == np.uint32 and len(sig) == dedup.MINHASH_PERMUTATIONS
+        assert np.array_equal(sig, dedup.signature(DESCRIPTION))
+        assert np.array_equal(dedup.unpack(dedup.pack(sig)), sig)
+        assert len(set(dedup.bucket_keys(sig))) == dedup.MINHASH_BANDS
+
+    def test_similarity_tracks_jaccard(self):
+        """Test near-identical text scores high and unrelated text low."""
+        sig = dedup.signature(DESCRIPTION)
+        repost = dedup.signature(DESCRIPTION.upper().replace("one minute", "1 minute"))
+        other = dedup.signature(
+            "Scrub bathroom grout with a paste of baking soda and vinegar every month"
+        )
+
+        assert dedup.similarity(sig, repost) >= 0.7
+        assert dedup.similarity(sig, other) <= 0.1
+
+    def test_short_text(self):
+        assert len(dedup.shingles("Sponge")) == 1
+        assert len(dedup.shingles("")) == 1
+
+
+@pytest.mark.django_db
+class TestCreateTipDuplicates:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+        settings.DEBUG = True
+
+    """Tests for the duplicate check in create_tip."""
+
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name='Kitchen', slug='kitchen')
+
+    @pytest.fixture
+    def moderation_calls(self, monkeypatch):
+        calls = []
+
+        def moderate(text, use_ai=True):
+            calls.append(text)
+            return {"is_flagged": False}
+
+        monkeypatch.setattr('apps.wiki.views.moderate_content', moderate)
+        return calls
+
+    def post(self, client, category, title, description=DESCRIPTION):
+        return client.post(
+            '/api/tips/create/',
+            data=json.dumps(
+                {'title': title, 'description': description, 'category_id': category.id}
+            ),
+            content_type='application/json',
+        )
+
+    def test_new_tips_are_indexed(self, client, category, moderation_calls):
+        response = self.post(client, category, 'Microwave your sponge')
+
+        tip = Tip.objects.get(id=response.json()['tip_id'])
+        assert tip.minhash is not None
+        assert TipLSHBucket.objects.filter(tip=tip).count() == dedup.MINHASH_BANDS
+
+    def test_repost_rejected_before_moderation(self, client, category, moderation_calls):
+        """Test a near-identical repost is refused without running moderation."""
+        original = self.post(client, category, 'Microwave your sponge').json()['tip_id']
+        moderation_calls.clear()
+
+        response = self.post(
+            client, category, 'Microwave your sponge!', DESCRIPTION.replace('high', 'HIGH')
+        )
+
+        assert response.status_code == 409
+        assert response.json()['duplicate_of']['id'] == original
+        assert moderation_calls == []
+        assert Tip.objects.count() == 1
+
+    def test_merge_answers_with_existing_tip(self, client, category, moderation_calls, settings):
+        settings.DUPLICATE_TIP_ACTION = 'merge'
+        original = self.post(client, category, 'Microwave your sponge').json()['tip_id']
+
+        response = self.post(client, category, 'Microwave your sponge')
+
+        assert response.status_code == 200
+        assert response.json()['merged'] is True
+        assert response.json()['tip_id'] == original
+        assert Tip.objects.count() == 1
+
+    def test_different_tip_is_accepted(self, client, category, moderation_calls):
+        self.post(client, category, 'Microwave your sponge')
+        response = self.post(
+            client, category, 'Clean grout',
+            'Scrub bathroom grout with a paste of baking soda and vinegar every month',
+        )
+
+        assert response.status_code == 201
+        assert len(moderation_calls) == 2
+
+    def test_lookup_query_count(self, category, django_assert_num_queries):
+        """Test a lookup is one bucket query and one candidate fetch."""
+        tips = [
+            Tip.objects.create(title=f'Tip {i}', description=f'{DESCRIPTION} {i}', category=category)
+            for i in range(30)
+        ]
+        dedup.index_tips(tips)
+
+        with django_assert_num_queries(2):
+            duplicate = dedup.find_duplicate(dedup.signature(f'Tip 3 {DESCRIPTION} 3'))
+        assert duplicate is not None
+
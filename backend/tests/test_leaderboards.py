@@ -0,0 +1,230 @@
+"""
+Tests for the materialized tip leaderboards.
+"""
+
+import json
+import random
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from apps.wiki import leaderboards
+from apps.wiki.models import Category, Leaderboard, ModerationFlag, Tip, Vote
+from apps.wiki.moderation import bulk_review_flags
+
+
+class TestPlace:
+    """Tests for re-ranking one tip within a board's entries."""
+
+    def test_moves_tip_up(self):
+        entries = [[1, 9.0], [2, 5.0], [3, 1.0]]
+        assert leaderboards.place(entries, 3, 7.0, 3) == [[1, 9.0], [3, 7.0], [2, 5.0]]
+
+    def test_new_tip_pushes_out_last(self):
+        entries = [[1, 9.0], [2, 5.0]]
+        assert leaderboards.place(entries, 4, 6.0, 2) == [[1, 9.0], [4, 6.0]]
+
+    def test_tip_below_full_board_is_ignored(self):
+        entries = [[1, 9.0], [2, 5.0]]
+        assert leaderboards.place(entries, 4, 1.0, 2) == entries
+
+    def test_ties_go_to_newer_tip(self):
+        assert leaderboards.place([[2, 5.0], [1, 5.0]], 3, 5.0, 5) == [
+            [3, 5.0], [2, 5.0], [1, 5.0]
+        ]
+
+    def test_tip_falling_off_full_board_needs_rebuild(self):
+        """Test the freed slot is not guessed when the next tip is unknown."""
+        entries = [[1, 9.0], [2, 5.0]]
+        assert leaderboards.place(entries, 1, 1.0, 2) is None
+
+    def test_tip_falling_within_short_board(self):
+        """Test a board shorter than its size already holds every tip."""
+        entries = [[1, 9.0], [2, 5.0]]
+        assert leaderboards.place(entries, 1, 1.0, 3) == [[2, 5.0], [1, 1.0]]
+
+
+@pytest.mark.django_db
+class TestIncrementalUpdates:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+        settings.LEADERBOARD_SIZE = 3
+
+    """Tests for keeping boards current from tip_vote and create_tip."""
+
+    @pytest.fixture
+    def tips(self):
+        categories = [
+            Category.objects.create(name=name, slug=name.lower())
+            for name in ('Kitchen', 'Bathroom')
+        ]
+        return [
+            Tip.objects.create(
+                title=f'Tip {i}', description='Desc', category=categories[i % 2]
+            )
+            for i in range(8)
+        ]
+
+    def test_votes_keep_every_board_exact(self, client, tips):
+        """Test after many votes each board equals a from-scratch computation."""
+        leaderboards.rebuild()
+        rng = random.Random(7)
+        for i in range(40):
+            tip = rng.choice(tips)
+            client.post(
+                f'/api/tips/{tip.id}/vote/',
+                data=json.dumps(
+                    {'effectiveness': rng.randint(1, 5), 'difficulty': rng.randint(1, 5)}
+                ),
+                content_type='application/json',
+                REMOTE_ADDR=f'10.0.0.{i + 1}',
+            )
+
+        assert Vote.objects.count() == 40
+        for board in Leaderboard.objects.all():
+            assert board.entries == leaderboards.compute_entries(
+                board.metric, board.category_id
+            ), board
+
+    def test_created_tip_enters_boards_with_free_slots(self, client, tips, settings, monkeypatch):
+        """Test a new tip is listed wherever a from-scratch computation lists it."""
+        settings.LEADERBOARD_SIZE = 20
+        settings.DEBUG = True  # no Turnstile token
+        monkeypatch.setattr(
+            'apps.wiki.views.moderate_content', lambda text, use_ai=True: {'is_flagged': False}
+        )
+        Vote.objects.create(tip=tips[0], effectiveness=5, difficulty=1, ip_hash='voter')
+        leaderboards.rebuild()
+
+        response = client.post(
+            '/api/tips/create/',
+            data=json.dumps({
+                'title': 'Dry the dish rack',
+                'description': 'Let the dish rack dry out fully once a week',
+                'category_id': tips[0].category_id,
+            }),
+            content_type='application/json',
+        )
+
+        tip_id = response.json()['tip_id']
+        assert tip_id in leaderboards.top_tip_ids('votes')
+        assert tip_id not in leaderboards.top_tip_ids('trending')
+        for board in Leaderboard.objects.all():
+            assert board.entries == leaderboards.compute_entries(
+                board.metric, board.category_id
+            ), board
+
+    def test_unbuilt_boards_are_left_alone(self, client, tips):
+        """Test a vote before any rebuild does not create boards."""
+        client.post(
+            f'/api/tips/{tips[0].id}/vote/',
+            data=json.dumps({'effectiveness': 5, 'difficulty': 1}),
+            content_type='application/json',
+        )
+        assert not Leaderboard.objects.exists()
+
+    def test_unchanged_boards_are_not_locked_or_written(self, tips, django_assert_num_queries):
+        """Test a tip ranking below every full board costs two reads and no writes."""
+        for i, tip in enumerate(tips):
+            Tip.objects.filter(id=tip.id).update(success_rate=i, vote_count=i + 1)
+            for j in range(i + 1):
+                Vote.objects.create(tip=tip, effectiveness=3, difficulty=3, ip_hash=f'{i}-{j}')
+        leaderboards.rebuild()
+        before = dict(Leaderboard.objects.values_list('id', 'updated_at'))
+        tip = Tip.objects.get(id=tips[0].id)
+
+        with django_assert_num_queries(2):
+            # The tip's trending count, then the boards
+            leaderboards.record_vote(tip)
+        assert dict(Leaderboard.objects.values_list('id', 'updated_at')) == before
+
+    def test_deleted_tips_leave_boards(self, tips):
+        """Test deleting tips, one at a time or in bulk, refills the boards."""
+        for i, tip in enumerate(tips):
+            Tip.objects.filter(id=tip.id).update(vote_count=i)
+        leaderboards.rebuild()
+
+        Tip.objects.get(id=tips[7].id).delete()
+        assert leaderboards.top_tip_ids('votes') == [tips[6].id, tips[5].id, tips[4].id]
+
+        flag = ModerationFlag.objects.create(
+            tip=tips[6], flag_type='manual', category='spam', ip_hash='hash'
+        )
+        bulk_review_flags('approve', ids=[flag.id], reject_tips=True)
+        assert leaderboards.top_tip_ids('votes') == [tips[5].id, tips[4].id, tips[3].id]
+        for board in Leaderboard.objects.all():
+            assert board.entries == leaderboards.compute_entries(
+                board.metric, board.category_id
+            ), board
+
+    def test_rebuild_replaces_boards(self, tips):
+        """Test a rebuild writes one board per metric site-wide and per category."""
+        assert leaderboards.rebuild() == 9
+        assert leaderboards.rebuild(['votes']) == 3
+        assert Leaderboard.objects.count() == 9
+
+
+@pytest.mark.django_db
+class TestLeaderboardView:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for the /api/leaderboards/<metric>/ endpoint."""
+
+    @pytest.fixture
+    def tips(self):
+        kitchen = Category.objects.create(name='Kitchen', slug='kitchen')
+        bathroom = Category.objects.create(name='Bathroom', slug='bathroom')
+        return [
+            Tip.objects.create(
+                title=f'Tip {i}', description='Desc', category=category,
+                success_rate=rate, vote_count=votes,
+            )
+            for i, (category, rate, votes) in enumerate([
+                (kitchen, 50.0, 3), (kitchen, 150.0, 1), (bathroom, 100.0, 2),
+            ])
+        ]
+
+    def test_site_wide_and_category(self, client, tips):
+        """Test boards list tips best first, site-wide or for one category."""
+        data = client.get('/api/leaderboards/success_rate/').json()
+        assert [row['title'] for row in data] == ['Tip 1', 'Tip 2', 'Tip 0']
+
+        data = client.get('/api/leaderboards/votes/?category=kitchen').json()
+        assert [row['title'] for row in data] == ['Tip 0', 'Tip 1']
+
+    def test_rows_match_tip_list(self, client, tips):
+        """Test rows have the tip list shape, and honour limit and fields."""
+        listed = {row['id']: row for row in client.get('/api/tips/').json()['results']}
+        data = client.get('/api/leaderboards/votes/?limit=2').json()
+        assert data == [listed[tips[0].id], listed[tips[2].id]]
+
+        data = client.get('/api/leaderboards/votes/?fields=title,success_rate').json()
+        assert data[0] == {'title': 'Tip 0', 'success_rate': 50.0}
+
+    def test_read_does_not_sort(self, client, tips, django_assert_num_queries):
+        """Test a built board costs one board lookup and one id__in fetch."""
+        leaderboards.rebuild()
+        with django_assert_num_queries(2):
+            client.get('/api/leaderboards/success_rate/')
+
+    def test_stale_trending_board_is_rebuilt(self, client, tips, settings):
+        """Test votes leaving the trending window drop tips on the next rebuild."""
+        vote = Vote.objects.create(tip=tips[0], effectiveness=5, difficulty=1, ip_hash='a')
+        leaderboards.rebuild(['trending'])
+        assert leaderboards.top_tip_ids('trending') == [tips[0].id]
+
+        Vote.objects.filter(id=vote.id).update(
+            created_at=timezone.now() - timedelta(days=settings.TRENDING_DAYS + 1)
+        )
+        assert leaderboards.top_tip_ids('trending') == [tips[0].id]
+        Leaderboard.objects.update(rebuilt_at=timezone.now() - timedelta(days=1))
+        assert leaderboards.top_tip_ids('trending') == []
+
+    def test_invalid_requests(self, client, tips):
+        """Test unknown metrics, categories and limits are rejected."""
+        assert client.get('/api/leaderboards/newest/').status_code == 400
+        assert client.get('/api/leaderboards/votes/?category=nope').status_code == 404
+        assert client.get('/api/leaderboards/votes/?limit=ten').status_code == 400
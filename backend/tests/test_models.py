@@ -3,6 +3,8 @@ Test suite for wiki models.
 Tests all model classes including Category, Tip, Vote, and moderation models.
 """
 
+from datetime import datetime, timedelta, timezone as dt_timezone
+
 import pytest
 from django.test import TestCase
 from apps.wiki.models import (
@@ -14,6 +16,7 @@ from apps.wiki.models import (
     ModerationFlag,
     ModerationLog,
 )
+from apps.wiki.utils import get_affiliate_generator
 
 
 @pytest.mark.django_db
@@ -134,6 +137,36 @@ class TestTipModel:
         expected = (5.0 / (0.0 + 1)) * 100  # = 500.0
         assert tip.calculate_success_rate() == expected
 
+    def test_tip_description_html_rendered_on_save(self):
+        """Test description_html is escaped, affiliate-linked and versioned."""
+        category = Category.objects.create(name='Test', slug='test')
+        tip = Tip.objects.create(
+            title='Test',
+            description='Rinse with mouthwash <b>daily</b>',
+            category=category
+        )
+
+        assert 'rel="nofollow sponsored"' in tip.description_html
+        assert '&lt;b&gt;daily&lt;/b&gt;' in tip.description_html
+        assert tip.description_html_version == get_affiliate_generator().version
+
+    def test_tip_partial_save_skips_render(self):
+        """Test saves that exclude description leave description_html alone."""
+        category = Category.objects.create(name='Test', slug='test')
+        tip = Tip.objects.create(title='Test', description='Plain', category=category)
+        Tip.objects.filter(pk=tip.pk).update(description_html='cached')
+
+        tip.refresh_from_db()
+        tip.success_rate = 50.0
+        tip.save(update_fields=['success_rate'])
+        tip.refresh_from_db()
+        assert tip.description_html == 'cached'
+
+        tip.description = 'Use mouthwash'
+        tip.save(update_fields=['description'])
+        tip.refresh_from_db()
+        assert 'nofollow sponsored' in tip.description_html
+
     def test_tip_votes_relationship(self):
         """Test tip to votes relationship."""
         category = Category.objects.create(name='Test', slug='test')
@@ -231,6 +264,26 @@ class TestAffiliateProductModel:
         assert product.keywords == []
 
 
+    def test_product_keywords_normalized_and_indexed(self):
+        """Test keywords are normalized and mirrored into AffiliateKeyword rows."""
+        product = AffiliateProduct.objects.create(
+            name='Test',
+            affiliate_url='https://test.com',
+            network='test',
+            keywords=[' Hand Soap', 'hand soap', 'Bar Soap']
+        )
+
+        assert product.keywords == ['hand soap', 'bar soap']
+        assert sorted(product.keyword_entries.values_list('keyword', flat=True)) == [
+            'bar soap',
+            'hand soap',
+        ]
+
+        product.keywords = ['bar soap']
+        product.save()
+        assert list(product.keyword_entries.values_list('keyword', flat=True)) == ['bar soap']
+
+
 @pytest.mark.django_db
 class TestBlacklistTermModel:
     """Tests for the BlacklistTerm model."""
@@ -453,3 +506,23 @@ class TestModerationLogModel:
         logs = list(ModerationLog.objects.all())
         assert logs[0] == log2  # Newest first
         assert logs[1] == log1
+
+    def test_between_and_action_counts(self):
+        """Test date-range reporting uses a half-open created_at range."""
+        start = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+        end = datetime(2026, 4, 1, tzinfo=dt_timezone.utc)
+        for action, created_at in [
+            ('flag_created', start),
+            ('flag_created', end - timedelta(seconds=1)),
+            ('flag_approved', start + timedelta(days=3)),
+            ('flag_created', end),
+            ('flag_created', start - timedelta(seconds=1)),
+        ]:
+            log = ModerationLog.objects.create(action=action, ip_hash='hash')
+            ModerationLog.objects.filter(pk=log.pk).update(created_at=created_at)
+
+        assert ModerationLog.objects.between(start, end).count() == 3
+        assert ModerationLog.objects.action_counts(start, end) == {
+            'flag_created': 2,
+            'flag_approved': 1,
+        }
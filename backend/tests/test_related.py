@@ -0,0 +1,76 @@
+"""
+Tests for the TF-IDF related-tips index.
+"""
+
+import numpy as np
+from apps.wiki import related
+
+TEXTS = [
+    "Microwave the kitchen sponge to kill bacteria",
+    "Replace the kitchen sponge weekly, bacteria grow fast",
+    "Scrub bathroom grout with vinegar and baking soda",
+    "Vinegar and baking soda lift mold from grout",
+    "Rinse the toothbrush holder in the bathroom weekly",
+    "",
+    "Wash cutting boards after raw meat",
+]
+
+
+def dense(indptr, indices, data, n_terms):
+    matrix = np.zeros((len(indptr) - 1, n_terms), dtype=np.float64)
+    for row in range(len(indptr) - 1):
+        span = slice(indptr[row], indptr[row + 1])
+        matrix[row, indices[span]] = data[span]
+    return matrix
+
+
+class TestVectorize:
+    """Tests for building TF-IDF vectors."""
+
+    def test_rows_are_normalized(self):
+        indptr, indices, data, n_terms = related.vectorize(TEXTS, min_df=1, max_df=1.0)
+        norms = np.linalg.norm(dense(indptr, indices, data, n_terms), axis=1)
+
+        assert np.allclose(norms[[0, 1, 2, 3, 4, 6]], 1.0)
+        assert norms[5] == 0.0  # empty text
+
+    def test_document_frequency_limits(self):
+        """Test rare and near-universal terms are dropped from the vocabulary."""
+        texts = ["sponge bacteria", "sponge grout", "sponge mold", "bacteria mold"]
+        _, _, _, n_terms = related.vectorize(texts, min_df=2, max_df=0.6)
+        # "sponge" is in 3/4 tips, "grout" in one; "bacteria" and "mold" remain
+        assert n_terms == 2
+
+    def test_tokenize_drops_stop_words_and_numbers(self):
+        assert related.tokenize("Use the 3 sponges, now!") == ["sponges", "now"]
+
+
+class TestScoring:
+    """Tests for the blocked similarity computation."""
+
+    def test_blocks_match_dense_product(self):
+        """Test every block size gives X @ X.T, with self-similarity masked."""
+        indptr, indices, data, n_terms = related.vectorize(TEXTS, min_df=1, max_df=1.0)
+        csr = (indptr, indices, data)
+        csc = related.transpose(indptr, indices, data, n_terms)
+        matrix = dense(indptr, indices, data, n_terms)
+        expected = matrix @ matrix.T
+        np.fill_diagonal(expected, -1.0)
+
+        rows = list(range(len(TEXTS)))
+        for max_rows, max_pairs in ((1, 10**6), (3, 10**6), (len(TEXTS), 10**6), (10, 5)):
+            blocks = list(related.score_blocks(csr, csc, rows, max_rows, max_pairs))
+            assert np.concatenate([block for block, _ in blocks]).tolist() == rows
+            assert np.allclose(np.vstack([scores for _, scores in blocks]), expected, atol=1e-6)
+
+    def test_best_orders_and_filters(self):
+        scores = np.array([0.2, -1.0, 0.9, 0.2, 0.01])
+        rows, values = related.best(scores, 3, min_score=0.05)
+
+        assert rows.tolist() == [2, 0, 3]
+        assert np.allclose(values, [0.9, 0.2, 0.2])
+        assert related.best(scores, 10, min_score=0.5)[0].tolist() == [2]
+
+    def test_merge_keeps_best(self):
+        entries = [[1, 0.9], [2, 0.5]]
+        assert related.merge(entries, [[3, 0.7], [4, 0.1]], 3) == [[1, 0.9], [3, 0.7], [2, 0.5]]
@@ -0,0 +1,224 @@
+"""
+Tests for the two-tier API response cache.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from apps.wiki import response_cache
+from apps.wiki.models import AffiliateProduct, Category, Tip
+
+
+@pytest.mark.django_db
+class TestCachedEndpoints:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for caching the public GET endpoints."""
+
+    @pytest.fixture
+    def tip(self):
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        return Tip.objects.create(title='Clean sponge', description='Test', category=category)
+
+    def test_repeat_request_is_served_from_local_tier(
+        self, client, tip, django_assert_num_queries
+    ):
+        """Test a warm request runs no queries and reports a local hit."""
+        first = client.get(f'/api/tips/{tip.id}/')
+        with django_assert_num_queries(0):
+            second = client.get(f'/api/tips/{tip.id}/')
+
+        assert first['X-Cache'] == 'miss'
+        assert second['X-Cache'] == 'local'
+        assert second.json() == first.json()
+        assert second['Content-Type'] == first['Content-Type']
+
+    def test_shared_tier_serves_other_workers(self, client, tip):
+        """Test a process with an empty LRU is served from the shared cache."""
+        client.get('/api/tips/')
+        response_cache.reset()  # as if another worker
+
+        response = client.get('/api/tips/')
+
+        assert response['X-Cache'] == 'shared'
+        assert response_cache.stats()['shared_hits'] == 1
+
+    def test_query_string_is_normalized(self, client, tip):
+        """Test parameter order does not split the cache."""
+        client.get('/api/products/?network=amazon&keyword=soap')
+        response = client.get('/api/products/?keyword=soap&network=amazon')
+
+        assert response['X-Cache'] == 'local'
+
+    def test_vote_invalidates_tip(self, client, tip):
+        """Test a vote bumps the tips version so the next read is fresh."""
+        assert client.get(f'/api/tips/{tip.id}/').json()['vote_count'] == 0
+
+        client.post(
+            f'/api/tips/{tip.id}/vote/',
+            data=json.dumps({'effectiveness': 5, 'difficulty': 2}),
+            content_type='application/json',
+        )
+        response = client.get(f'/api/tips/{tip.id}/')
+
+        assert response['X-Cache'] == 'miss'
+        assert response.json()['vote_count'] == 1
+
+    def test_category_write_invalidates_tip_lists(self, client, tip):
+        """Test renaming a category refreshes tip lists that embed it."""
+        client.get('/api/tips/')
+        tip.category.save()
+
+        assert client.get('/api/tips/')['X-Cache'] == 'miss'
+
+    def test_product_write_invalidates_only_products(self, client, tip):
+        """Test product writes leave tip responses cached."""
+        client.get('/api/products/')
+        client.get('/api/categories/')
+        AffiliateProduct.objects.create(
+            name='Soap', affiliate_url='https://example.com/soap', network='amazon'
+        )
+
+        assert client.get('/api/products/')['X-Cache'] == 'miss'
+        assert client.get('/api/categories/')['X-Cache'] == 'local'
+
+    def test_errors_and_html_are_not_cached(self, client, tip):
+        """Test 404s and browsable-API responses bypass the cache."""
+        client.get('/api/tips/99999/')
+        assert client.get('/api/tips/99999/').status_code == 404
+        assert response_cache.stats()['local_entries'] == 0
+
+        response = client.get('/api/categories/', HTTP_ACCEPT='text/html')
+        assert 'X-Cache' not in response
+
+    def test_stats_endpoint_is_staff_only(self, client, tip):
+        """Test counters are exposed to staff only."""
+        client.get('/api/categories/')
+        assert client.get('/api/cache/stats/').status_code in (401, 403)
+
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        client.force_login(admin)
+        stats = client.get('/api/cache/stats/').json()
+
+        assert stats['misses'] == 1
+        assert stats['rebuilds'] == 1
+        assert 'pid' in stats
+
+
+class TestSingleFlight:
+    """Tests for coalescing concurrent rebuilds of one key."""
+
+    def test_cold_key_is_built_once(self):
+        """Test concurrent misses wait for one rebuild instead of each building."""
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'response', (b'{}', {})
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(response_cache.fetch('cold', build)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(payload == (b'{}', {}) for _, payload, _ in results)
+        assert response_cache.stats()['waits'] == 7
+
+    def test_local_lru_evicts_oldest(self):
+        """Test the in-process tier keeps only the most recently used entries."""
+        lru = response_cache.LocalLRU(max_entries=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        assert lru.get('a') == 1
+        assert lru.get('b') is None
+        assert lru.get('c') == 3
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for ETag / Last-Modified revalidation."""
+
+    @pytest.fixture
+    def tip(self):
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        return Tip.objects.create(title='Clean sponge', description='Test', category=category)
+
+    @pytest.mark.parametrize('path', [
+        '/api/tips/',
+        '/api/categories/',
+        '/api/categories/kitchen/',
+        '/api/products/',
+    ])
+    def test_matching_etag_returns_304_without_queries(
+        self, client, tip, path, django_assert_num_queries
+    ):
+        """Test If-None-Match short-circuits before any query runs."""
+        first = client.get(path)
+        assert first.status_code == 200
+        assert first['Cache-Control'] == 'no-cache'
+
+        with django_assert_num_queries(0):
+            response = client.get(path, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert response.status_code == 304
+        assert response['ETag'] == first['ETag']
+        assert response.content == b''
+
+    def test_etag_is_strong_and_stable(self, client, tip):
+        """Test repeated reads of unchanged data carry the same strong ETag."""
+        first = client.get(f'/api/tips/{tip.id}/')
+        second = client.get(f'/api/tips/{tip.id}/')
+
+        assert first['ETag'] == second['ETag']
+        assert not first['ETag'].startswith('W/')
+        assert 'Last-Modified' in first
+
+    def test_write_changes_etag(self, client, tip):
+        """Test a stale ETag gets the new body after a write."""
+        etag = client.get(f'/api/tips/{tip.id}/')['ETag']
+        tip.title = 'Boil sponge'
+        tip.save()
+
+        response = client.get(f'/api/tips/{tip.id}/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.json()['title'] == 'Boil sponge'
+        assert response['ETag'] != etag
+
+    def test_if_modified_since(self, client, tip):
+        """Test Last-Modified revalidation without an ETag."""
+        last_modified = client.get('/api/categories/')['Last-Modified']
+
+        response = client.get('/api/categories/', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == 304
+
+    def test_query_string_changes_etag(self, client, tip):
+        """Test different pages of a list have different ETags."""
+        assert client.get('/api/tips/')['ETag'] != client.get('/api/tips/?page=1')['ETag']
+
+    def test_validators_without_response_cache(self, client, tip, settings):
+        """Test ETags still work with the response cache switched off."""
+        settings.RESPONSE_CACHE_ENABLED = False
+        etag = client.get('/api/categories/')['ETag']
+
+        assert client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag).status_code == 304
@@ -0,0 +1,171 @@
+"""
+Test suite for the sitemap index and chunked tip sitemaps.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.core.cache import cache
+from apps.wiki.models import Category, Tip
+from apps.wiki.sitemaps import TipSitemap
+
+
+@pytest.mark.django_db
+class TestTipSitemap:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings, monkeypatch):
+        settings.SECURE_SSL_REDIRECT = False
+        monkeypatch.setattr(TipSitemap, 'limit', 2)
+        cache.clear()
+
+    """Tests for the sitemap index and tips sitemap pages."""
+
+    @pytest.fixture
+    def tips(self):
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        return [
+            Tip.objects.create(title=f'Clean Kitchen {i}', description='Desc', category=category)
+            for i in range(5)
+        ]
+
+    def test_index_lists_every_tip_page(self, client, tips):
+        """Test /sitemap.xml is an index with one entry per tips chunk."""
+        response = client.get('/sitemap.xml')
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert '<sitemapindex' in content
+        assert '/sitemap-tips.xml</loc>' in content
+        assert '/sitemap-tips.xml?p=2</loc>' in content
+        assert '/sitemap-tips.xml?p=3</loc>' in content
+        assert '/sitemap-tips.xml?p=4</loc>' not in content
+        assert '/sitemap-categories.xml</loc>' in content
+
+    def test_tip_page_uses_stored_slug(self, client, tips):
+        """Test each page holds its id range and reuses Tip.slug."""
+        response = client.get('/sitemap-tips.xml?p=2')
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert f'/tips/{tips[2].id}-clean-kitchen-2</loc>' in content
+        assert f'/tips/{tips[3].id}-clean-kitchen-3</loc>' in content
+        assert content.count('<url>') == 2
+
+    def test_out_of_range_page_404(self, client, tips):
+        """Test pages past MAX(id) return 404."""
+        assert client.get('/sitemap-tips.xml?p=9').status_code == 404
+        assert client.get('/sitemap-tips.xml?p=abc').status_code == 404
+
+    def test_chunk_is_cached_until_tip_in_range_changes(
+        self, client, tips, django_assert_num_queries
+    ):
+        """Test a cached chunk serves without loading tips, and saves invalidate it."""
+        first = client.get('/sitemap-tips.xml?p=1').content.decode()
+
+        # Cached: only the conditional-GET version query and MAX(id) remain
+        with django_assert_num_queries(2):
+            assert client.get('/sitemap-tips.xml?p=1').content.decode() == first
+
+        # A change in another chunk leaves this one cached
+        tips[4].slug = 'renamed-elsewhere'
+        tips[4].save()
+        with django_assert_num_queries(2):
+            client.get('/sitemap-tips.xml?p=1')
+
+        tips[0].slug = 'renamed-tip'
+        tips[0].save()
+        content = client.get('/sitemap-tips.xml?p=1').content.decode()
+        assert f'/tips/{tips[0].id}-renamed-tip</loc>' in content
+
+    def test_lastmod_uses_updated_at(self, client, tips):
+        """Test tip lastmod follows updated_at, which votes advance."""
+        Tip.objects.filter(pk=tips[0].pk).update(
+            updated_at=datetime(2020, 1, 2, tzinfo=dt_timezone.utc)
+        )
+        cache.clear()
+        content = client.get('/sitemap-tips.xml?p=1').content.decode()
+        assert '<lastmod>2020-01-02</lastmod>' in content
+
+        tips[0].success_rate = 90.0
+        tips[0].save(update_fields=['success_rate'])
+        tips[0].refresh_from_db()
+        assert tips[0].updated_at.year > 2020
+
+        content = client.get('/sitemap-tips.xml?p=1').content.decode()
+        assert '<lastmod>2020-01-02</lastmod>' not in content
+
+    def test_category_lastmod(self, client, tips):
+        """Test categories report updated_at, bumped by changes to their tips."""
+        category = Category.objects.get()
+        before = category.updated_at
+
+        tips[0].description = 'Edited'
+        tips[0].save()
+        category.refresh_from_db()
+        assert category.updated_at > before
+
+        content = client.get('/sitemap-categories.xml').content.decode()
+        assert f'<lastmod>{category.updated_at.date().isoformat()}</lastmod>' in content
+
+
+@pytest.mark.django_db
+class TestConditionalSitemaps:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings, monkeypatch):
+        settings.SECURE_SSL_REDIRECT = False
+        monkeypatch.setattr(TipSitemap, 'limit', 2)
+        cache.clear()
+
+    """Tests for ETag / Last-Modified handling on sitemap responses."""
+
+    @pytest.fixture
+    def tips(self):
+        category = Category.objects.create(name='Kitchen', slug='kitchen')
+        return [
+            Tip.objects.create(title=f'Tip {i}', description='Desc', category=category)
+            for i in range(3)
+        ]
+
+    @pytest.mark.parametrize('url', ['/sitemap.xml', '/sitemap-tips.xml?p=1', '/sitemap-categories.xml'])
+    def test_if_none_match_returns_304_with_one_query(
+        self, client, tips, url, django_assert_num_queries
+    ):
+        """Test unchanged sitemaps short-circuit to 304 after one query."""
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('Last-Modified')
+        etag = response['ETag']
+
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_if_modified_since_returns_304(self, client, tips):
+        """Test If-Modified-Since alone is honoured."""
+        response = client.get('/sitemap-tips.xml?p=2')
+        response = client.get(
+            '/sitemap-tips.xml?p=2', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+    def test_change_outside_page_keeps_etag(self, client, tips):
+        """Test a tip change only alters the ETag of its own page."""
+        page1 = client.get('/sitemap-tips.xml?p=1')['ETag']
+        page2 = client.get('/sitemap-tips.xml?p=2')['ETag']
+        index = client.get('/sitemap.xml')['ETag']
+
+        Tip.objects.filter(pk=tips[2].pk).update(
+            updated_at=datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+        )
+        tips[2].refresh_from_db()
+        tips[2].save(update_fields=['success_rate'])
+
+        assert client.get('/sitemap-tips.xml?p=1')['ETag'] == page1
+        assert client.get('/sitemap-tips.xml?p=2')['ETag'] != page2
+        assert client.get('/sitemap.xml')['ETag'] != index
+
+    def test_deleting_tip_changes_etag(self, client, tips):
+        """Test deletions change the ETag even if MAX(updated_at) does not grow."""
+        etag = client.get('/sitemap-tips.xml?p=1')['ETag']
+        Tip.objects.filter(pk=tips[1].pk).delete()
+
+        response = client.get('/sitemap-tips.xml?p=1', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
@@ -0,0 +1,193 @@
+"""
+Tests for Turnstile verification against a local stand-in siteverify server.
+"""
+
+import json
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from apps.wiki import turnstile
+from apps.wiki.models import Category, Tip
+from tests.turnstile_server import FakeSiteverify
+
+
+@pytest.fixture
+def siteverify(settings):
+    """A fake siteverify server with short timeouts pointed at it."""
+    fake = FakeSiteverify(delay=0.5).start()
+    settings.TURNSTILE_VERIFY_URL = fake.url
+    settings.TURNSTILE_SECRET_KEY = 'test-secret'
+    settings.TURNSTILE_CONNECT_TIMEOUT = 0.5
+    settings.TURNSTILE_READ_TIMEOUT = 0.2
+    settings.TURNSTILE_MAX_RETRIES = 1
+    settings.TURNSTILE_RETRY_BACKOFF = 0.01
+    settings.TURNSTILE_FAIL_OPEN = False
+    turnstile.reset()
+    yield fake
+    turnstile.reset()
+    fake.stop()
+
+
+class TestVerify:
+    """Tests for turnstile.verify."""
+
+    def test_valid_and_invalid_tokens(self, siteverify):
+        siteverify.script = ['valid', 'invalid']
+
+        assert turnstile.verify('token-a', '203.0.113.7') == {
+            'success': True, 'unavailable': False, 'error_codes': [],
+        }
+        assert turnstile.verify('token-b') == {
+            'success': False, 'unavailable': False,
+            'error_codes': ['invalid-input-response'],
+        }
+        first = siteverify.requests[0]
+        assert first['secret'] == 'test-secret'
+        assert first['response'] == 'token-a'
+        assert first['remoteip'] == '203.0.113.7'
+        assert 'remoteip' not in siteverify.requests[1]
+
+    def test_connections_are_reused(self, siteverify):
+        """Test consecutive verifications share one kept-alive connection."""
+        for i in range(5):
+            assert turnstile.verify(f'token-{i}')['success']
+        assert len({request['client_port'] for request in siteverify.requests}) == 1
+
+    @pytest.mark.parametrize('failure', ['slow', 'error', 'internal', 'garbage', 'drop'])
+    def test_failed_attempt_is_retried(self, siteverify, failure):
+        """Test one failed attempt is retried with the same idempotency key."""
+        siteverify.script = [failure, 'valid']
+
+        assert turnstile.verify('token')['success']
+        keys = [request['idempotency_key'] for request in siteverify.requests]
+        assert len(keys) == 2 and keys[0] == keys[1]
+        assert turnstile.stats()['retries'] == 1
+
+    def test_slow_upstream_is_bounded(self, siteverify):
+        """Test a hung upstream costs the retry budget of timeouts, then fails closed."""
+        siteverify.default = 'slow'
+
+        started = time.perf_counter()
+        result = turnstile.verify('token')
+        elapsed = time.perf_counter() - started
+
+        assert result == {'success': False, 'unavailable': True, 'error_codes': []}
+        assert len(siteverify.requests) == 2
+        assert elapsed < 0.45  # two 0.2s read timeouts, not the 0.5s answer
+        assert turnstile.stats()['timeouts'] == 2
+
+    def test_fail_open(self, siteverify, settings):
+        settings.TURNSTILE_FAIL_OPEN = True
+        siteverify.default = 'error'
+
+        assert turnstile.verify('token') == {
+            'success': True, 'unavailable': True, 'error_codes': [],
+        }
+        assert turnstile.stats()['failed_open'] == 1
+
+    def test_missing_dependency_never_fails_open(self, siteverify, settings, monkeypatch):
+        """Test fail-open covers upstream failures, not a client that cannot run."""
+        settings.TURNSTILE_FAIL_OPEN = True
+
+        def missing():
+            raise ImportError('No module named requests')
+
+        monkeypatch.setattr(turnstile, '_get_session', missing)
+
+        assert turnstile.verify('token') == {
+            'success': False, 'unavailable': True, 'error_codes': [],
+        }
+        assert siteverify.requests == []
+        assert turnstile.stats()['failed_closed'] == 1
+
+    def test_unreachable_upstream(self, siteverify, settings):
+        siteverify.stop()
+
+        assert turnstile.verify('token')['unavailable']
+        assert turnstile.stats()['connection_errors'] == 2
+
+    def test_stats(self, siteverify):
+        siteverify.script = ['valid', 'invalid', 'error']
+        siteverify.default = 'error'
+        for token in ('a', 'b', 'c'):
+            turnstile.verify(token)
+
+        stats = turnstile.stats()
+        assert stats['verifications'] == 3
+        assert (stats['valid'], stats['invalid'], stats['failed_closed']) == (1, 1, 1)
+        assert stats['server_errors'] == 2
+        latency = stats['latency_ms']
+        assert latency['count'] == 3
+        assert 0 < latency['p50'] <= latency['p95'] <= latency['p99'] <= latency['max']
+
+
+@pytest.mark.django_db
+class TestCreateTipVerification:
+    @pytest.fixture(autouse=True)
+    def setup_settings(self, settings):
+        settings.SECURE_SSL_REDIRECT = False
+
+    """Tests for create_tip's Turnstile check."""
+
+    def post(self, client, token):
+        category = Category.objects.get_or_create(name='Kitchen', slug='kitchen')[0]
+        return client.post(
+            '/api/tips/create/',
+            data=json.dumps({
+                'title': 'Rinse the sponge',
+                'description': 'Rinse the kitchen sponge in hot water after use',
+                'category_id': category.id,
+                'turnstile_token': token,
+            }),
+            content_type='application/json',
+        )
+
+    def test_valid_token_creates_tip(self, client, siteverify):
+        response = self.post(client, 'token')
+
+        assert response.status_code == 201
+        assert siteverify.requests[0]['remoteip'] == '127.0.0.1'
+
+    def test_invalid_token(self, client, siteverify):
+        siteverify.default = 'invalid'
+
+        assert self.post(client, 'token').status_code == 403
+        assert not Tip.objects.exists()
+
+    def test_unavailable_upstream_fails_closed(self, client, siteverify):
+        siteverify.default = 'slow'
+
+        response = self.post(client, 'token')
+
+        assert response.status_code == 503
+        assert response.json() == {'error': 'CAPTCHA verification unavailable'}
+
+    def test_unavailable_upstream_fails_open(self, client, siteverify, settings):
+        settings.TURNSTILE_FAIL_OPEN = True
+        siteverify.default = 'error'
+
+        assert self.post(client, 'token').status_code == 201
+
+    def test_missing_dependency_is_503(self, client, siteverify, settings, monkeypatch):
+        settings.TURNSTILE_FAIL_OPEN = True
+
+        def missing():
+            raise ImportError('No module named requests')
+
+        monkeypatch.setattr(turnstile, '_get_session', missing)
+
+        assert self.post(client, 'token').status_code == 503
+        assert not Tip.objects.exists()
+
+    def test_stats_endpoint_is_staff_only(self, client, siteverify):
+        self.post(client, 'token')
+        assert client.get('/api/turnstile/stats/').status_code in (401, 403)
+
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        client.force_login(admin)
+        stats = client.get('/api/turnstile/stats/').json()
+
+        assert stats['valid'] == 1
+        assert stats['latency_ms']['count'] == 1
+        assert 'pid' in stats
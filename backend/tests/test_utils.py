@@ -307,6 +307,131 @@ class TestAffiliateLinkGenerator:
         link_count = result.count('<a ')
         assert link_count == 3
 
+    def test_convert_text_case_insensitive_preserves_text(self, tmp_path):
+        """Test matches ignore case and keep the original casing as link text."""
+        fixture_data = {
+            "affiliate_mappings": {
+                "amazon": {
+                    "sanitizer": {
+                        "name": "Sanitizer",
+                        "url": "https://amazon.com/dp/1",
+                        "keyword": ["hand sanitizer"]
+                    }
+                }
+            }
+        }
+
+        fixture_file = tmp_path / "affiliate_products.json"
+        fixture_file.write_text(json.dumps(fixture_data))
+
+        generator = AffiliateLinkGenerator(str(fixture_file))
+        result = generator.convert_text_with_affiliate_links("Use Hand Sanitizer daily.")
+
+        assert 'amazon.com/dp/1' in result
+        assert '>Hand Sanitizer</a>' in result
+        assert result.endswith(' daily.')
+
+    def test_convert_text_respects_word_boundaries(self, tmp_path):
+        """Test keywords are not linked inside longer words."""
+        fixture_data = {
+            "affiliate_mappings": {
+                "amazon": {
+                    "soap": {
+                        "name": "Soap",
+                        "url": "https://amazon.com/dp/1",
+                        "keyword": ["soap"]
+                    }
+                }
+            }
+        }
+
+        fixture_file = tmp_path / "affiliate_products.json"
+        fixture_file.write_text(json.dumps(fixture_data))
+
+        generator = AffiliateLinkGenerator(str(fixture_file))
+        text = "Soapy water works."
+
+        assert generator.convert_text_with_affiliate_links(text) == text
+
+    def test_convert_text_prefers_longest_keyword(self, tmp_path):
+        """Test overlapping keywords resolve to the longest match."""
+        fixture_data = {
+            "affiliate_mappings": {
+                "amazon": {
+                    "floss": {
+                        "name": "Floss",
+                        "url": "https://amazon.com/dp/1",
+                        "keyword": ["floss"]
+                    },
+                    "waxed_floss": {
+                        "name": "Waxed Floss",
+                        "url": "https://amazon.com/dp/2",
+                        "keyword": ["waxed floss"]
+                    }
+                }
+            }
+        }
+
+        fixture_file = tmp_path / "affiliate_products.json"
+        fixture_file.write_text(json.dumps(fixture_data))
+
+        generator = AffiliateLinkGenerator(str(fixture_file))
+        result = generator.convert_text_with_affiliate_links("Try waxed floss.")
+
+        assert 'amazon.com/dp/2' in result
+        assert 'amazon.com/dp/1' not in result
+        assert result.count('<a ') == 1
+
+    def test_convert_text_skips_existing_markup(self, tmp_path):
+        """Test keywords inside existing anchors and tag attributes are untouched."""
+        fixture_data = {
+            "affiliate_mappings": {
+                "amazon": {
+                    "mouthwash": {
+                        "name": "Mouthwash",
+                        "url": "https://amazon.com/dp/1",
+                        "keyword": ["mouthwash"]
+                    }
+                }
+            }
+        }
+
+        fixture_file = tmp_path / "affiliate_products.json"
+        fixture_file.write_text(json.dumps(fixture_data))
+
+        generator = AffiliateLinkGenerator(str(fixture_file))
+        text = '<a href="/mouthwash">mouthwash guide</a> <img alt="mouthwash">'
+
+        assert generator.convert_text_with_affiliate_links(text) == text
+
+        # Converting already-converted output must be a no-op
+        once = generator.convert_text_with_affiliate_links("Rinse with mouthwash.")
+        assert generator.convert_text_with_affiliate_links(once) == once
+
+    def test_convert_text_skip_words(self, tmp_path):
+        """Test skip_words are left as plain text."""
+        fixture_data = {
+            "affiliate_mappings": {
+                "amazon": {
+                    "product1": {
+                        "name": "Product 1",
+                        "url": "https://amazon.com/dp/1",
+                        "keyword": ["product1"]
+                    }
+                }
+            }
+        }
+
+        fixture_file = tmp_path / "affiliate_products.json"
+        fixture_file.write_text(json.dumps(fixture_data))
+
+        generator = AffiliateLinkGenerator(str(fixture_file))
+        result = generator.convert_text_with_affiliate_links(
+            "Buy product1.", skip_words=["Product1"]
+        )
+
+        assert result == "Buy product1."
+
     def test_get_product_by_keyword(self, tmp_path):
         """Test retrieving product info by keyword."""
         fixture_data = {
@@ -387,6 +512,7 @@ class TestAffiliateLinkGenerator:
         assert amazon_products[0]['name'] == "Amazon Product"
 
 
+@pytest.mark.django_db
 class TestGlobalAffiliateFunctions:
     """Tests for global affiliate convenience functions."""
 
@@ -398,6 +524,51 @@ class TestGlobalAffiliateFunctions:
         assert gen1 is gen2
 
 
+    def test_get_affiliate_generator_snapshots_products(self):
+        """Test the global generator is built from active AffiliateProduct rows."""
+        from apps.wiki.models import AffiliateProduct
+
+        AffiliateProduct.objects.create(
+            name='DB Product',
+            affiliate_url='https://example.com/db',
+            network='amazon',
+            keywords=['db keyword'],
+        )
+        AffiliateProduct.objects.create(
+            name='Inactive Product',
+            affiliate_url='https://example.com/off',
+            network='amazon',
+            keywords=['inactive keyword'],
+            is_active=False,
+        )
+
+        generator = get_affiliate_generator()
+        assert generator.get_all_keywords() == ['db keyword']
+        assert generator.get_product_by_keyword('db keyword')['url'] == 'https://example.com/db'
+
+    def test_tracking_base_url_routes_links_through_redirect(self, settings):
+        """Test rendered links use /api/go/<id>/ when tracking is configured."""
+        from apps.wiki.models import AffiliateProduct
+
+        settings.AFFILIATE_TRACKING_BASE_URL = 'https://api.example.com/'
+        product = AffiliateProduct.objects.create(
+            name='DB Product',
+            affiliate_url='https://example.com/db',
+            network='amazon',
+            keywords=['db keyword'],
+        )
+
+        generator = get_affiliate_generator()
+        link = generator.generate_affiliate_link('db keyword')
+        assert f'href="https://api.example.com/api/go/{product.id}/"' in link
+        assert generator.get_product_by_pk(product.id)['url'] == 'https://example.com/db'
+
+    def test_get_affiliate_generator_falls_back_to_fixture(self):
+        """Test the fixture mappings are used while the product table is empty."""
+        generator = get_affiliate_generator()
+        assert generator.get_product_by_keyword('hand sanitizer') is not None
+
+
 class TestModerateContent:
     """Tests for moderate_content function."""
 
@@ -430,6 +601,49 @@ class TestModerateContent:
         assert result['method'] == 'keyword'
 
 
+class TestAIModeratorVerdictCache:
+    """Tests for caching AI moderation verdicts."""
+
+    def _classifier(self):
+        return Mock(return_value={
+            'labels': ['violence', 'safe content'],
+            'scores': [0.9, 0.1],
+        })
+
+    def test_verdict_is_cached(self):
+        """Test the classifier runs once for repeated identical text."""
+        classifier = self._classifier()
+        with patch.object(AIModerator, 'get_classifier', return_value=classifier):
+            first = AIModerator().moderate_text('some text')
+            second = AIModerator().moderate_text('some text')
+
+        assert first == second
+        assert first['is_flagged'] is True
+        assert classifier.call_count == 1
+
+    def test_threshold_is_part_of_key(self):
+        """Test a different threshold is classified again."""
+        classifier = self._classifier()
+        with patch.object(AIModerator, 'get_classifier', return_value=classifier):
+            AIModerator().moderate_text('some text', threshold=0.5)
+            result = AIModerator().moderate_text('some text', threshold=0.95)
+
+        assert result['is_flagged'] is False
+        assert classifier.call_count == 2
+
+    def test_fallback_is_not_cached(self):
+        """Test keyword fallbacks are not stored, so the classifier is retried."""
+        with patch.object(AIModerator, 'get_classifier', side_effect=RuntimeError('down')):
+            AIModerator().moderate_text('some text')
+
+        classifier = self._classifier()
+        with patch.object(AIModerator, 'get_classifier', return_value=classifier):
+            result = AIModerator().moderate_text('some text')
+
+        assert classifier.call_count == 1
+        assert result['is_flagged'] is True
+
+
 class TestGetModerationSummary:
     """Tests for get_moderation_summary function."""
 
@@ -0,0 +1,136 @@
+"""
+Local stand-in for Cloudflare's Turnstile siteverify endpoint.
+
+Answers POSTs over HTTP/1.1 keep-alive. Each request takes the next
+behaviour from a script, or the default once the script is used up:
+- valid / invalid: a success or invalid-input-response answer
+- slow: sleep for `delay` seconds, then answer valid
+- error: HTTP 500
+- internal: a 200 carrying Cloudflare's "internal-error" code
+- garbage: a 200 whose body is not JSON
+- drop: close the connection without answering
+
+Verdicts are replayed per idempotency_key, as Cloudflare does. Every
+request is recorded with its form fields and the client port, so tests can
+check retries and connection reuse.
+
+Used as a pytest fixture, or run standalone for local development:
+    python tests/turnstile_server.py --port 8081
+    TURNSTILE_VERIFY_URL=http://127.0.0.1:8081/ python manage.py runserver
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+ANSWERS = {
+    "valid": {"success": True, "error-codes": []},
+    "invalid": {"success": False, "error-codes": ["invalid-input-response"]},
+    "internal": {"success": False, "error-codes": ["internal-error"]},
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = {
+            key: values[0]
+            for key, values in parse_qs(self.rfile.read(length).decode()).items()
+        }
+        fake = self.server.fake
+        behaviour = fake.record(form, self.client_address[1])
+
+        if behaviour == "drop":
+            self.close_connection = True
+            return
+        if behaviour == "slow":
+            time.sleep(fake.delay)
+            behaviour = "valid"
+        if behaviour == "error":
+            self._send(500, b"upstream error", "text/plain")
+        elif behaviour == "garbage":
+            self._send(200, b"<html>", "text/html")
+        else:
+            answer = ANSWERS[behaviour]
+            if behaviour != "internal":
+                answer = fake.answer(form.get("idempotency_key"), answer)
+            self._send(200, json.dumps(answer).encode(), "application/json")
+
+    def _send(self, status, body, content_type):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (read timeout) before the answer was ready
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSiteverify:
+    """A siteverify server on a background thread; see the module docstring."""
+
+    def __init__(self, host="127.0.0.1", port=0, default="valid", delay=1.0):
+        self.default = default
+        self.delay = delay
+        self.script = []
+        self.requests = []
+        self._answers = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def record(self, form, client_port):
+        """Log a request and pick its behaviour."""
+        with self._lock:
+            self.requests.append({**form, "client_port": client_port})
+            return self.script.pop(0) if self.script else self.default
+
+    def answer(self, idempotency_key, answer):
+        """The first answer given for idempotency_key, or answer."""
+        with self._lock:
+            if idempotency_key:
+                return self._answers.setdefault(idempotency_key, answer)
+            return answer
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--default", choices=[*ANSWERS, "slow", "error", "garbage", "drop"],
+                        default="valid")
+    parser.add_argument("--delay", type=float, default=1.0)
+    options = parser.parse_args()
+    fake = FakeSiteverify(port=options.port, default=options.default, delay=options.delay)
+    print(f"Fake siteverify listening on {fake.url}")
+    try:
+        fake.start()._thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
@@ -5,6 +5,7 @@ import {
   getCategories,
   getTips,
   getTip,
+  getTipsBatch,
   getCategory,
   createTip,
   voteTip,
@@ -155,6 +156,26 @@ describe('API Client', () => {
     });
   });
 
+  describe('getTipsBatch', () => {
+    it('should fetch several tips in one request', async () => {
+      const mockResponse = { results: [], missing: [3] };
+
+      global.fetch = vi.fn().mockResolvedValueOnce({
+        ok: true,
+        json: async () => mockResponse,
+      } as Response);
+
+      const result = await getTipsBatch([2, 1, 3]);
+
+      expect(result).toEqual(mockResponse);
+      expect(fetch).toHaveBeenCalledTimes(1);
+      expect(fetch).toHaveBeenCalledWith(
+        expect.stringContaining('/tips/batch/?ids=2,1,3'),
+        expect.any(Object)
+      );
+    });
+  });
+
   describe('getCategory', () => {
     it('should fetch category detail by slug', async () => {
       const mockCategory = {
@@ -33,16 +33,24 @@ export interface TipDetail {
   title: string;
   slug: string;
   description: string;
+  description_html: string;
   category: Category;
   votes: Vote[];
   vote_count: number;
   vote_score: number;
+  related: RelatedTip[];
   effectiveness_avg: number;
   difficulty_avg: number;
   success_rate: number;
   created_at: string;
 }
 
+export interface RelatedTip {
+  id: number;
+  title: string;
+  slug: string;
+}
+
 export interface Vote {
   id: number;
   effectiveness: number;
@@ -69,6 +77,20 @@ export interface TipListResponse {
   results: TipList[];
 }
 
+export interface HomeResponse {
+  categories: Category[];
+  latest: TipList[];
+  top: TipList[];
+  trending: TipList[];
+}
+
+export type LeaderboardMetric = 'success_rate' | 'votes' | 'trending';
+
+export interface TipBatchResponse {
+  results: TipDetail[];
+  missing: number[];
+}
+
 export interface CategoryDetail {
   id: number;
   name: string;
@@ -163,6 +185,15 @@ export async function post<T>(endpoint: string, data: unknown): Promise<T> {
   });
 }
 
+/**
+ * GET everything the homepage renders in one request: categories with
+ * counts plus the latest, top and trending tips
+ */
+export async function getHome(): Promise<HomeResponse> {
+  const response = await get<HomeResponse>('/home/');
+  return response;
+}
+
 /**
  * GET all categories
  */
@@ -192,6 +223,28 @@ export async function getTip(id: number): Promise<TipDetail> {
   return response;
 }
 
+/**
+ * GET tip details for several IDs in one request (at most 100),
+ * in the order given; IDs with no tip come back in `missing`
+ */
+export async function getTipsBatch(ids: number[]): Promise<TipBatchResponse> {
+  const response = await get<TipBatchResponse>(`/tips/batch/?ids=${ids.join(',')}`);
+  return response;
+}
+
+/**
+ * GET the best tips for a metric, site-wide or within a category
+ */
+export async function getLeaderboard(
+  metric: LeaderboardMetric,
+  categorySlug?: string,
+  limit: number = 20
+): Promise<TipList[]> {
+  const category = categorySlug ? `&category=${encodeURIComponent(categorySlug)}` : '';
+  const response = await get<TipList[]>(`/leaderboards/${metric}/?limit=${limit}${category}`);
+  return response;
+}
+
 /**
  * Get category detail with tips by slug
  */
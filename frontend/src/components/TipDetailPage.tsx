@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from 'react';
-import { useParams } from 'react-router-dom';
+import { Link, useParams } from 'react-router-dom';
 import { Helmet } from 'react-helmet-async';
 import { getTip, voteTip, type TipDetail } from '../api/client';
 
@@ -244,6 +244,19 @@ export default function TipDetailPage() {
           </div>
         </section>
 
+        {tip.related.length > 0 && (
+          <section className="related-tips">
+            <h2>Related Tips</h2>
+            <ul>
+              {tip.related.map((related) => (
+                <li key={related.id}>
+                  <Link to={`/tips/${related.id}-${related.slug}`}>{related.title}</Link>
+                </li>
+              ))}
+            </ul>
+          </section>
+        )}
+
         {/* Schema.org Article markup */}
         <script type="application/ld+json">
           {JSON.stringify({